@@ -0,0 +1,7 @@
+"""
+Offline benchmarks of the export pipeline, run as `python -m benchmarks.<name>`.
+"""
+import os
+
+# Benchmarks print their own results: keep tqdm's progress bars out of them.
+os.environ.setdefault("TQDM_DISABLE", "1")
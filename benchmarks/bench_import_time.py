@@ -0,0 +1,100 @@
+"""
+Benchmark of the import time of the package and its CLI, with python -X importtime.
+
+Each statement runs in fresh interpreters. The time spent importing the modules it
+loads, beyond those Python's startup loads anyway, is reported as the median over the
+runs. With --max_ms, the benchmark fails when a statement is slower, as a guard
+against import-time regressions.
+
+Usage: python -m benchmarks.bench_import_time --runs 10 --max_ms 50
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from functools import lru_cache
+
+STATEMENTS = {
+    "import ocw_oer_export": "import ocw_oer_export",
+    "import ocw_oer_export.cli": "import ocw_oer_export.cli",
+    "cli --help": (
+        "import sys; sys.argv = ['ocw_oer_export', '--help']\n"
+        "from ocw_oer_export import cli\n"
+        "try:\n"
+        "    cli.main()\n"
+        "except SystemExit:\n"
+        "    pass"
+    ),
+}
+
+# A line of -X importtime output: self and cumulative microseconds, and the module
+# name, indented by two spaces per level of nesting.
+IMPORT_TIME_PATTERN = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_with_importtime(code):
+    """Run code in a fresh interpreter, returning its (depth, cumulative us, module)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        check=True,
+        cwd=REPO_ROOT,
+        text=True,
+    )
+    imports = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_PATTERN.match(line)
+        if match:
+            _, cumulative, indent, module = match.groups()
+            imports.append(((len(indent) - 1) // 2, int(cumulative), module))
+    return imports
+
+
+@lru_cache(maxsize=None)
+def get_startup_modules():
+    """Modules imported by the interpreter's startup, before any code runs."""
+    return frozenset(module for _, _, module in run_with_importtime("pass"))
+
+
+def measure_imports(code):
+    """
+    Get the microseconds code spends importing modules, and the modules it imports,
+    excluding those already imported by the interpreter's startup.
+    """
+    startup_modules = get_startup_modules()
+    imports = [
+        (depth, cumulative, module)
+        for depth, cumulative, module in run_with_importtime(code)
+        if module not in startup_modules
+    ]
+    total = sum(cumulative for depth, cumulative, _ in imports if depth == 0)
+    return total, {module for _, _, module in imports}
+
+
+def main():
+    """Time each statement's imports, failing if one is slower than --max_ms."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--max_ms", type=float, default=None)
+    args = parser.parse_args()
+
+    slow_statements = []
+    for name, code in STATEMENTS.items():
+        totals = []
+        for _ in range(args.runs):
+            total, modules = measure_imports(code)
+            totals.append(total)
+        median_ms = statistics.median(totals) / 1000
+        print(f"{name:>26}: {median_ms:7.1f} ms, {len(modules)} modules")
+        if args.max_ms is not None and median_ms > args.max_ms:
+            slow_statements.append(name)
+    if slow_statements:
+        sys.exit(f"Slower than {args.max_ms} ms: {', '.join(slow_statements)}")
+
+
+if __name__ == "__main__":
+    main()
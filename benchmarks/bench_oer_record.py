@@ -0,0 +1,139 @@
+"""
+Benchmark of the compact OERRecord against the former 19-key dictionary per course.
+
+It compares the memory held by a list of transformed courses, the CPU time of the
+transform (with text_cleanup stubbed out, to isolate the building of rows) and the
+CPU time of writing the rows to a CSV file.
+
+Usage: python -m benchmarks.bench_oer_record --courses 100000
+"""
+import argparse
+import csv
+import importlib
+import os
+import tempfile
+import time
+import tracemalloc
+from unittest import mock
+
+from ocw_oer_export.create_csv import (
+    OER_FIELDNAMES,
+    get_cr_accessibility,
+    get_cr_authors,
+    get_cr_create_date,
+    get_cr_educational_use,
+    get_cr_keywords,
+    get_cr_subjects,
+    get_cr_sublevel,
+    load_mappings,
+    transform_single_course,
+)
+from ocw_oer_export.instrumentation import stage
+
+from .synthetic import generate_catalog
+
+create_csv_module = importlib.import_module("ocw_oer_export.create_csv")
+
+
+def dict_transform_single_course(course, ocw_topics_mapping, fm_ocw_keywords_mapping):
+    """Transform a course into a dictionary of every column, like before OERRecord."""
+    course_runs = course["runs"][0]
+    with stage("text_cleanup"):
+        abstract = create_csv_module.get_description_in_plain_text(
+            course_runs["description"]
+        )
+    return {
+        "CR_TITLE": course["title"],
+        "CR_URL": course_runs["url"],
+        "CR_MATERIAL_TYPE": "Full Course",
+        "CR_MEDIA_FORMATS": "Text/HTML",
+        "CR_SUBLEVEL": get_cr_sublevel(course_runs["level"]),
+        "CR_ABSTRACT": abstract,
+        "CR_LANGUAGE": "en",
+        "CR_COU_TITLE": "Creative Commons Attribution Non Commercial Share Alike 4.0",
+        "CR_PRIMARY_USER": "student|teacher",
+        "CR_SUBJECT": get_cr_subjects(ocw_topics_mapping, course["topics"]),
+        "CR_KEYWORDS": get_cr_keywords(
+            fm_ocw_keywords_mapping, course["topics"], course_runs["url"]
+        ),
+        "CR_CREATE_DATE": get_cr_create_date(
+            course_runs["semester"], course_runs["year"]
+        ),
+        "CR_AUTHOR_NAME": get_cr_authors(course_runs["instructors"]),
+        "CR_PROVIDER": "MIT",
+        "CR_PROVIDER_SET": "MIT OpenCourseWare",
+        "CR_COU_URL": "https://creativecommons.org/licenses/by-nc-sa/4.0/",
+        "CR_COU_COPYRIGHT_HOLDER": get_cr_authors(course_runs["instructors"]),
+        "CR_EDUCATIONAL_USE": get_cr_educational_use(course["course_feature"]),
+        "CR_ACCESSIBILITY": get_cr_accessibility(course["course_feature"]),
+    }
+
+
+def write_dicts(rows, output_path):
+    """Write dictionary rows with csv.DictWriter."""
+    with open(output_path, "w", newline="", encoding="utf-8") as csv_file:
+        writer = csv.DictWriter(csv_file, fieldnames=OER_FIELDNAMES)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_records(rows, output_path):
+    """Write OERRecords with csv.writer."""
+    with open(output_path, "w", newline="", encoding="utf-8") as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(OER_FIELDNAMES)
+        writer.writerows(row.as_row() for row in rows)
+
+
+def measure(transform, write, courses, mappings, output_path):
+    """Return the transform and write CPU seconds, and the MiB held by the rows."""
+    start = time.process_time()
+    rows = [transform(course, *mappings) for course in courses]
+    transform_time = time.process_time() - start
+
+    start = time.process_time()
+    write(rows, output_path)
+    write_time = time.process_time() - start
+
+    del rows
+    tracemalloc.start()
+    rows = [transform(course, *mappings) for course in courses]
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows
+    return transform_time, write_time, held / 1024 / 1024
+
+
+def main():
+    """Compare both row types on a synthetic catalog and check their CSVs agree."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--courses", type=int, default=100000)
+    args = parser.parse_args()
+
+    courses = generate_catalog(args.courses)
+    mappings = load_mappings()
+
+    with tempfile.TemporaryDirectory() as temp_dir, mock.patch.object(
+        create_csv_module, "get_description_in_plain_text", str.strip
+    ):
+        outputs = {}
+        for name, transform, write in [
+            ("dict", dict_transform_single_course, write_dicts),
+            ("record", transform_single_course, write_records),
+        ]:
+            outputs[name] = os.path.join(temp_dir, f"{name}.csv")
+            transform_time, write_time, held = measure(
+                transform, write, courses, mappings, outputs[name]
+            )
+            print(
+                f"{name:>7}: transform {transform_time:6.2f} s, "
+                f"write {write_time:6.2f} s, rows hold {held:8.1f} MiB"
+            )
+        with open(outputs["dict"], "rb") as dict_file, open(
+            outputs["record"], "rb"
+        ) as record_file:
+            assert dict_file.read() == record_file.read(), "CSV output changed"
+
+
+if __name__ == "__main__":
+    main()
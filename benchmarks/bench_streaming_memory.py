@@ -0,0 +1,70 @@
+"""
+Benchmark comparing the peak memory of the list-based and streaming API-to-CSV paths.
+
+Usage: python -m benchmarks.bench_streaming_memory --courses 5000
+"""
+import argparse
+import csv
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+
+from ocw_oer_export.client import OCWClient
+from ocw_oer_export.create_csv import OER_FIELDNAMES, create_csv, transform_data
+from tests.stub_api import StubAPIServer
+
+from .synthetic import generate_catalog
+
+
+def create_csv_from_lists(api_url, output_path):
+    """Reproduce the former path: extract every course, transform all, then write."""
+    with OCWClient() as client:
+        api_data = client.extract_data_from_api(api_url)
+    transformed_data = transform_data(api_data)
+    with open(output_path, "w", newline="", encoding="utf-8") as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(OER_FIELDNAMES)
+        writer.writerows(row.as_row() for row in transformed_data)
+
+
+def create_csv_streaming(api_url, output_path):
+    """Stream courses from the API through the transform into the CSV."""
+    with OCWClient() as client:
+        create_csv(
+            source="api", output_path=output_path, client=client, api_url=api_url
+        )
+
+
+def measure(function, *args):
+    """Run a function, returning its wall time in seconds and peak traced memory in MiB."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    function(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+
+def main():
+    """Run both paths against a local stub API and print their timings and peaks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--courses", type=int, default=5000)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    courses = generate_catalog(args.courses)
+    with StubAPIServer(courses) as stub, tempfile.TemporaryDirectory() as temp_dir:
+        output_path = os.path.join(temp_dir, "ocw_oer_export.csv")
+        for name, function in [
+            ("lists", create_csv_from_lists),
+            ("streaming", create_csv_streaming),
+        ]:
+            elapsed, peak = measure(function, stub.api_url, output_path)
+            print(f"{name:>10}: {elapsed:7.2f} s, peak {peak:8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
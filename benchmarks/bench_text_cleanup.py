@@ -0,0 +1,60 @@
+"""
+Micro-benchmark of utilities.text_cleanup per 1,000 course descriptions.
+
+It compares text_cleanup, with its per-thread Markdown converter and its fast path
+for plain text and common markup, with the former behavior of building a new
+converter and recompiling the regexes for every description.
+
+Usage: python -m benchmarks.bench_text_cleanup --descriptions 5000
+"""
+import argparse
+import re
+import time
+
+from markdown import Markdown
+
+from ocw_oer_export.utilities import text_cleanup
+from ocw_oer_export.utilities.text_cleanup import unmark_element
+
+from .synthetic import generate_catalog
+
+
+def uncached_text_cleanup(text):
+    """Clean up text like text_cleanup did before the converter was cached."""
+    Markdown.output_formats["plain"] = unmark_element
+    markdown_converter = Markdown(output_format="plain")
+    markdown_converter.stripTopLevelTags = False
+    stripped_markdown = markdown_converter.convert(text)
+    stripped_html = re.sub(re.compile("<.*?>"), "", stripped_markdown)
+    return re.sub(re.compile(r"\{\{.*?\}\}\n?"), "", stripped_html)
+
+
+def time_per_thousand(function, descriptions):
+    """Return the results and the seconds spent per 1,000 descriptions."""
+    start = time.perf_counter()
+    results = [function(description) for description in descriptions]
+    elapsed = time.perf_counter() - start
+    return results, elapsed * 1000 / len(descriptions)
+
+
+def main():
+    """Time both implementations on synthetic descriptions and check they agree."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--descriptions", type=int, default=5000)
+    args = parser.parse_args()
+
+    descriptions = [
+        course["runs"][0]["description"]
+        for course in generate_catalog(args.descriptions)
+    ]
+    before, before_time = time_per_thousand(uncached_text_cleanup, descriptions)
+    after, after_time = time_per_thousand(text_cleanup, descriptions)
+    assert before == after, "text_cleanup output changed"
+
+    print(f"before: {before_time:.3f} s per 1k descriptions")
+    print(f" after: {after_time:.3f} s per 1k descriptions")
+    print(f"speedup: {before_time / after_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
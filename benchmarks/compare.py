@@ -0,0 +1,42 @@
+"""
+Compare two benchmark result files written by benchmarks.run.
+
+Usage: python -m benchmarks.compare baseline.json candidate.json
+"""
+import argparse
+import json
+
+
+def load_results(path):
+    """Load a results file, keyed by (benchmark, courses)."""
+    with open(path, encoding="utf-8") as results_file:
+        results = json.load(results_file)["results"]
+    return {(result["benchmark"], result["courses"]): result for result in results}
+
+
+def compare(baseline, candidate):
+    """Generate a line per benchmark run in both files, with time and memory ratios."""
+    for key in sorted(baseline.keys() & candidate.keys(), key=lambda key: key[::-1]):
+        before, after = baseline[key], candidate[key]
+        line = (
+            f"{key[0]:>20} {key[1]:>8,} courses: "
+            f"{before['seconds']:9.3f} s -> {after['seconds']:9.3f} s "
+            f"({before['seconds'] / max(after['seconds'], 1e-9):5.2f}x)"
+        )
+        if "peak_mib" in before and "peak_mib" in after:
+            line += f", peak {before['peak_mib']:8.1f} -> {after['peak_mib']:8.1f} MiB"
+        yield line
+
+
+def main():
+    """Print the comparison of two results files."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    args = parser.parse_args()
+    for line in compare(load_results(args.baseline), load_results(args.candidate)):
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Benchmark harness timing and memory-profiling the export pipeline on synthetic catalogs.
+
+Every benchmark runs offline, against synthetic catalogs generated by
+synthetic.generate_catalog and a local stub of the paginated API. Results are
+printed and can be saved as JSON, to compare two runs with benchmarks.compare.
+
+Usage: python -m benchmarks.run --sizes 1000 10000 100000 --output results.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from ocw_oer_export.client import OCWClient
+from ocw_oer_export.create_csv import create_csv, transform_data
+from ocw_oer_export.data_handler import extract_data_from_json, iter_data_from_json
+from ocw_oer_export.utilities import normalize_keywords, text_cleanup
+from ocw_oer_export.utilities.normalize_keywords import titlecase_keyword
+from tests.stub_api import StubAPIServer
+
+from .synthetic import generate_catalog, generate_keywords
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+
+class Catalog:
+    """A synthetic catalog, its JSON dump and the stub API serving it."""
+
+    def __init__(self, courses, temp_dir, api_url):
+        self.courses = courses
+        self.json_path = os.path.join(temp_dir, "ocw_api_data.json")
+        self.output_path = os.path.join(temp_dir, "ocw_oer_export.csv")
+        self.api_url = api_url
+        self.descriptions = [course["runs"][0]["description"] for course in courses]
+        self.keywords = generate_keywords(len(courses))
+        with open(self.json_path, "w", encoding="utf-8") as json_file:
+            json.dump(courses, json_file)
+
+
+def bench_json_load(catalog):
+    """Load the JSON dump into a list."""
+    extract_data_from_json(catalog.json_path)
+
+
+def bench_json_stream(catalog):
+    """Stream the courses of the JSON dump one at a time."""
+    for _ in iter_data_from_json(catalog.json_path):
+        pass
+
+
+def bench_text_cleanup(catalog):
+    """Clean up every course description."""
+    for description in catalog.descriptions:
+        text_cleanup(description)
+
+
+def bench_normalize_keywords(catalog):
+    """Normalize one FM export keyword string per course, from a cold cache."""
+    titlecase_keyword.cache_clear()
+    for keywords in catalog.keywords:
+        normalize_keywords(keywords)
+
+
+def bench_transform_data(catalog):
+    """Transform every course into an OER row."""
+    transform_data(catalog.courses)
+
+
+def bench_fetch_api(catalog):
+    """Download every page of the stub API."""
+    with OCWClient() as client:
+        client.extract_data_from_api(catalog.api_url)
+
+
+def bench_create_csv_json(catalog):
+    """Create the CSV from the JSON dump."""
+    create_csv(
+        source="json", input_path=catalog.json_path, output_path=catalog.output_path
+    )
+
+
+def bench_create_csv_api(catalog):
+    """Create the CSV from the stub API."""
+    with OCWClient() as client:
+        create_csv(
+            output_path=catalog.output_path, client=client, api_url=catalog.api_url
+        )
+
+
+BENCHMARKS = {
+    "json_load": bench_json_load,
+    "json_stream": bench_json_stream,
+    "text_cleanup": bench_text_cleanup,
+    "normalize_keywords": bench_normalize_keywords,
+    "transform_data": bench_transform_data,
+    "fetch_api": bench_fetch_api,
+    "create_csv_json": bench_create_csv_json,
+    "create_csv_api": bench_create_csv_api,
+}
+
+
+def measure(function, catalog, repeat=1, memory=True):
+    """
+    Time a benchmark, keeping its best wall time out of repeat runs.
+
+    With memory, an extra run under tracemalloc measures its peak allocated memory,
+    so that tracing does not slow down the timed runs.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(catalog)
+        timings.append(time.perf_counter() - start)
+    result = {"seconds": round(min(timings), 4)}
+    if memory:
+        tracemalloc.start()
+        try:
+            function(catalog)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        result["peak_mib"] = round(peak / 1024 / 1024, 2)
+    return result
+
+
+def get_metadata():
+    """Describe the environment of a benchmark run, to tell results apart."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run_benchmarks(sizes, names, repeat=1, memory=True, seed=0):
+    """Run the named benchmarks on a synthetic catalog of each size."""
+    results = []
+    for size in sizes:
+        courses = generate_catalog(size, seed=seed)
+        with StubAPIServer(courses) as stub, tempfile.TemporaryDirectory() as temp_dir:
+            catalog = Catalog(courses, temp_dir, stub.api_url)
+            for name in names:
+                result = {
+                    "benchmark": name,
+                    "courses": size,
+                    **measure(BENCHMARKS[name], catalog, repeat, memory),
+                }
+                result["seconds_per_1k"] = round(result["seconds"] * 1000 / size, 4)
+                results.append(result)
+                print(format_result(result), flush=True)
+    return results
+
+
+def format_result(result):
+    """Format a benchmark result as a line of the results table."""
+    line = (
+        f"{result['benchmark']:>20} {result['courses']:>8,} courses: "
+        f"{result['seconds']:9.3f} s ({result['seconds_per_1k']:.3f} s per 1k)"
+    )
+    if "peak_mib" in result:
+        line += f", peak {result['peak_mib']:8.1f} MiB"
+    return line
+
+
+def main():
+    """Run the selected benchmarks and optionally save their results as JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument(
+        "--benchmarks", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS)
+    )
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--no_memory", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Path of the JSON results file")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    metadata = get_metadata()
+    results = run_benchmarks(
+        args.sizes, args.benchmarks, args.repeat, not args.no_memory, args.seed
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as results_file:
+            json.dump(
+                {"metadata": {**metadata, "seed": args.seed}, "results": results},
+                results_file,
+                indent=4,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Module for generating synthetic OCW catalogs of any size for benchmarks.
+"""
+import csv
+import itertools
+import os
+import random
+
+MAPPING_FILES_DIR = os.path.join(
+    os.path.dirname(__file__), "..", "ocw_oer_export", "mapping_files"
+)
+
+WORDS = (
+    "analysis design theory systems energy learning model data policy history "
+    "structure dynamics methods introduction advanced principles laboratory seminar "
+    "culture society economics computation networks materials biology chemistry "
+    "physics mathematics probability statistics writing research engineering music "
+    "language literature urban planning architecture management finance ethics"
+).split()
+
+FIRST_NAMES = ["Linda", "James", "Maria", "Wei", "Aisha", "David", "Elena", "Kenji"]
+LAST_NAMES = ["Rabieh", "Smith", "Garcia", "Chen", "Okafor", "Levine", "Rossi", "Sato"]
+LEVELS = ["Undergraduate", "Graduate", "High School", "Non-Credit"]
+SEMESTERS = ["Fall", "Spring", "Summer", "January IAP"]
+DEPARTMENTS = [
+    ("6", "Electrical Engineering and Computer Science"),
+    ("18", "Mathematics"),
+    ("21L", "Literature"),
+    ("11", "Urban Studies and Planning"),
+    ("CC", "Concourse"),
+]
+COURSE_FEATURES = [
+    "Lecture Notes",
+    "Lecture Videos",
+    "Problem Sets",
+    "Problem Sets with Solutions",
+    "Exams with Solutions",
+    "Written Assignments",
+    "Presentation Assignments",
+    "Instructor Insights",
+    "Projects with Examples",
+    "Image Gallery",
+    "Other Video",
+]
+
+
+def load_topic_names():
+    """Load the OCW topics of the topic-to-subject mapping file."""
+    path = os.path.join(MAPPING_FILES_DIR, "ocw_topic_to_oer_subject.csv")
+    with open(path, encoding="utf-8") as csv_file:
+        return [row["OCW Topic"] for row in csv.DictReader(csv_file)]
+
+
+def load_fm_keywords():
+    """Load the (course URL, raw keywords) pairs of the FM keywords export."""
+    path = os.path.join(MAPPING_FILES_DIR, "fm_keywords_export.csv")
+    with open(path, encoding="utf-8") as csv_file:
+        return [
+            (row["zze_courseURL"], row["zzd_keywords"])
+            for row in csv.DictReader(csv_file)
+        ]
+
+
+def generate_sentence(rng):
+    """Generate a sentence of random words."""
+    words = rng.choices(WORDS, k=rng.randint(8, 20))
+    return " ".join(words).capitalize() + "."
+
+
+def generate_description(rng):
+    """
+    Generate a course description as written in OCW Studio.
+
+    About a third are plain paragraphs; the others mix Markdown emphasis, links,
+    headings and lists with inline HTML and OCW Studio shortcodes.
+    """
+    paragraphs = [
+        " ".join(generate_sentence(rng) for _ in range(rng.randint(2, 5)))
+        for _ in range(rng.randint(1, 4))
+    ]
+    if rng.random() < 0.35:
+        return "\n\n".join(paragraphs) + "\n"
+
+    for index, paragraph in enumerate(paragraphs):
+        words = paragraph.split(" ")
+        position = rng.randrange(len(words))
+        markup = rng.choice(["bold", "italic", "link", "html", "shortcode"])
+        if markup == "bold":
+            words[position] = f"**{words[position]}**"
+        elif markup == "italic":
+            words[position] = f"_{words[position]}_"
+        elif markup == "link":
+            words[position] = f"[{words[position]}](https://ocw.mit.edu/search/)"
+        elif markup == "html":
+            words[position] = f"<em>{words[position]}</em>"
+        else:
+            words[position] = f"{words[position]}{{{{< br >}}}}"
+        paragraphs[index] = " ".join(words)
+    if rng.random() < 0.3:
+        paragraphs.insert(0, f"### {generate_sentence(rng)[:-1]}")
+    if rng.random() < 0.3:
+        paragraphs.append(
+            "\n".join(f"- {generate_sentence(rng)}" for _ in range(rng.randint(2, 5)))
+        )
+    if rng.random() < 0.2:
+        paragraphs.append(
+            "{{< tableopen >}}{{< tropen >}}{{< tdopen >}}"
+            f"{generate_sentence(rng)}"
+            "{{< tdclose >}}{{< trclose >}}{{< tableclose >}}"
+        )
+    return "\n\n".join(paragraphs) + "\n"
+
+
+def generate_catalog(count, seed=0):
+    """
+    Generate count random course records with the schema of the API's courses.
+
+    Records have realistic topics, levels, instructors, course features and Markdown/HTML
+    descriptions. Part of the course URLs come from the FM keywords export, so that the
+    keyword mapping is exercised, and every URL is distinct. The catalog only depends
+    on count and seed.
+    """
+    rng = random.Random(seed)
+    topic_names = load_topic_names()
+    fm_urls = sorted({url for url, _ in load_fm_keywords()})
+    rng.shuffle(fm_urls)
+
+    courses = []
+    for course_id in range(count):
+        title = " ".join(rng.choices(WORDS, k=rng.randint(2, 5))).title()
+        semester = rng.choice(SEMESTERS)
+        year = rng.randint(1999, 2024)
+        department_id, department_name = rng.choice(DEPARTMENTS)
+        slug = f"{department_id.lower()}-{course_id}-{title.lower().replace(' ', '-')}"
+        if fm_urls and rng.random() < 0.4:
+            url = fm_urls.pop()
+        else:
+            url = f"https://ocw.mit.edu/courses/{slug}-{semester.lower()}-{year}"
+        instructors = [
+            {
+                "id": rng.randint(1, 5000),
+                "first_name": rng.choice(FIRST_NAMES),
+                "last_name": rng.choice(LAST_NAMES),
+            }
+            for _ in range(rng.randint(1, 3))
+        ]
+        for instructor in instructors:
+            instructor[
+                "full_name"
+            ] = f"Prof. {instructor['first_name']} {instructor['last_name']}"
+        description = generate_description(rng)
+        last_modified = (
+            f"{rng.randint(2020, 2024)}-{rng.randint(1, 12):02d}-"
+            f"{rng.randint(1, 28):02d}T12:00:00Z"
+        )
+        image = {
+            "id": course_id,
+            "url": f"https://ocw.mit.edu/courses/{slug}/{course_id}.jpg",
+            "description": generate_sentence(rng),
+            "alt": generate_sentence(rng),
+        }
+        courses.append(
+            {
+                "id": course_id,
+                "topics": [
+                    {"id": index, "name": topic_names[index]}
+                    for index in rng.sample(range(len(topic_names)), rng.randint(1, 4))
+                ],
+                "offered_by": {"code": "ocw", "name": "OCW"},
+                "platform": {"code": "ocw", "name": "OCW"},
+                "course_feature": rng.sample(COURSE_FEATURES, rng.randint(0, 4)),
+                "departments": [
+                    {"department_id": department_id, "name": department_name}
+                ],
+                "certification": False,
+                "prices": [],
+                "runs": [
+                    {
+                        "id": course_id,
+                        "instructors": instructors,
+                        "image": image,
+                        "level": [
+                            {"code": level.lower().replace(" ", "-"), "name": level}
+                            for level in rng.sample(LEVELS, rng.randint(1, 2))
+                        ],
+                        "run_id": f"{rng.getrandbits(128):032x}",
+                        "title": title,
+                        "description": description,
+                        "full_description": None,
+                        "last_modified": last_modified,
+                        "published": True,
+                        "languages": None,
+                        "url": url,
+                        "slug": f"courses/{url.rsplit('/', 1)[-1]}",
+                        "availability": "Current",
+                        "semester": semester,
+                        "year": year,
+                        "start_date": None,
+                        "end_date": None,
+                        "enrollment_start": None,
+                        "enrollment_end": None,
+                        "prices": None,
+                        "checksum": None,
+                    }
+                ],
+                "image": image,
+                "readable_id": f"{department_id}.{course_id}",
+                "title": title,
+                "description": description,
+                "full_description": None,
+                "last_modified": last_modified,
+                "published": True,
+                "languages": None,
+                "url": None,
+                "professional": False,
+            }
+        )
+    return courses
+
+
+def generate_keywords(count):
+    """Generate count raw keyword strings by cycling through the FM keywords export."""
+    raw_keywords = [keywords for _, keywords in load_fm_keywords() if keywords]
+    return list(itertools.islice(itertools.cycle(raw_keywords), count))
@@ -1,8 +1,36 @@
 __all__ = ["create_json", "create_csv"]
 
+import importlib
 import logging
-
-from .create_csv import create_csv
-from .create_json import create_json
+import sys
+import types
 
 logging.root.setLevel(logging.INFO)
+
+
+class _Package(types.ModuleType):
+    """
+    The package, whose create_csv and create_json attributes are the functions, not
+    the submodules of the same name, whichever is imported first.
+    """
+
+    def __setattr__(self, name, value):
+        # The import system sets each submodule as an attribute once it is loaded.
+        if name in __all__ and isinstance(value, types.ModuleType):
+            value = getattr(value, name)
+        super().__setattr__(name, value)
+
+
+def __getattr__(name):
+    """Import the public functions on first use, with their submodules' dependencies."""
+    if name in __all__:
+        importlib.import_module(f".{name}", __name__)
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return [*globals(), *__all__]
+
+
+sys.modules[__name__].__class__ = _Package
@@ -0,0 +1,243 @@
+"""
+Module for writing the OER records and the API snapshot as Parquet or Arrow IPC files.
+
+Multi-valued OER columns, joined with '|' in the CSV, are stored as lists of strings.
+Files are written one row group (Parquet) or record batch (Arrow IPC) at a time as
+courses stream in, so that analytics jobs can read only the columns they need instead
+of parsing the whole CSV. Arrow IPC files are not compressed, so that they can be
+memory-mapped and read without copying.
+
+These formats require the optional pyarrow package.
+"""
+import json
+import logging
+import os
+
+from .instrumentation import increment, stage
+from .oer_record import MULTI_VALUED_FIELDS, OER_FIELDNAMES
+
+logger = logging.getLogger(__name__)
+
+# Format of each file extension.
+ARROW_FORMATS = {
+    ".parquet": "parquet",
+    ".arrow": "ipc",
+    ".feather": "ipc",
+}
+
+# Number of rows in each Parquet row group, or Arrow IPC record batch.
+ROW_GROUP_SIZE = 10_000
+
+
+def _pyarrow():
+    """Import the optional pyarrow package, with its Parquet and IPC modules."""
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as exc:
+        raise ImportError(
+            "Parquet and Arrow IPC files require the 'pyarrow' package, installed "
+            "with the 'arrow' extra."
+        ) from exc
+    return pyarrow
+
+
+def get_arrow_format(file_path):
+    """Get 'parquet' or 'ipc' from a file's extension, or None for other files."""
+    return ARROW_FORMATS.get(os.path.splitext(file_path)[1].lower())
+
+
+def is_arrow_path(file_path):
+    """Whether the file is a Parquet or Arrow IPC file, by its extension."""
+    return get_arrow_format(file_path) is not None
+
+
+def get_oer_schema():
+    """Arrow schema of the OER records, with the multi-valued columns as lists."""
+    pa = _pyarrow()
+    return pa.schema(
+        [
+            (
+                field,
+                pa.list_(pa.string()) if field in MULTI_VALUED_FIELDS else pa.string(),
+            )
+            for field in OER_FIELDNAMES
+        ]
+    )
+
+
+def get_snapshot_schema():
+    """
+    Arrow schema of the API snapshot: a few columns to filter courses on, and each
+    whole course as a JSON document.
+    """
+    pa = _pyarrow()
+    return pa.schema(
+        [
+            ("id", pa.int64()),
+            ("readable_id", pa.string()),
+            ("title", pa.string()),
+            ("url", pa.string()),
+            ("last_modified", pa.string()),
+            ("topics", pa.list_(pa.string())),
+            ("course_feature", pa.list_(pa.string())),
+            ("course", pa.string()),
+        ]
+    )
+
+
+def records_to_columns(records):
+    """Get the values of each OER column of OERRecords, with multi-valued ones split."""
+    columns = []
+    for field, values in zip(OER_FIELDNAMES, zip(*(r.as_row() for r in records))):
+        if field in MULTI_VALUED_FIELDS:
+            values = [value.split("|") if value else [] for value in values]
+        columns.append(values)
+    return columns
+
+
+def courses_to_columns(courses):
+    """Get the values of each snapshot column of API courses."""
+    return [
+        [course.get("id") for course in courses],
+        [course.get("readable_id") for course in courses],
+        [course.get("title") for course in courses],
+        [course.get("url") for course in courses],
+        [course.get("last_modified") for course in courses],
+        [
+            [topic.get("name") for topic in course.get("topics") or []]
+            for course in courses
+        ],
+        [course.get("course_feature") for course in courses],
+        [json.dumps(course, ensure_ascii=False) for course in courses],
+    ]
+
+
+class ArrowWriter:
+    """
+    Write rows to a Parquet or Arrow IPC file, one row group at a time.
+
+    Rows are buffered until row_group_size of them have arrived, then converted to
+    columns and written, so memory use is bounded by the row group size. The file is
+    written to a temporary path, which only replaces file_path on close.
+
+    file_path: A '.parquet', '.arrow' or '.feather' file.
+    schema: The Arrow schema of the file.
+    to_columns: A function getting the values of each column of a list of rows.
+    row_group_size: Number of rows per row group.
+    """
+
+    def __init__(self, file_path, schema, to_columns, row_group_size=ROW_GROUP_SIZE):
+        pa = _pyarrow()
+        self.format = get_arrow_format(file_path)
+        if self.format is None:
+            raise ValueError(
+                f"'{file_path}' is neither a Parquet nor an Arrow IPC file."
+            )
+        self.file_path = file_path
+        root, extension = os.path.splitext(file_path)
+        self.temp_path = f"{root}.tmp{extension}"
+        self.schema = schema
+        self.to_columns = to_columns
+        self.row_group_size = row_group_size
+        self.rows = []
+        self.count = 0
+        if self.format == "parquet":
+            self.writer = pa.parquet.ParquetWriter(self.temp_path, schema)
+        else:
+            self.writer = pa.ipc.new_file(self.temp_path, schema)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def write(self, row):
+        """Buffer a row, writing a row group once there are enough of them."""
+        self.rows.append(row)
+        if len(self.rows) >= self.row_group_size:
+            self.flush()
+
+    def write_rows(self, rows):
+        """Buffer rows, writing a row group every row_group_size rows."""
+        for row in rows:
+            self.write(row)
+
+    def iter_rows(self, rows):
+        """Pass rows through, writing them along the way."""
+        for row in rows:
+            self.write(row)
+            yield row
+
+    def flush(self):
+        """Write the buffered rows as a row group."""
+        if not self.rows:
+            return
+        pa = _pyarrow()
+        with stage("write_arrow"):
+            arrays = [
+                pa.array(values, type=field.type)
+                for field, values in zip(self.schema, self.to_columns(self.rows))
+            ]
+            self.writer.write_batch(pa.record_batch(arrays, schema=self.schema))
+        self.count += len(self.rows)
+        self.rows = []
+
+    def close(self):
+        """Write the last row group, and move the file in place."""
+        self.flush()
+        self.writer.close()
+        os.replace(self.temp_path, self.file_path)
+        increment("arrow_bytes", os.path.getsize(self.file_path))
+        logger.info(
+            "%s file '%s' successfully created with %d rows.",
+            "Parquet" if self.format == "parquet" else "Arrow IPC",
+            self.file_path,
+            self.count,
+        )
+
+    def discard(self):
+        """Remove the temporary file after a failed export."""
+        self.writer.close()
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+
+def oer_records_writer(file_path, row_group_size=ROW_GROUP_SIZE):
+    """ArrowWriter of OERRecords."""
+    return ArrowWriter(file_path, get_oer_schema(), records_to_columns, row_group_size)
+
+
+def snapshot_writer(file_path, row_group_size=ROW_GROUP_SIZE):
+    """ArrowWriter of API courses."""
+    return ArrowWriter(
+        file_path, get_snapshot_schema(), courses_to_columns, row_group_size
+    )
+
+
+def write_arrow_snapshot(pages, output_path, row_group_size=ROW_GROUP_SIZE):
+    """Write pages of API courses to a Parquet or Arrow IPC snapshot."""
+    with snapshot_writer(output_path, row_group_size) as writer:
+        for page in pages:
+            writer.write_rows(page)
+            increment("courses", len(page))
+
+
+def read_arrow_table(file_path, columns=None):
+    """
+    Read a Parquet or Arrow IPC file written by this module as an Arrow table.
+
+    The file is memory-mapped and, for Arrow IPC, read without copying. columns:
+    If set, the only columns read.
+    """
+    pa = _pyarrow()
+    if get_arrow_format(file_path) == "parquet":
+        return pa.parquet.read_table(file_path, columns=columns, memory_map=True)
+    with pa.memory_map(file_path) as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table if columns is None else table.select(columns)
@@ -0,0 +1,173 @@
+"""
+Module for fetching from the MIT OpenCourseWare API with asyncio.
+
+Requests are made with httpx's asyncio client, so that many pages are awaited
+concurrently on a single thread. They go through the RequestScheduler, HTTP cache and
+request timings of an OCWClient, so that asyncio and synchronous exports retry, rate
+limit and cache pages the same way.
+
+The asyncio client requires the optional httpx package.
+"""
+import asyncio
+import itertools
+import logging
+import time
+from collections import deque
+
+from .client import OCWClient, missing_window, page_url
+
+logger = logging.getLogger(__name__)
+
+
+def _httpx():
+    """Import the optional httpx package, needed by the asyncio client."""
+    try:
+        import httpx
+    except ImportError as exc:
+        raise ImportError(
+            "The asyncio client requires the 'httpx' package, installed with the "
+            "'async' extra."
+        ) from exc
+    return httpx
+
+
+class AsyncOCWClient:
+    """
+    asyncio client for the MIT OpenCourseWare API.
+
+    All requests go through a single pooled httpx.AsyncClient, with at most
+    `concurrency` of them in flight at any time.
+
+    client: The OCWClient whose page size, timeout, scheduler, HTTP cache and timings
+        are used (default: a new one, closed on exit).
+    concurrency: Maximum number of requests in flight at any time.
+    """
+
+    def __init__(self, client=None, concurrency=8):
+        httpx = _httpx()
+        self.owns_client = client is None
+        self.client = OCWClient() if client is None else client
+        self.concurrency = concurrency
+        self.retryable_errors = (httpx.TransportError,)
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.session = httpx.AsyncClient(
+            headers={"Accept-Encoding": "gzip, deflate"},
+            timeout=self.client.timeout,
+            limits=httpx.Limits(
+                max_connections=concurrency, max_keepalive_connections=concurrency
+            ),
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """Close the pooled connections, and the OCWClient if it was created here."""
+        await self.session.aclose()
+        if self.owns_client:
+            self.client.close()
+
+    async def make_request(self, api_url, page_size, offset=None):
+        """Make a request to the API through the client's scheduler, with retry logic."""
+        url = page_url(api_url, self.client.request_params(page_size, offset))
+        async with self.semaphore:
+            return await self.client.scheduler.call_async(
+                lambda: self.send_request(url, page_size), self.retryable_errors
+            )
+
+    async def send_request(self, url, page_size):
+        """Make a single timed request to the API, through the cache if any."""
+        start = time.perf_counter()
+        if self.client.cache is None:
+            response, from_cache = await self.session.get(url), False
+        else:
+            response, from_cache = await self.make_cached_request(url)
+        self.client.record_timing(
+            response, page_size, time.perf_counter() - start, from_cache
+        )
+        return response
+
+    async def make_cached_request(self, url):
+        """
+        Make a request through the HTTP cache, returning the response and whether it
+        was served from the cache.
+        """
+        entry, response = self.client.lookup_cache(url)
+        if response is not None:
+            return response, True
+        headers = (
+            self.client.cache.conditional_headers(entry) if entry is not None else {}
+        )
+        response = await self.session.get(url, headers=headers)
+        return self.client.update_cache(url, entry, response)
+
+    async def fetch_page(self, api_url, offset=None, page_size=None):
+        """Fetch and decode the page of results starting at the given offset."""
+        response = await self.make_request(
+            api_url, page_size or self.client.page_size, offset
+        )
+        return response.json()
+
+    async def fetch_window(self, api_url, offset, page_size, count):
+        """
+        Fetch the courses of the limit/offset window starting at offset, completing
+        the page with follow-up requests if the API returns fewer courses than asked.
+        """
+        page = await self.fetch_page(api_url, offset, page_size)
+        results = page.get("results", [])
+        while missing := missing_window(offset, len(results), page_size, count):
+            missing_offset, missing_limit = missing
+            missing_page = await self.fetch_page(api_url, missing_offset, missing_limit)
+            if not missing_page.get("results"):
+                break
+            results = results + missing_page["results"]
+        return results
+
+    async def iter_pages(self, api_url):
+        """
+        Generate the list of courses of each API page, in offset order.
+
+        After the first page reports the total count, and the page size the API
+        honors, up to `concurrency` of the remaining pages are requested at once, and
+        at most twice as many are fetched ahead of the consumer.
+        """
+        first_page = await self.fetch_page(api_url)
+        first_page_results = first_page.get("results", [])
+        yield first_page_results
+        if not first_page_results:
+            return
+
+        count = first_page["count"]
+        page_size = len(first_page_results)
+        offsets = iter(range(page_size, count, page_size))
+
+        def fetch_next_windows(num_windows):
+            return [
+                asyncio.ensure_future(
+                    self.fetch_window(api_url, offset, page_size, count)
+                )
+                for offset in itertools.islice(offsets, num_windows)
+            ]
+
+        pending = deque(fetch_next_windows(self.concurrency * 2))
+        try:
+            while pending:
+                page_results = await pending.popleft()
+                pending.extend(fetch_next_windows(1))
+                yield page_results
+        finally:
+            for task in pending:
+                task.cancel()
+        logger.info("API request timings: %s", self.client.timing_summary())
+
+
+async def extract_data_from_api_async(api_url, concurrency=8, client=None):
+    """Extract all data from the MIT OpenCourseWare API, fetching pages concurrently."""
+    api_data = []
+    async with AsyncOCWClient(client, concurrency) as async_client:
+        async for page_results in async_client.iter_pages(api_url):
+            api_data.extend(page_results)
+    return api_data
@@ -0,0 +1,93 @@
+"""
+Module for exporting with asyncio, overlapping API fetches with transform and writes.
+"""
+import asyncio
+import contextlib
+import logging
+
+from . import config
+from .async_client import AsyncOCWClient
+from .create_csv import write_oer_csv
+from .data_handler import JSONLinesWriter
+from .export import ExportAborted
+
+logger = logging.getLogger(__name__)
+
+# Queue item marking a failed download.
+_ABORT = object()
+
+
+async def create_csv_async(
+    output_path="/private/output/ocw_oer_export.csv",
+    api_url=None,
+    concurrency=8,
+    client=None,
+    json_output_path=None,
+    queue_size=4,
+    **options,
+):
+    """
+    Create the OER CSV file, and optionally a JSON Lines snapshot, from the API with asyncio.
+
+    A producer task downloads pages concurrently into a bounded queue, while a consumer
+    thread transforms the courses and writes their rows (and raw courses). Network and
+    CPU/disk work therefore run at the same time, and at most queue_size pages wait
+    between them.
+
+    output_path: The output path of the CSV file.
+    api_url: The API endpoint to fetch from (default: config.API_URL).
+    concurrency: Maximum number of API requests in flight.
+    client: The OCWClient making the requests.
+    json_output_path: If set, the path of a JSON Lines snapshot written alongside.
+    options: The options of create_csv.write_oer_csv (course_cache, workers,
+        delta_against, shards, text_cache and arrow_output_path).
+    """
+    api_url = api_url or config.API_URL
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=queue_size)
+
+    async def produce():
+        try:
+            async with AsyncOCWClient(client, concurrency) as async_client:
+                async for page_results in async_client.iter_pages(api_url):
+                    await queue.put(page_results)
+        except Exception:
+            await queue.put(_ABORT)
+            raise
+        await queue.put(None)
+
+    def iter_queued_courses(snapshot_writer):
+        """Generate the courses of the downloaded pages, in the consumer thread."""
+        while True:
+            page_results = asyncio.run_coroutine_threadsafe(queue.get(), loop).result()
+            if page_results is None:
+                return
+            if page_results is _ABORT:
+                raise ExportAborted("The API download failed.")
+            if snapshot_writer is not None:
+                snapshot_writer.write_page(page_results)
+            yield from page_results
+
+    def write_outputs():
+        with contextlib.ExitStack() as stack:
+            snapshot_writer = None
+            if json_output_path is not None:
+                snapshot_writer = stack.enter_context(JSONLinesWriter(json_output_path))
+            write_oer_csv(iter_queued_courses(snapshot_writer), output_path, **options)
+
+    producer = asyncio.ensure_future(produce())
+    try:
+        try:
+            await loop.run_in_executor(None, write_outputs)
+        except ExportAborted:
+            # Raise the download's own error instead.
+            await producer
+            raise
+        await producer
+    finally:
+        producer.cancel()
+
+
+def create_csv_with_asyncio(**kwargs):
+    """Run create_csv_async from synchronous code; see its arguments."""
+    asyncio.run(create_csv_async(**kwargs))
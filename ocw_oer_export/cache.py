@@ -0,0 +1,334 @@
+"""
+Module for persistent, SQLite-backed caches that let repeated exports skip unchanged work.
+"""
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+from .instrumentation import increment
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = "/private/output/ocw_cache.sqlite3"
+
+# Number of new or used TextCache entries buffered before they are written.
+TEXT_CACHE_BATCH_SIZE = 500
+
+
+class SQLiteCache:
+    """
+    Base class holding a thread-safe SQLite connection to a cache file.
+
+    Subclasses declare their table in `schema`.
+    """
+
+    schema = ""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.connection:
+            self.connection.executescript(self.schema)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Close the cache file."""
+        self.connection.close()
+
+
+class HTTPCache(SQLiteCache):
+    """
+    Cache of API responses keyed by page URL, revalidated with ETag/Last-Modified.
+
+    ttl: Seconds during which a stored page is reused without contacting the API at all.
+    max_age: Seconds after which a page that has not been used is evicted.
+    max_bytes: Total size of stored bodies above which the least recently used are evicted.
+    """
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS http_responses (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            body BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            stored_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        );
+    """
+
+    def __init__(
+        self,
+        path=DEFAULT_CACHE_PATH,
+        ttl=0,
+        max_age=30 * 24 * 60 * 60,
+        max_bytes=500 * 1024 * 1024,
+    ):
+        super().__init__(path)
+        self.ttl = ttl
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+
+    def get(self, url):
+        """
+        Get the stored entry for a URL as a dict, or None.
+
+        The entry's `fresh` flag tells whether it can be used without revalidation.
+        """
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT etag, last_modified, body, stored_at FROM http_responses "
+                "WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, body, stored_at = row
+        return {
+            "etag": etag,
+            "last_modified": last_modified,
+            "body": body,
+            "fresh": time.time() - stored_at < self.ttl,
+        }
+
+    @staticmethod
+    def conditional_headers(entry):
+        """Build the headers asking the API to answer 304 if the entry is still valid."""
+        headers = {}
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url, body, etag=None, last_modified=None):
+        """Store a response body and its validators."""
+        now = time.time()
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO http_responses "
+                "(url, etag, last_modified, body, size, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, body, len(body), now, now),
+            )
+
+    def touch(self, url, revalidated=False):
+        """Mark an entry as used, and as just validated by the API if revalidated."""
+        now = time.time()
+        with self.lock, self.connection:
+            if revalidated:
+                self.connection.execute(
+                    "UPDATE http_responses SET accessed_at = ?, stored_at = ? "
+                    "WHERE url = ?",
+                    (now, now, url),
+                )
+            else:
+                self.connection.execute(
+                    "UPDATE http_responses SET accessed_at = ? WHERE url = ?",
+                    (now, url),
+                )
+
+    def evict(self):
+        """Evict entries unused for longer than max_age, then the LRU ones over max_bytes."""
+        with self.lock, self.connection:
+            self.connection.execute(
+                "DELETE FROM http_responses WHERE accessed_at < ?",
+                (time.time() - self.max_age,),
+            )
+            (total_bytes,) = self.connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM http_responses"
+            ).fetchone()
+            if total_bytes <= self.max_bytes:
+                return
+            rows = self.connection.execute(
+                "SELECT url, size FROM http_responses ORDER BY accessed_at"
+            ).fetchall()
+            evicted_urls = []
+            for url, size in rows:
+                if total_bytes <= self.max_bytes:
+                    break
+                evicted_urls.append((url,))
+                total_bytes -= size
+            self.connection.executemany(
+                "DELETE FROM http_responses WHERE url = ?", evicted_urls
+            )
+            logger.info("Evicted %d responses from the HTTP cache.", len(evicted_urls))
+
+    def close(self):
+        """Evict the unused and least recently used entries and close the file."""
+        self.evict()
+        super().close()
+
+
+class CourseCache(SQLiteCache):
+    """
+    Cache of transformed OER rows keyed by course id and the hash of the course's content.
+
+    A course whose content hash (salted with the mapping files' fingerprint) is unchanged
+    since the last run gets its previously transformed row back instead of being
+    transformed again.
+    """
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS transformed_courses (
+            course_id TEXT PRIMARY KEY,
+            content_hash TEXT NOT NULL,
+            row TEXT NOT NULL
+        );
+    """
+
+    @staticmethod
+    def content_hash(course, salt=""):
+        """Hash a course record independently of its key order."""
+        content = json.dumps(course, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256((salt + content).encode("utf-8")).hexdigest()
+
+    def get(self, course_id, content_hash):
+        """Get the stored row for a course if its content hash is unchanged, else None."""
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT row FROM transformed_courses "
+                "WHERE course_id = ? AND content_hash = ?",
+                (str(course_id), content_hash),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def store(self, entries):
+        """Store (course_id, content_hash, row) entries in a single transaction."""
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO transformed_courses "
+                "(course_id, content_hash, row) VALUES (?, ?, ?)",
+                (
+                    (str(course_id), content_hash, json.dumps(row, ensure_ascii=False))
+                    for course_id, content_hash, row in entries
+                ),
+            )
+
+
+class TextCache(SQLiteCache):
+    """
+    Content-addressed cache of text processing results, e.g. cleaned descriptions.
+
+    Results are keyed by a hash of the input text, the processing function's name and
+    its version tag, so a text is only processed again when it changes or the version
+    tag of its processing code is bumped. New results and the use of stored ones are
+    buffered, and written in batches by flush.
+
+    A TextCache can be pickled, e.g. to transform processes, which then open their own
+    connection to the same file.
+
+    max_bytes: Total size of stored results above which the least recently used are evicted.
+    """
+
+    schema = """
+        CREATE TABLE IF NOT EXISTS text_results (
+            key TEXT PRIMARY KEY,
+            result TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            accessed_at REAL NOT NULL
+        );
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=100 * 1024 * 1024):
+        super().__init__(path)
+        self.max_bytes = max_bytes
+        self.stats = Counter()
+        self.new_results = {}
+        self.used_keys = set()
+
+    def __reduce__(self):
+        return (self.__class__, (self.path, self.max_bytes))
+
+    @staticmethod
+    def make_key(name, version, text):
+        """Hash a text with the name and version tag of the function processing it."""
+        content = f"{name}\0{version}\0{text}".encode("utf-8")
+        return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+    def get_or_compute(self, name, version, function, text):
+        """Get the stored result of function(text), computing and buffering it on a miss."""
+        key = self.make_key(name, version, text)
+        with self.lock:
+            result = self.new_results.get(key)
+            if result is None:
+                row = self.connection.execute(
+                    "SELECT result FROM text_results WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    result = row[0]
+                    self.used_keys.add(key)
+        if result is None:
+            self.stats["misses"] += 1
+            increment("text_cache_misses")
+            result = function(text)
+            with self.lock:
+                self.new_results[key] = result
+        else:
+            self.stats["hits"] += 1
+            increment("text_cache_hits")
+
+        if len(self.new_results) + len(self.used_keys) >= TEXT_CACHE_BATCH_SIZE:
+            self.flush()
+        return result
+
+    def flush(self):
+        """Store the buffered results, and mark the stored results used since as used now."""
+        now = time.time()
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO text_results (key, result, size, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    (key, result, len(result.encode("utf-8")), now)
+                    for key, result in self.new_results.items()
+                ),
+            )
+            self.connection.executemany(
+                "UPDATE text_results SET accessed_at = ? WHERE key = ?",
+                ((now, key) for key in self.used_keys),
+            )
+            self.new_results = {}
+            self.used_keys = set()
+
+    def evict(self):
+        """Evict the least recently used results while their total size is over max_bytes."""
+        with self.lock, self.connection:
+            (total_bytes,) = self.connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM text_results"
+            ).fetchone()
+            if total_bytes <= self.max_bytes:
+                return
+            rows = self.connection.execute(
+                "SELECT key, size FROM text_results ORDER BY accessed_at"
+            ).fetchall()
+            evicted_keys = []
+            for key, size in rows:
+                if total_bytes <= self.max_bytes:
+                    break
+                evicted_keys.append((key,))
+                total_bytes -= size
+            self.connection.executemany(
+                "DELETE FROM text_results WHERE key = ?", evicted_keys
+            )
+            self.stats["evictions"] += len(evicted_keys)
+            logger.info("Evicted %d results from the text cache.", len(evicted_keys))
+
+    def close(self):
+        """Flush buffered results, evict the least recently used ones and close the file."""
+        self.flush()
+        self.evict()
+        logger.info(
+            "Text cache: %d hits, %d misses.", self.stats["hits"], self.stats["misses"]
+        )
+        super().close()
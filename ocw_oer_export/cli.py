@@ -2,11 +2,12 @@
 Command-line interface (CLI) for the OCW OER Export Project.
 
 This module provides a CLI to generate JSON or CSV files containing
-MIT OpenCourseWare courses' metadata.
+MIT OpenCourseWare courses' metadata. With both --create_csv and --create_json,
+both files are written from a single download of the API data. With --serve, both
+are served over HTTP by a long-running process that refreshes them in the background.
 """
 import argparse
-from .create_csv import create_csv
-from .create_json import create_json
+from datetime import timedelta
 
 
 def main():
@@ -26,23 +27,298 @@ def main():
     parser.add_argument(
         "--input_path",
         default="/private/output/ocw_api_data.json",
-        help="Input path for the JSON file",
+        help="Input path for the JSON or JSON Lines file, compressed or not",
     )
     parser.add_argument(
         "--output_path",
-        default="/private/output/ocw_oer_export.csv",
-        help="Output path for the CSV file",
+        default=None,
+        help="Output path for the CSV file, or for the JSON file of --create_json "
+        "alone (default: /private/output/ocw_oer_export.csv, or "
+        "/private/output/ocw_api_data with the --snapshot_format extension)",
+    )
+    parser.add_argument(
+        "--json_output_path",
+        default=None,
+        help="Output path for the JSON file of --create_json, whose extension picks "
+        "its format (default: as --output_path)",
+    )
+    parser.add_argument(
+        "--fetch_workers",
+        type=int,
+        default=None,
+        help="Number of API pages to fetch concurrently (default: sequential)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of processes transforming courses in parallel (default: serial)",
+    )
+    parser.add_argument(
+        "--arrow_output_path",
+        default=None,
+        help="With --create_csv, also write the records to this Parquet ('.parquet') "
+        "or Arrow IPC ('.arrow', '.feather') file (requires pyarrow)",
+    )
+    parser.add_argument(
+        "--page_size",
+        type=int,
+        default=100,
+        help="Number of courses requested per API page (default: 100)",
+    )
+    parser.add_argument(
+        "--adaptive_page_size",
+        action="store_true",
+        help="Grow the API page size until latency or payload size reaches its target",
+    )
+    parser.add_argument(
+        "--rate_limit",
+        type=float,
+        default=None,
+        help="Maximum number of API requests per second (default: no limit)",
+    )
+    parser.add_argument(
+        "--use_cache",
+        action="store_true",
+        help="Reuse unchanged API pages, transformed courses and cleaned up texts "
+        "from previous runs",
+    )
+    parser.add_argument(
+        "--cache_path",
+        default=None,
+        help="Path of the SQLite cache file used with --use_cache "
+        "(default: /private/output/ocw_cache.sqlite3)",
+    )
+    parser.add_argument(
+        "--snapshot_format",
+        choices=["json", "jsonl", "jsonl.gz", "jsonl.zst", "parquet", "arrow"],
+        default="json",
+        help="Format of the JSON file created by --create_json (default: json)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Resume an interrupted JSON Lines download from its last complete page",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="With --create_json, only fetch the courses modified since the previous "
+        "incremental run and merge them into its snapshot",
+    )
+    parser.add_argument(
+        "--full_sweep_days",
+        type=float,
+        default=7,
+        help="With --incremental, fetch the whole catalog again after this many days, "
+        "to drop deleted courses (default: 7)",
+    )
+    parser.add_argument(
+        "--use_async",
+        action="store_true",
+        help="Fetch API pages with asyncio while transforming and writing the CSV",
+    )
+    parser.add_argument(
+        "--delta_against",
+        metavar="PATH",
+        default=None,
+        help="Also write the rows added, changed and removed since this previous CSV",
+    )
+    parser.add_argument(
+        "--shard_rows",
+        type=int,
+        default=None,
+        help="Split the CSV into shards of at most this many rows",
+    )
+    parser.add_argument(
+        "--shard_bytes",
+        type=int,
+        default=None,
+        help="Split the CSV into shards of at most this many bytes",
+    )
+    parser.add_argument(
+        "--shard_writers",
+        type=int,
+        default=4,
+        help="Number of CSV shards written concurrently (default: 4)",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Serve the CSV and JSON files over HTTP, refreshed in the background",
+    )
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="Address --serve listens on (default: 127.0.0.1)",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8000,
+        help="Port --serve listens on (default: 8000)",
+    )
+    parser.add_argument(
+        "--refresh_minutes",
+        type=float,
+        default=60,
+        help="With --serve, minutes between two refreshes of the catalog (default: 60)",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        default=None,
+        help="Write a cProfile dump of the run to PATH, for pstats or snakeviz",
     )
     args = parser.parse_args()
 
-    if args.create_csv:
-        create_csv(
-            source=args.source, input_path=args.input_path, output_path=args.output_path
-        )
+    json_output_path = (
+        args.json_output_path or f"/private/output/ocw_api_data.{args.snapshot_format}"
+    )
+    if args.serve and (args.create_csv or args.create_json):
+        parser.error("--serve cannot be combined with --create_csv or --create_json")
+    if args.use_async and (not args.create_csv or args.source != "api"):
+        parser.error("--use_async only applies to --create_csv with --source=api")
+    if args.create_csv and args.create_json:
+        if args.source != "api" or args.incremental or args.resume or args.use_async:
+            parser.error(
+                "--create_csv with --create_json exports from a single API download, "
+                "without --source=json, --incremental, --resume or --use_async"
+            )
+        output_path = args.output_path or "/private/output/ocw_oer_export.csv"
+    elif args.create_csv:
+        output_path = args.output_path or "/private/output/ocw_oer_export.csv"
     elif args.create_json:
-        create_json()
-    else:
+        output_path = args.json_output_path or args.output_path or json_output_path
+    elif not args.serve:
         parser.print_help()
+        return
+
+    # The export pipeline is imported once there is a command to run, and each command
+    # only imports its own modules, so that --help does not load their dependencies.
+    from .cache import DEFAULT_CACHE_PATH, CourseCache, HTTPCache, TextCache
+    from .client import OCWClient
+    from .instrumentation import collect_run_stats, profile
+
+    cache_path = args.cache_path or DEFAULT_CACHE_PATH
+    http_cache = HTTPCache(cache_path) if args.use_cache else None
+    course_cache = CourseCache(cache_path) if args.use_cache else None
+    text_cache = TextCache(cache_path) if args.use_cache else None
+    client = OCWClient(
+        page_size=args.page_size,
+        adaptive_page_size=args.adaptive_page_size,
+        max_workers=args.fetch_workers,
+        cache=http_cache,
+        rate_limit=args.rate_limit,
+    )
+
+    if args.serve:
+        from .service import serve
+
+        serve(
+            args.host,
+            args.port,
+            client=client,
+            refresh_interval=args.refresh_minutes * 60,
+            course_cache=course_cache,
+            text_cache=text_cache,
+            workers=args.workers,
+        )
+        close_caches(http_cache, course_cache, text_cache)
+        return
+
+    failures = {}
+
+    with collect_run_stats() as run_stats, profile(args.profile):
+        with run_stats.stage("total"):
+            if args.create_csv and args.create_json:
+                from .export import csv_sink, export, json_snapshot_sink
+
+                failures = export(
+                    [
+                        csv_sink(
+                            output_path,
+                            course_cache=course_cache,
+                            workers=args.workers,
+                            delta_against=args.delta_against,
+                            shard_rows=args.shard_rows,
+                            shard_bytes=args.shard_bytes,
+                            shard_writers=args.shard_writers,
+                            text_cache=text_cache,
+                            arrow_output_path=args.arrow_output_path,
+                        ),
+                        json_snapshot_sink(json_output_path),
+                    ],
+                    client=client,
+                )
+            elif args.use_async:
+                from .async_export import create_csv_with_asyncio
+
+                create_csv_with_asyncio(
+                    output_path=output_path,
+                    concurrency=args.fetch_workers or 8,
+                    client=client,
+                    course_cache=course_cache,
+                    workers=args.workers,
+                    delta_against=args.delta_against,
+                    shard_rows=args.shard_rows,
+                    shard_bytes=args.shard_bytes,
+                    shard_writers=args.shard_writers,
+                    text_cache=text_cache,
+                    arrow_output_path=args.arrow_output_path,
+                )
+            elif args.create_csv:
+                from .create_csv import create_csv
+
+                create_csv(
+                    source=args.source,
+                    input_path=args.input_path,
+                    output_path=output_path,
+                    client=client,
+                    course_cache=course_cache,
+                    workers=args.workers,
+                    delta_against=args.delta_against,
+                    shard_rows=args.shard_rows,
+                    shard_bytes=args.shard_bytes,
+                    shard_writers=args.shard_writers,
+                    text_cache=text_cache,
+                    arrow_output_path=args.arrow_output_path,
+                )
+            else:
+                from .create_json import create_json
+
+                create_json(
+                    output_path=output_path,
+                    client=client,
+                    resume=args.resume,
+                    incremental=args.incremental,
+                    full_sweep_interval=timedelta(days=args.full_sweep_days),
+                )
+            close_caches(http_cache, course_cache, text_cache)
+    run_stats.write_summary(
+        f"{output_path}.summary.json",
+        command=get_command_name(args),
+        output_path=output_path,
+        arguments=vars(args),
+        scheduler=client.scheduler.metrics.as_dict(),
+        failed_sinks=sorted(failures),
+    )
+    if failures:
+        parser.exit(1, f"Failed exports: {', '.join(sorted(failures))}\n")
+
+
+def close_caches(*caches):
+    """Close the caches that are set, evicting their old entries."""
+    for cache in caches:
+        if cache is not None:
+            cache.close()
+
+
+def get_command_name(args):
+    """Name of the command run, in the run summary."""
+    if args.create_csv and args.create_json:
+        return "export"
+    return "create_csv" if args.create_csv else "create_json"
 
 
 if __name__ == "__main__":
@@ -1,52 +1,445 @@
 """
 Module for interacting with the MIT OpenCourseWare API.
 """
-import math
+import itertools
 import logging
+import statistics
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
-from retry import retry
+from requests.adapters import HTTPAdapter
 from tqdm import tqdm
 
+from .instrumentation import increment, observe
+from .scheduler import RateLimiter, RequestScheduler
+
 logging.basicConfig(level=logging.ERROR)
 logger = logging.getLogger(__name__)
 
+RequestTiming = namedtuple(
+    "RequestTiming",
+    ["url", "status_code", "page_size", "elapsed", "num_bytes", "from_cache"],
+    defaults=[False],
+)
+
+# Number of most recent request timings an OCWClient keeps, so that a long-lived client
+# does not grow without bound.
+MAX_RECORDED_TIMINGS = 10_000
+
+
+def page_url(next_page, params):
+    """Get the URL of a page of results, with the query parameters encoded."""
+    return requests.Request("GET", next_page, params=params).prepare().url
+
+
+def missing_window(window_offset, num_results, page_size, count):
+    """
+    Get the (offset, limit) of the courses still missing from the limit/offset window
+    starting at window_offset, of which num_results were received, or None once the
+    window is complete or nothing was received.
+    """
+    window_end = min(window_offset + page_size, count)
+    received_end = window_offset + num_results
+    if not num_results or received_end >= window_end:
+        return None
+    return received_end, window_end - received_end
+
+
+def cached_response(url, body):
+    """Build a successful response object around a body served from the HTTP cache."""
+    response = requests.Response()
+    response.url = url
+    response.status_code = 200
+    response._content = body
+    response.headers["Content-Type"] = "application/json"
+    return response
+
+
+class OCWClient:
+    """
+    Reusable client for the MIT OpenCourseWare API.
+
+    All requests go through a single pooled requests.Session, so connections are kept
+    alive between pages and responses are gzip-compressed. Every request is timed and
+    the most recent MAX_RECORDED_TIMINGS are recorded in `timings`.
+
+    Requests go through a RequestScheduler, which retries transient failures with
+    backoff, honors Retry-After and rate limits all the concurrent requests together.
+
+    With an HTTPCache, pages are revalidated with conditional requests and served from
+    the cache when the API answers 304 Not Modified.
+
+    page_size: Number of courses requested per page.
+    adaptive_page_size: Double the page size after each sequential page until a page
+        takes longer than target_latency seconds or is larger than target_bytes,
+        halving it again when a target is exceeded.
+    max_workers: Number of pages fetched concurrently after the first one.
+    pool_size: Maximum number of kept-alive connections per host.
+    cache: An HTTPCache storing the pages between runs.
+    rate_limit: Maximum average number of requests per second (default: no limit).
+    scheduler: The RequestScheduler to use instead of a default one.
+    """
+
+    def __init__(
+        self,
+        page_size=100,
+        adaptive_page_size=False,
+        min_page_size=10,
+        max_page_size=1000,
+        target_latency=2.0,
+        target_bytes=5_000_000,
+        max_workers=None,
+        pool_size=10,
+        timeout=60,
+        cache=None,
+        rate_limit=None,
+        scheduler=None,
+    ):
+        self.page_size = page_size
+        self.adaptive_page_size = adaptive_page_size
+        self.min_page_size = min_page_size
+        self.max_page_size = max_page_size
+        self.target_latency = target_latency
+        self.target_bytes = target_bytes
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.cache = cache
+        self.timings = deque(maxlen=MAX_RECORDED_TIMINGS)
+        if scheduler is None:
+            scheduler = RequestScheduler(
+                rate_limiter=RateLimiter(rate_limit, burst=max_workers or 1)
+            )
+        self.scheduler = scheduler
+
+        self.session = requests.Session()
+        self.session.headers.update({"Accept-Encoding": "gzip, deflate"})
+        adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=max(pool_size, max_workers or 1)
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Close the pooled connections."""
+        self.session.close()
+
+    def reset_timings(self):
+        """Forget the recorded request timings, e.g. before a new download."""
+        self.timings.clear()
+
+    def make_request(self, next_page, page_size, offset=None):
+        """
+        Make a request to the API through the scheduler, with retry logic.
+        """
+        params = self.request_params(page_size, offset)
+        return self.scheduler.call(
+            lambda: self.send_request(next_page, params, page_size)
+        )
+
+    @staticmethod
+    def request_params(page_size, offset=None):
+        """Get the query parameters requesting page_size courses from the offset."""
+        params = {"limit": page_size}
+        if offset is not None:
+            params["offset"] = offset
+        return params
+
+    def send_request(self, next_page, params, page_size):
+        """Make a single timed request to the API, through the cache if any."""
+        start = time.perf_counter()
+        if self.cache is None:
+            response = self.session.get(next_page, params=params, timeout=self.timeout)
+            from_cache = False
+        else:
+            response, from_cache = self.make_cached_request(next_page, params)
+        self.record_timing(response, page_size, time.perf_counter() - start, from_cache)
+        return response
+
+    def record_timing(self, response, page_size, elapsed, from_cache):
+        """Record the timing of a request, and count it in the run's metrics."""
+        timing = RequestTiming(
+            url=str(response.url),
+            status_code=response.status_code,
+            page_size=page_size,
+            elapsed=elapsed,
+            num_bytes=len(response.content),
+            from_cache=from_cache,
+        )
+        self.timings.append(timing)
+        increment("requests")
+        increment("response_bytes", timing.num_bytes)
+        increment("requests_from_cache", int(from_cache))
+        observe("request_seconds", timing.elapsed)
+
+    def make_cached_request(self, next_page, params):
+        """
+        Make a request through the HTTP cache, returning the response and whether it
+        was served from the cache.
+        """
+        url = page_url(next_page, params)
+        entry, response = self.lookup_cache(url)
+        if response is not None:
+            return response, True
+        headers = self.cache.conditional_headers(entry) if entry is not None else {}
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        return self.update_cache(url, entry, response)
+
+    def lookup_cache(self, url):
+        """
+        Look up a page in the HTTP cache, returning its entry, if any, and the cached
+        response if the entry is fresh enough to be served without revalidation.
+        """
+        entry = self.cache.get(url)
+        if entry is not None and entry["fresh"]:
+            self.cache.touch(url)
+            return entry, cached_response(url, entry["body"])
+        return entry, None
+
+    def update_cache(self, url, entry, response):
+        """
+        Store a page received from the API in the HTTP cache, or serve the cached entry
+        if the API answered 304 Not Modified. Returns the response and whether it was
+        served from the cache.
+        """
+        if entry is not None and response.status_code == 304:
+            self.cache.touch(url, revalidated=True)
+            return cached_response(url, entry["body"]), True
+        if response.status_code == 200:
+            self.cache.store(
+                url,
+                response.content,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+        return response, False
 
-@retry(tries=3, delay=2, logger=logger)
-def make_request(next_page, page_size):
+    def fetch_page(self, api_url, page_size, offset=None):
+        """Fetch and decode the page of results starting at the given offset."""
+        return self.make_request(api_url, page_size, offset).json()
+
+    def next_page_size(self, page_size, timing):
+        """Pick the size of the next page from how long the last one took and weighed."""
+        if timing.elapsed > self.target_latency or timing.num_bytes > self.target_bytes:
+            return max(page_size // 2, self.min_page_size)
+        if (
+            timing.elapsed * 2 <= self.target_latency
+            and timing.num_bytes * 2 <= self.target_bytes
+        ):
+            return min(page_size * 2, self.max_page_size)
+        return page_size
+
+    def paginated_response(self, api_url, offset=0):
+        """
+        Generate paginated responses from the API, starting at the given offset.
+
+        With adaptive page sizing the offsets are computed locally, since the 'next'
+        links returned by the API carry the previous page's limit.
+        """
+        if not self.adaptive_page_size:
+            next_page, page_offset = api_url, offset or None
+            while next_page:
+                data = self.fetch_page(next_page, self.page_size, page_offset)
+                next_page, page_offset = data.get("next"), None
+                yield data
+            return
+
+        page_size = self.page_size
+        while True:
+            data = self.fetch_page(api_url, page_size, offset)
+            yield data
+            offset += len(data.get("results", []))
+            if not data.get("next") or offset >= data["count"]:
+                return
+            page_size = self.next_page_size(page_size, self.timings[-1])
+
+    def concurrent_paginated_response(self, api_url, count, offset, page_size):
+        """
+        Generate the pages from the given offset onwards by requesting every remaining
+        limit/offset window concurrently.
+
+        page_size is the number of courses the API actually returned for the first page,
+        which may be fewer than requested if the API caps the limit. A page returned
+        shorter than its window is completed with follow-up requests, so that no course
+        is skipped. Pages are yielded in offset order, regardless of the order in which
+        they complete. At most twice max_workers pages are requested ahead of the
+        consumer, so memory stays bounded when the pages are consumed slower than they
+        are downloaded.
+        """
+        offsets = iter(range(offset, count, page_size))
+        window = deque()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+
+            def submit(page_offset):
+                future = executor.submit(
+                    self.fetch_page, api_url, page_size, page_offset
+                )
+                window.append((page_offset, future))
+
+            for page_offset in itertools.islice(offsets, self.max_workers * 2):
+                submit(page_offset)
+            while window:
+                page_offset, future = window.popleft()
+                page = future.result()
+                for next_offset in itertools.islice(offsets, 1):
+                    submit(next_offset)
+                results = page.get("results", [])
+                while missing := missing_window(
+                    page_offset, len(results), page_size, count
+                ):
+                    missing_offset, missing_limit = missing
+                    missing_results = self.fetch_page(
+                        api_url, missing_limit, missing_offset
+                    ).get("results", [])
+                    if not missing_results:
+                        break
+                    results = results + missing_results
+                yield dict(page, results=results)
+
+    def iter_pages(self, api_url, offset=0):
+        """
+        Generate the list of courses of each API page, as soon as the page arrives,
+        starting at the given offset.
+
+        The first page is always fetched on its own to learn the total count and the
+        page size the API honors. If max_workers is greater than 1, the remaining pages
+        are then fetched concurrently by offset instead of following the 'next' links
+        one at a time. A warning is logged if the number of courses received differs
+        from the count announced by the API.
+        """
+        pages = self.paginated_response(api_url, offset)
+
+        first_page = next(pages)
+        first_page_results = first_page.get("results", [])
+        count = first_page["count"]
+        yield first_page_results
+
+        if self.max_workers is not None and self.max_workers > 1 and first_page_results:
+            pages.close()
+            pages = self.concurrent_paginated_response(
+                api_url,
+                count,
+                offset + len(first_page_results),
+                len(first_page_results),
+            )
+
+        # Remaining pages
+        num_courses = offset + len(first_page_results)
+        with tqdm(
+            desc="Loading data from MIT OCW API",
+            total=count,
+            initial=num_courses,
+            unit="course",
+        ) as progress_bar:
+            for page in pages:
+                page_results = page.get("results", [])
+                yield page_results
+                num_courses += len(page_results)
+                progress_bar.update(len(page_results))
+
+        if num_courses != count:
+            logger.warning(
+                "The API announced %d courses, but %d were received.",
+                count,
+                num_courses,
+            )
+        logger.info("API request timings: %s", self.timing_summary())
+        logger.info("API request scheduling: %s", self.scheduler.metrics.as_dict())
+
+    def iter_courses(self, api_url):
+        """Generate the courses of the MIT OpenCourseWare API one at a time, page by page."""
+        for page_results in self.iter_pages(api_url):
+            yield from page_results
+
+    def extract_data_from_api(self, api_url):
+        """Extract all data from the MIT OpenCourseWare API."""
+        return list(self.iter_courses(api_url))
+
+    def timing_summary(self):
+        """Summarize the recorded request timings, in seconds and bytes."""
+        if not self.timings:
+            return {"requests": 0}
+        latencies = sorted(timing.elapsed for timing in self.timings)
+        return {
+            "requests": len(latencies),
+            "total_seconds": round(sum(latencies), 4),
+            "mean_seconds": round(statistics.mean(latencies), 4),
+            "p50_seconds": round(latencies[len(latencies) // 2], 4),
+            "p95_seconds": round(latencies[int(len(latencies) * 0.95)], 4),
+            "max_seconds": round(latencies[-1], 4),
+            "total_bytes": sum(timing.num_bytes for timing in self.timings),
+            "cache_hits": sum(timing.from_cache for timing in self.timings),
+            "last_page_size": self.timings[-1].page_size,
+        }
+
+
+_default_client = None
+
+
+def get_default_client():
+    """Get the shared client used by the module-level helpers."""
+    global _default_client
+    if _default_client is None:
+        _default_client = OCWClient()
+    return _default_client
+
+
+def make_request(next_page, page_size, offset=None):
     """
-    Make a request to the API with retry logic.
+    Make a request to the API with retry logic, through the shared client.
     """
-    return requests.get(next_page, params={"limit": page_size}, timeout=60)
+    return get_default_client().make_request(next_page, page_size, offset)
 
 
 def paginated_response(api_url, page_size=100):
     """
     Generate paginated responses from the API.
     """
-    next_page = api_url
-    while next_page:
-        response = make_request(next_page, page_size)
-        data = response.json()
-        next_page = data.get("next")
-        yield data
+    with OCWClient(page_size=page_size) as client:
+        yield from client.paginated_response(api_url)
+
+
+def extract_data_from_api(api_url, max_workers=None, client=None):
+    """
+    Extract all data from the MIT OpenCourseWare API.
+
+    A client can be given to reuse its connection pool and settings; otherwise a
+    default-configured one is used for this extraction.
+    """
+    if client is not None:
+        return client.extract_data_from_api(api_url)
+    with OCWClient(max_workers=max_workers) as default_client:
+        return default_client.extract_data_from_api(api_url)
 
 
-def extract_data_from_api(api_url):
-    """Extract all data from the MIT OpenCourseWare API."""
-    page_size = 100
-    pages = paginated_response(api_url, page_size)
+def iter_pages_from_api(api_url, max_workers=None, client=None, offset=0):
+    """
+    Generate the list of courses of each MIT OpenCourseWare API page, starting at the
+    given offset.
+    """
+    if client is not None:
+        yield from client.iter_pages(api_url, offset)
+        return
+    with OCWClient(max_workers=max_workers) as default_client:
+        yield from default_client.iter_pages(api_url, offset)
 
-    first_page = next(pages)
-    api_data = first_page.get("results", [])
-    total_pages = math.ceil(first_page["count"] / page_size)
 
-    # Remaining pages
-    for page in tqdm(
-        pages,
-        desc="Loading data from MIT OCW API",
-        total=total_pages - 1,
-    ):
-        page_results = page.get("results", [])
-        api_data.extend(page_results)
+def iter_data_from_api(api_url, max_workers=None, client=None):
+    """
+    Generate all courses from the MIT OpenCourseWare API, page by page.
 
-    return api_data
+    Only one page of courses (or one window of concurrently fetched pages) is held
+    in memory at a time.
+    """
+    if client is not None:
+        yield from client.iter_courses(api_url)
+        return
+    with OCWClient(max_workers=max_workers) as default_client:
+        yield from default_client.iter_courses(api_url)
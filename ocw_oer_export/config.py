@@ -1,10 +1,41 @@
 """
 Module for loading environment settings and setting API base URL based on the current environment.
+
+Settings are module attributes (e.g. config.API_URL), resolved on first use rather than
+at import time: the .env file is only loaded, and python-dotenv only imported, once a
+setting is read.
 """
 import os
-from dotenv import load_dotenv
+from functools import lru_cache
+
+# Default value of each setting, overridden by the environment or the .env file.
+DEFAULTS = {
+    "API_BASE_URL": "https://mitopen.odl.mit.edu",
+    # Query parameters with which incremental fetches request only the courses modified
+    # since a given time, oldest first. Fetches stay correct if the API ignores them.
+    "API_MODIFIED_SINCE_PARAM": "last_modified__gte",
+    "API_ORDERING_PARAM": "sortby",
+    "API_ORDERING_VALUE": "last_modified",
+}
+
+
+@lru_cache(maxsize=None)
+def load_settings():
+    """Load the .env file, once, and return every setting by name."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    settings = {name: os.getenv(name, default) for name, default in DEFAULTS.items()}
+    settings["API_URL"] = f"{settings['API_BASE_URL']}/api/v1/courses/?platform=ocw"
+    return settings
+
+
+def __getattr__(name):
+    settings = load_settings()
+    if name in settings:
+        return settings[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-load_dotenv()
 
-API_BASE_URL = os.getenv("API_BASE_URL", "https://mitopen.odl.mit.edu")
-API_URL = f"{API_BASE_URL}/api/v1/courses/?platform=ocw"
+def __dir__():
+    return [*globals(), "API_URL", *DEFAULTS]
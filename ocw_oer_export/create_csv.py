@@ -2,21 +2,68 @@
 Module for creating OER-template CSV file with data extracted from MIT OpenCourseWare API.
 """
 import csv
+import hashlib
+import itertools
 import os
 import logging
+from collections import deque
+from contextlib import ExitStack
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from types import MappingProxyType
+
+from . import config
+from .arrow_export import oer_records_writer
+from .data_handler import iter_data_from_json
+from .delta import DeltaWriter
+from .instrumentation import increment, stage, timed_iter
+from .mapping_index import load_mapping_index
+from .oer_record import OER_FIELDNAMES, OERRecord
+from .shards import write_csv_shards
+from .utilities import normalize_course_url, normalize_keywords, text_cleanup
+from .utilities.normalize_keywords import NORMALIZE_KEYWORDS_VERSION
+from .utilities.text_cleanup import TEXT_CLEANUP_VERSION
 
+# Bump whenever the transformation logic changes, to invalidate cached OER rows.
+TRANSFORM_VERSION = "2"
 
-from .client import extract_data_from_api
-from .data_handler import extract_data_from_json
-from .config import API_URL
-from .utilities import normalize_course_url, normalize_keywords, text_cleanup
+MAPPING_FILES = [
+    "mapping_files/fm_keywords_export.csv",
+    "mapping_files/ocw_topic_to_oer_subject.csv",
+]
+
+# Modules whose code computes the mapping index, which is rebuilt when they change.
+MAPPING_CODE_FILES = [
+    "utilities/normalize_course_url.py",
+    "utilities/normalize_keywords.py",
+]
+
+MAPPING_INDEX_FILE = "mapping_files/mappings_index.pickle"
+
+# Number of newly transformed courses buffered before they are written to the CourseCache.
+COURSE_CACHE_BATCH_SIZE = 500
+
+# Number of courses sent to a transform worker at once.
+TRANSFORM_CHUNK_SIZE = 100
 
+# Mappings loaded by load_mappings, once per process.
+_mappings = None
 
-def create_fm_ocw_course_url_to_keywords_mapping(path=None, file_name=None):
+# Mappings and TextCache set by init_transform_worker, in each pool worker process.
+_worker_mappings = None
+_worker_text_cache = None
+
+
+def create_fm_ocw_course_url_to_keywords_mapping(
+    path=None, file_name=None, text_cache=None
+):
     """
     Creates a mapping from OCW course URLs to their associated keywords using FM export data.
 
     This function reads a CSV file and extracts the mapping between course URLs and their keywords.
+    The keywords are normalized once here, rather than for every course using them; URLs
+    without keywords map to None. The mapping is read-only, so it can be shared.
+    With a TextCache, keywords normalized by a previous run are reused.
     """
     if path is None:
         path = os.path.dirname(__file__)
@@ -33,7 +80,21 @@ def create_fm_ocw_course_url_to_keywords_mapping(path=None, file_name=None):
             if row["zze_courseURL"]:
                 course_url = normalize_course_url(row["zze_courseURL"])
                 course_map[course_url] = row["zzd_keywords"]
-    return course_map
+    if text_cache is not None:
+        normalize = partial(
+            text_cache.get_or_compute,
+            "normalize_keywords",
+            NORMALIZE_KEYWORDS_VERSION,
+            normalize_keywords,
+        )
+    else:
+        normalize = normalize_keywords
+    return MappingProxyType(
+        {
+            course_url: normalize(keywords) if keywords else None
+            for course_url, keywords in course_map.items()
+        }
+    )
 
 
 def create_ocw_topic_to_oer_subject_mapping(path=None, file_name=None):
@@ -41,8 +102,8 @@ def create_ocw_topic_to_oer_subject_mapping(path=None, file_name=None):
     Create a mapping from OCW (OpenCourseWare) topics to OER (Open Educational Resources) subjects.
 
     This function reads a CSV file containing mappings specified by the arguments.
-    It creates a dictionary where keys are OCW topics and values are the corresponding OER subjects.
-    The function does not perform any manipulation on the mapping data.
+    It creates a read-only mapping where keys are OCW topics and values are frozensets of
+    the corresponding OER subjects, pre-split from their pipe-separated form.
     """
     if path is None:
         path = os.path.dirname(__file__)
@@ -53,7 +114,81 @@ def create_ocw_topic_to_oer_subject_mapping(path=None, file_name=None):
     file_path = os.path.join(path, file_name)
     with open(file_path, newline="", encoding="utf-8") as csvfile:
         reader = csv.DictReader(csvfile)
-        return {row["OCW Topic"]: row["OER Subject"] for row in reader}
+        return MappingProxyType(
+            {
+                row["OCW Topic"]: frozenset(row["OER Subject"].split("|"))
+                for row in reader
+            }
+        )
+
+
+def build_mappings(text_cache=None):
+    """Build the OCW topics and FM keywords mappings from the mapping files, as dicts."""
+    return (
+        dict(create_ocw_topic_to_oer_subject_mapping()),
+        dict(create_fm_ocw_course_url_to_keywords_mapping(text_cache=text_cache)),
+    )
+
+
+def read_mappings(text_cache=None):
+    """
+    Read the OCW topics and FM keywords mappings.
+
+    The compiled mappings are cached in MAPPING_INDEX_FILE and only rebuilt from the
+    mapping files when one of them or the code normalizing them (MAPPING_CODE_FILES)
+    changes, or when a version tag of get_transform_version is bumped; a TextCache
+    then saves normalizing the keywords that did not change.
+    Returns a tuple (ocw_topics_mapping, fm_ocw_keywords_mapping) of read-only mappings.
+    """
+    path = os.path.dirname(__file__)
+    mappings = load_mapping_index(
+        [
+            os.path.join(path, file_name)
+            for file_name in MAPPING_FILES + MAPPING_CODE_FILES
+        ],
+        partial(build_mappings, text_cache),
+        os.path.join(path, MAPPING_INDEX_FILE),
+        version=get_transform_version(),
+    )
+    return tuple(MappingProxyType(mapping) for mapping in mappings)
+
+
+def load_mappings(text_cache=None):
+    """
+    Load the OCW topics and FM keywords mappings with read_mappings, once per process.
+
+    The mappings do not depend on the TextCache, which is only used if they are read
+    for the first time, and is not kept.
+    """
+    global _mappings
+    if _mappings is None:
+        _mappings = read_mappings(text_cache)
+    return _mappings
+
+
+def get_transform_version():
+    """
+    Version of the transformation: TRANSFORM_VERSION with the version tags of the
+    text helpers whose output ends up in the OER rows and the mapping index.
+    """
+    return f"{TRANSFORM_VERSION}-{TEXT_CLEANUP_VERSION}-{NORMALIZE_KEYWORDS_VERSION}"
+
+
+def get_mappings_fingerprint(path=None):
+    """
+    Fingerprint the transformation by hashing the mapping files, the code normalizing
+    them and the transformation's version tags.
+
+    Cached OER rows are only reused while this fingerprint stays the same.
+    """
+    if path is None:
+        path = os.path.dirname(__file__)
+
+    fingerprint = hashlib.sha256(get_transform_version().encode("utf-8"))
+    for file_name in MAPPING_FILES + MAPPING_CODE_FILES:
+        with open(os.path.join(path, file_name), "rb") as mapping_file:
+            fingerprint.update(mapping_file.read())
+    return fingerprint.hexdigest()
 
 
 def get_cr_sublevel(levels):
@@ -70,8 +205,16 @@ def get_cr_sublevel(levels):
     return "|".join(sorted(set(sublevels)))
 
 
-def get_description_in_plain_text(description):
-    """Get Course Resource plain text description by cleaning up markdown and HTML."""
+def get_description_in_plain_text(description, text_cache=None):
+    """
+    Get Course Resource plain text description by cleaning up markdown and HTML.
+
+    With a TextCache, a description cleaned up by a previous run is not cleaned up again.
+    """
+    if text_cache is not None:
+        return text_cache.get_or_compute(
+            "text_cleanup", TEXT_CLEANUP_VERSION, text_cleanup, description
+        )
     cleaned_description = text_cleanup(description)
     return cleaned_description
 
@@ -83,14 +226,8 @@ def get_cr_subjects(ocw_topics_mapping, ocw_course_topics):
     Since distinct OCW topics can map to the same OER subject, duplicate subject
     values are omitted.
     """
-    oer_subjects_list = [
-        ocw_topics_mapping.get(topic["name"]).split("|")
-        if ocw_topics_mapping.get(topic["name"]) is not None
-        else []
-        for topic in ocw_course_topics
-    ]
-    unique_oer_subjects = set(
-        subject for subjects in oer_subjects_list for subject in subjects
+    unique_oer_subjects = set().union(
+        *(ocw_topics_mapping.get(topic["name"], ()) for topic in ocw_course_topics)
     )
     sorted_unique_oer_subjects = sorted(unique_oer_subjects)
     return "|".join(sorted_unique_oer_subjects)
@@ -100,12 +237,12 @@ def get_cr_keywords(fm_ocw_keywords_mapping, list_of_topics_objs, course_url):
     """
     Get OER formatted Course Resource keywords for a given OCW course.
 
-    It checks for course's keywords in FM export mapping (fm_ocw_keywords_mapping).
+    It checks for course's normalized keywords in FM export mapping (fm_ocw_keywords_mapping).
     If no keywords are found there, it uses OCW course's topics as keywords.
     """
     keywords = fm_ocw_keywords_mapping.get(course_url)
-    if keywords:
-        return normalize_keywords(keywords)
+    if keywords is not None:
+        return keywords
     return "|".join(topic["name"] for topic in list_of_topics_objs)
 
 
@@ -172,98 +309,325 @@ def get_cr_accessibility(ocw_course_feature_tags):
     return "|".join(tags)
 
 
-def transform_single_course(course, ocw_topics_mapping, fm_ocw_keywords_mapping):
-    """Transform a single course according to OER template."""
+def transform_single_course(
+    course, ocw_topics_mapping, fm_ocw_keywords_mapping, text_cache=None
+):
+    """
+    Transform a single course according to OER template.
+
+    Only the columns that vary between courses are computed; the constant columns and
+    CR_COU_COPYRIGHT_HOLDER (the authors again) are filled in by OERRecord.as_row.
+    """
     course_runs = course["runs"][0]
-    return {
-        "CR_TITLE": course["title"],
-        "CR_URL": course_runs["url"],
-        "CR_MATERIAL_TYPE": "Full Course",
-        "CR_MEDIA_FORMATS": "Text/HTML",
-        "CR_SUBLEVEL": get_cr_sublevel(course_runs["level"]),
-        "CR_ABSTRACT": get_description_in_plain_text(course_runs["description"]),
-        "CR_LANGUAGE": "en",
-        "CR_COU_TITLE": "Creative Commons Attribution Non Commercial Share Alike 4.0",
-        "CR_PRIMARY_USER": "student|teacher",
-        "CR_SUBJECT": get_cr_subjects(ocw_topics_mapping, course["topics"]),
-        "CR_KEYWORDS": get_cr_keywords(
+    with stage("text_cleanup"):
+        abstract = get_description_in_plain_text(course_runs["description"], text_cache)
+    return OERRecord(
+        CR_TITLE=course["title"],
+        CR_URL=course_runs["url"],
+        CR_SUBLEVEL=get_cr_sublevel(course_runs["level"]),
+        CR_ABSTRACT=abstract,
+        CR_SUBJECT=get_cr_subjects(ocw_topics_mapping, course["topics"]),
+        CR_KEYWORDS=get_cr_keywords(
             fm_ocw_keywords_mapping, course["topics"], course_runs["url"]
         ),
-        "CR_CREATE_DATE": get_cr_create_date(
-            course_runs["semester"], course_runs["year"]
-        ),
-        "CR_AUTHOR_NAME": get_cr_authors(course_runs["instructors"]),
-        "CR_PROVIDER": "MIT",
-        "CR_PROVIDER_SET": "MIT OpenCourseWare",
-        "CR_COU_URL": "https://creativecommons.org/licenses/by-nc-sa/4.0/",
-        "CR_COU_COPYRIGHT_HOLDER": get_cr_authors(course_runs["instructors"]),
-        "CR_EDUCATIONAL_USE": get_cr_educational_use(course["course_feature"]),
-        "CR_ACCESSIBILITY": get_cr_accessibility(course["course_feature"]),
-    }
+        CR_CREATE_DATE=get_cr_create_date(course_runs["semester"], course_runs["year"]),
+        CR_AUTHOR_NAME=get_cr_authors(course_runs["instructors"]),
+        CR_EDUCATIONAL_USE=get_cr_educational_use(course["course_feature"]),
+        CR_ACCESSIBILITY=get_cr_accessibility(course["course_feature"]),
+    )
+
+
+def init_transform_worker(text_cache=None):
+    """
+    Load the mapping files once per pool worker process, instead of pickling them per
+    task, and set the TextCache, if any, that transform_chunk uses.
+    """
+    global _worker_mappings, _worker_text_cache
+    _worker_text_cache = text_cache
+    with stage("load_mappings"):
+        _worker_mappings = load_mappings(text_cache)
+
+
+def transform_courses(courses, mappings, text_cache=None):
+    """
+    Transform a chunk of courses with the given (ocw_topics_mapping,
+    fm_ocw_keywords_mapping) mappings.
+
+    The results added to the TextCache, if any, are stored after each chunk.
+    """
+    ocw_topics_mapping, fm_ocw_keywords_mapping = mappings
+    with stage("transform"):
+        transformed_courses = [
+            transform_single_course(
+                course, ocw_topics_mapping, fm_ocw_keywords_mapping, text_cache
+            )
+            for course in courses
+        ]
+    if text_cache is not None:
+        text_cache.flush()
+    return transformed_courses
+
+
+def transform_chunk(courses):
+    """Transform a chunk of courses in a pool worker, set up by init_transform_worker."""
+    return transform_courses(courses, _worker_mappings, _worker_text_cache)
 
 
-def transform_data(data):
-    """Transform all courses into OER template."""
-    fm_ocw_keywords_mapping = create_fm_ocw_course_url_to_keywords_mapping()
-    ocw_topics_mapping = create_ocw_topic_to_oer_subject_mapping()
+def iter_chunks(iterable, chunk_size):
+    """Split an iterable into lists of at most chunk_size items."""
+    iterator = iter(iterable)
+    while chunk := list(itertools.islice(iterator, chunk_size)):
+        yield chunk
+
+
+def iter_transformed_chunks(chunks, workers=None, text_cache=None):
+    """
+    Generate the transformed courses of each chunk of courses, in the chunks' order.
 
-    return [
-        course
-        for course in (
-            transform_single_course(course, ocw_topics_mapping, fm_ocw_keywords_mapping)
-            for course in data
+    With more than one worker, chunks are transformed in a pool of processes. At most
+    twice as many chunks as workers are in flight, so the input can be a stream.
+    Otherwise they are transformed in the calling thread, with its own mappings and
+    TextCache, so that several transforms can run in the same process at once.
+    """
+    if workers is None or workers <= 1:
+        with stage("load_mappings"):
+            mappings = load_mappings(text_cache)
+        yield from map(
+            partial(transform_courses, mappings=mappings, text_cache=text_cache), chunks
         )
-        if course is not None
-    ]
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_transform_worker,
+        initargs=(text_cache,),
+    ) as executor:
+        window = deque()
+        for chunk in chunks:
+            window.append(executor.submit(transform_chunk, chunk))
+            if len(window) >= workers * 2:
+                with stage("transform"):
+                    transformed_chunk = window.popleft().result()
+                yield transformed_chunk
+        while window:
+            with stage("transform"):
+                transformed_chunk = window.popleft().result()
+            yield transformed_chunk
+
+
+def iter_transformed_data(data, course_cache=None, workers=None, text_cache=None):
+    """
+    Generate the OERRecord of each of the given courses, in order.
+
+    data can be any iterable of courses, including a generator streaming them from the
+    API, so that courses are transformed as soon as they arrive. With more than one
+    worker, chunks of TRANSFORM_CHUNK_SIZE courses are transformed in parallel processes.
+
+    With a CourseCache, only the courses whose content changed since they were last
+    transformed go through transform_single_course; the others reuse their cached row.
+    With a TextCache, descriptions cleaned up by a previous run are reused.
+    """
+    if course_cache is None:
+        for transformed_chunk in iter_transformed_chunks(
+            iter_chunks(data, TRANSFORM_CHUNK_SIZE), workers, text_cache
+        ):
+            yield from (course for course in transformed_chunk if course is not None)
+        return
+
+    fingerprint = get_mappings_fingerprint()
+    looked_up_chunks = deque()
+
+    def iter_changed_chunks():
+        """Look up each chunk in the cache, generating the courses that changed."""
+        for chunk in iter_chunks(data, TRANSFORM_CHUNK_SIZE):
+            looked_up_chunk = []
+            for course in chunk:
+                content_hash = course_cache.content_hash(course, fingerprint)
+                cached_course = course_cache.get(course["id"], content_hash)
+                if cached_course is not None:
+                    cached_course = OERRecord._make(cached_course)
+                looked_up_chunk.append((course, content_hash, cached_course))
+            looked_up_chunks.append(looked_up_chunk)
+            yield [course for course, _, cached in looked_up_chunk if cached is None]
+
+    changed_courses = []
+    num_courses = num_changed_courses = 0
+    try:
+        for transformed_chunk in iter_transformed_chunks(
+            iter_changed_chunks(), workers, text_cache
+        ):
+            transformed_courses = iter(transformed_chunk)
+            for course, content_hash, transformed_course in looked_up_chunks.popleft():
+                if transformed_course is None:
+                    transformed_course = next(transformed_courses)
+                    changed_courses.append(
+                        (course["id"], content_hash, transformed_course)
+                    )
+                num_courses += 1
+                yield transformed_course
+
+            if len(changed_courses) >= COURSE_CACHE_BATCH_SIZE:
+                course_cache.store(changed_courses)
+                num_changed_courses += len(changed_courses)
+                changed_courses = []
+    finally:
+        course_cache.store(changed_courses)
+        num_changed_courses += len(changed_courses)
+        logging.info(
+            "%d of %d courses changed since they were last transformed.",
+            num_changed_courses,
+            num_courses,
+        )
+
+
+def transform_data(data, course_cache=None, workers=None, text_cache=None):
+    """Transform all courses into OER template, as a list of OERRecord."""
+    return list(iter_transformed_data(data, course_cache, workers, text_cache))
+
+
+def write_csv(rows, output_path):
+    """
+    Write OER records to a CSV file as they are generated.
+
+    Rows are streamed into a temporary file next to output_path, which only replaces
+    output_path once every row has been written.
+    """
+    temp_path = f"{output_path}.tmp"
+    try:
+        with open(temp_path, "w", newline="", encoding="utf-8") as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(OER_FIELDNAMES)
+            num_rows = 0
+            for row in rows:
+                with stage("write"):
+                    writer.writerow(row.as_row())
+                num_rows += 1
+        os.replace(temp_path, output_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    increment("courses", num_rows)
+    increment("output_bytes", os.path.getsize(output_path))
+    logging.info(
+        "CSV file '%s' successfully created.",
+        output_path,
+    )
 
 
 def create_csv(
     source="api",
     input_path="/private/output/ocw_api_data.json",
     output_path="/private/output/ocw_oer_export.csv",
+    fetch_workers=None,
+    client=None,
+    course_cache=None,
+    api_url=None,
+    workers=None,
+    delta_against=None,
+    shard_rows=None,
+    shard_bytes=None,
+    shard_writers=4,
+    text_cache=None,
+    arrow_output_path=None,
 ):
     """
     Create a CSV file from either the MIT OpenCourseWare API or a locally stored JSON file.
+
+    Courses are streamed from the source, transformed and written one at a time, so
+    memory use is bounded by the API page size, or by the size of a single course when
+    reading from JSON, rather than by the catalog size.
+
     output_path: The output path inside the docker container.
+    fetch_workers: Number of concurrent API page requests (sequential when not set).
+    client: An OCWClient to fetch with, overriding fetch_workers.
+    course_cache: A CourseCache to only re-transform the courses that changed.
+    api_url: The API endpoint to fetch from (default: config.API_URL).
+    workers: Number of processes transforming courses in parallel (serial when not set).
+    delta_against: A previous CSV export, which may be output_path itself. The rows
+        added, changed and removed since then are also written to separate CSVs next
+        to output_path, with a JSON manifest.
+    shard_rows: If set, split the CSV into shards of at most this many rows, named
+        after output_path and listed in an index file, instead of a single file.
+    shard_bytes: If set, split the CSV into shards of at most this many bytes.
+    shard_writers: Number of shards written concurrently.
+    text_cache: A TextCache to reuse the descriptions cleaned up by previous runs.
+    arrow_output_path: If set, also write the records to this Parquet ('.parquet') or
+        Arrow IPC ('.arrow', '.feather') file, with the multi-valued columns as lists;
+        requires pyarrow.
     """
     api_data_json = {}
 
     if source == "api":
-        api_data_json = extract_data_from_api(api_url=API_URL)
+        # Imported here, so that exporting from JSON does not load the HTTP client.
+        from .client import iter_data_from_api
+
+        api_data_json = timed_iter(
+            "fetch",
+            iter_data_from_api(
+                api_url=api_url or config.API_URL,
+                max_workers=fetch_workers,
+                client=client,
+            ),
+        )
 
     elif source == "json":
-        api_data_json = extract_data_from_json(input_path)
+        api_data_json = timed_iter("read_json", iter_data_from_json(input_path))
 
     else:
         raise ValueError("Invalid source. Use 'api' or 'json'.")
 
-    transformed_data = transform_data(api_data_json)
-    fieldnames = [
-        "CR_TITLE",
-        "CR_URL",
-        "CR_MATERIAL_TYPE",
-        "CR_MEDIA_FORMATS",
-        "CR_SUBLEVEL",
-        "CR_ABSTRACT",
-        "CR_LANGUAGE",
-        "CR_COU_TITLE",
-        "CR_PRIMARY_USER",
-        "CR_SUBJECT",
-        "CR_KEYWORDS",
-        "CR_CREATE_DATE",
-        "CR_AUTHOR_NAME",
-        "CR_PROVIDER",
-        "CR_PROVIDER_SET",
-        "CR_COU_URL",
-        "CR_COU_COPYRIGHT_HOLDER",
-        "CR_EDUCATIONAL_USE",
-        "CR_ACCESSIBILITY",
-    ]
-    with open(output_path, "w", newline="", encoding="utf-8") as csv_file:
-        writer = csv.DictWriter(csv_file, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(transformed_data)
-        logging.info(
-            "CSV file '%s' successfully created.",
-            output_path,
-        )
+    write_oer_csv(
+        api_data_json,
+        output_path,
+        course_cache=course_cache,
+        workers=workers,
+        delta_against=delta_against,
+        shard_rows=shard_rows,
+        shard_bytes=shard_bytes,
+        shard_writers=shard_writers,
+        text_cache=text_cache,
+        arrow_output_path=arrow_output_path,
+    )
+
+
+def write_oer_csv(
+    courses,
+    output_path,
+    course_cache=None,
+    workers=None,
+    delta_against=None,
+    shard_rows=None,
+    shard_bytes=None,
+    shard_writers=4,
+    text_cache=None,
+    arrow_output_path=None,
+):
+    """
+    Transform a stream of API courses and write them to the OER CSV file, its shards,
+    its delta and its Parquet or Arrow IPC copy; see create_csv for the arguments.
+    """
+
+    def write_rows(rows):
+        if shard_rows is None and shard_bytes is None:
+            write_csv(rows, output_path)
+        else:
+            write_csv_shards(
+                rows,
+                output_path,
+                OER_FIELDNAMES,
+                max_rows=shard_rows,
+                max_bytes=shard_bytes,
+                writers=shard_writers,
+            )
+
+    rows = iter_transformed_data(courses, course_cache, workers, text_cache)
+    with ExitStack() as stack:
+        if arrow_output_path is not None:
+            arrow_writer = stack.enter_context(oer_records_writer(arrow_output_path))
+            rows = arrow_writer.iter_rows(rows)
+        if delta_against is not None:
+            delta_writer = stack.enter_context(
+                DeltaWriter(delta_against, output_path, OER_FIELDNAMES)
+            )
+            rows = delta_writer.iter_rows(rows)
+        write_rows(rows)
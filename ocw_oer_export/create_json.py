@@ -4,22 +4,112 @@ Module to interact with MIT OpenCourseWare API and write data to a JSON file.
 import json
 import logging
 
-from .config import API_URL
-from .client import extract_data_from_api
+from . import config
+from .arrow_export import is_arrow_path, write_arrow_snapshot
+from .client import extract_data_from_api, iter_pages_from_api
+from .data_handler import JSONLinesWriter, is_json_lines_path
+from .incremental import DEFAULT_FULL_SWEEP_INTERVAL, sync_snapshot
+from .instrumentation import increment, stage, timed_iter
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Number of courses fetched again before the offset of an interrupted JSON Lines
+# download, in case courses were deleted from the catalog in between.
+RESUME_OVERLAP = 100
 
-def create_json(output_path="/private/output/ocw_api_data.json"):
+
+def create_json(
+    output_path="/private/output/ocw_api_data.json",
+    fetch_workers=None,
+    client=None,
+    resume=False,
+    api_url=None,
+    incremental=False,
+    full_sweep_interval=DEFAULT_FULL_SWEEP_INTERVAL,
+):
     """
     Fetches data from MIT OpenCourseWare API and writes it to a JSON file.
     output_path: The output path inside the docker container.
+    fetch_workers: Number of concurrent API page requests (sequential when not set).
+    client: An OCWClient to fetch with, overriding fetch_workers.
+    resume: Continue an interrupted JSON Lines snapshot from its last complete page.
+    api_url: The API endpoint to fetch from (default: config.API_URL).
+    incremental: Only fetch the courses modified since the previous incremental run,
+        and merge them into the existing snapshot; see incremental.sync_snapshot.
+    full_sweep_interval: With incremental, the timedelta after which the whole catalog
+        is fetched again, to drop deleted courses.
+
+    If output_path ends with '.jsonl', optionally followed by '.gz' or '.zst', the data
+    is written as JSON Lines, one course per line, page by page as it is downloaded.
+    If it ends with '.parquet', '.arrow' or '.feather', the data is written as a Parquet
+    or Arrow IPC file, one row group per page range, which requires pyarrow.
+    Otherwise it is written as a single pretty-printed JSON array.
     """
-    api_data = extract_data_from_api(api_url=API_URL)
+    api_url = api_url or config.API_URL
+    if incremental:
+        if resume:
+            raise ValueError("Incremental snapshots cannot be resumed.")
+        if is_arrow_path(output_path):
+            raise ValueError("Incremental snapshots must be JSON or JSON Lines files.")
+        sync_snapshot(
+            output_path,
+            api_url,
+            fetch_workers=fetch_workers,
+            client=client,
+            full_sweep_interval=full_sweep_interval,
+        )
+        return
+    if is_json_lines_path(output_path):
+        create_json_lines(output_path, fetch_workers, client, resume, api_url)
+        return
+    if resume:
+        raise ValueError("Only JSON Lines snapshots can be resumed.")
+    if is_arrow_path(output_path):
+        pages = iter_pages_from_api(api_url, max_workers=fetch_workers, client=client)
+        write_arrow_snapshot(timed_iter("fetch", pages), output_path)
+        return
+
+    with stage("fetch"):
+        api_data = extract_data_from_api(
+            api_url=api_url, max_workers=fetch_workers, client=client
+        )
+    increment("courses", len(api_data))
     try:
-        with open(output_path, "w", encoding="utf-8") as json_file:
+        with stage("write"), open(output_path, "w", encoding="utf-8") as json_file:
             json.dump(api_data, json_file, ensure_ascii=False, indent=4)
         logger.info("JSON file '%s' successfully created.", output_path)
     except IOError as e:
         logger.error("Error saving data to JSON: %s", e)
+
+
+def create_json_lines(
+    output_path, fetch_workers=None, client=None, resume=False, api_url=None
+):
+    """
+    Fetches data from MIT OpenCourseWare API and appends it to a JSON Lines file,
+    page by page.
+
+    When resuming, the download restarts RESUME_OVERLAP courses before the offset of
+    the last course written, and courses already written are skipped, in case the
+    catalog shifted in between. Courses are only missed if more than RESUME_OVERLAP of
+    the courses already written were deleted from the catalog in the meantime.
+    """
+    try:
+        with JSONLinesWriter(output_path, resume=resume) as writer:
+            pages = iter_pages_from_api(
+                api_url or config.API_URL,
+                max_workers=fetch_workers,
+                client=client,
+                offset=max(writer.count - RESUME_OVERLAP, 0),
+            )
+            for page in timed_iter("fetch", pages):
+                new_courses = [
+                    course for course in page if course.get("id") not in writer.ids
+                ]
+                with stage("write"):
+                    writer.write_page(new_courses)
+                increment("courses", len(new_courses))
+        logger.info("JSON Lines file '%s' successfully created.", output_path)
+    except IOError as e:
+        logger.error("Error saving data to JSON Lines: %s", e)
@@ -1,20 +1,295 @@
 """
 Module for extracting and loading data to/from JSON file
+
+Besides pretty-printed JSON arrays, snapshots can be stored as JSON Lines (one course
+per line, '.jsonl'), optionally compressed with gzip ('.jsonl.gz') or zstd ('.jsonl.zst').
+Readers detect the format from the file's content, whatever its name.
 """
+import codecs
+import gzip
+import io
 import json
 import logging
+import mmap
+import os
+import zlib
 
+WHITESPACE = " \t\n\r"
 
-def extract_data_from_json(file_path):
-    """Extract data from a JSON file."""
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def _zstandard():
+    """Import the optional zstandard package, needed for '.zst' snapshots."""
     try:
-        with open(file_path, "r", encoding="utf-8") as json_file:
-            data = json.load(json_file)
-            logging.info("Data successfully extracted from %s.", file_path)
-            return data
+        import zstandard
+    except ImportError as exc:
+        raise ImportError(
+            "zstd-compressed snapshots require the 'zstandard' package, installed "
+            "with the 'zstd' extra."
+        ) from exc
+    return zstandard
+
+
+def get_compression(file_path):
+    """Get the compression ('gzip', 'zstd' or None) named by a file's extension."""
+    if file_path.endswith(".gz"):
+        return "gzip"
+    if file_path.endswith(".zst"):
+        return "zstd"
+    return None
+
+
+def is_json_lines_path(file_path):
+    """Tell whether a file's name designates a (possibly compressed) JSON Lines file."""
+    base_path = file_path
+    if get_compression(file_path):
+        base_path = os.path.splitext(file_path)[0]
+    return base_path.endswith((".jsonl", ".ndjson"))
+
+
+def open_decompressed(file_path):
+    """
+    Open a file for binary reading, transparently decompressing gzip and zstd content.
+
+    Returns the stream and the detected compression.
+    """
+    try:
+        raw_file = open(file_path, "rb")
     except FileNotFoundError as exc:
         raise FileNotFoundError(f"{file_path} not found.") from exc
 
+    magic = raw_file.read(4)
+    raw_file.seek(0)
+    if magic.startswith(GZIP_MAGIC):
+        return gzip.GzipFile(fileobj=raw_file), "gzip"
+    if magic.startswith(ZSTD_MAGIC):
+        decompressor = _zstandard().ZstdDecompressor()
+        reader = decompressor.stream_reader(raw_file, read_across_frames=True)
+        return io.BufferedReader(reader), "zstd"
+    return raw_file, None
+
+
+def detect_json_format(stream):
+    """
+    Detect whether a stream holds a JSON array ('json') or JSON Lines ('jsonl'),
+    from its first non-whitespace character.
+    """
+    chunk = stream.peek(64)
+    first_character = chunk.lstrip(b"\xef\xbb\xbf" + WHITESPACE.encode())[:1]
+    return "jsonl" if first_character == b"{" else "json"
+
+
+def extract_data_from_json(file_path):
+    """Extract data from a JSON or JSON Lines file, compressed or not."""
+    stream, compression = open_decompressed(file_path)
+    with stream:
+        if compression is None and detect_json_format(stream) == "json":
+            data = json.load(codecs.getreader("utf-8-sig")(stream))
+            logging.info("Data successfully extracted from %s.", file_path)
+            return data
+    return list(iter_data_from_json(file_path))
+
+
+def iter_data_from_json(file_path, chunk_size=1024 * 1024):
+    """
+    Generate the items of a JSON file's top-level array, or of a JSON Lines file's
+    lines, one at a time.
+
+    Uncompressed JSON arrays are memory-mapped and decoded incrementally, chunk by chunk,
+    and other files are read as streams, so memory use stays constant however large the
+    file is: only the item being parsed and the current chunk are held at any time.
+    """
+    stream, compression = open_decompressed(file_path)
+    with stream:
+        if detect_json_format(stream) == "jsonl":
+            yield from _iter_json_lines(stream)
+        elif compression is not None:
+            yield from _iter_array_items(stream.read, chunk_size)
+        elif stream.seek(0, 2):
+            with mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+                yield from _iter_array_items(mapped_file.read, chunk_size)
+        else:
+            raise json.JSONDecodeError("Expecting value", "", 0)
+    logging.info("Data successfully extracted from %s.", file_path)
+
+
+def _iter_json_lines(stream):
+    """Parse each non-blank line of a binary stream as a JSON document."""
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+def _iter_array_items(read, chunk_size):
+    """Parse the items of a JSON array incrementally, given a binary read function."""
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    position = 0
+
+    def read_more():
+        """Append the next chunk of the file to the buffer, returning False at EOF."""
+        nonlocal buffer, position
+        chunk = read(chunk_size)
+        if not chunk:
+            return False
+        buffer = buffer[position:] + text_decoder.decode(chunk)
+        position = 0
+        return True
+
+    def next_token():
+        """Skip whitespace and return the next character, or '' at EOF."""
+        nonlocal position
+        while True:
+            while position < len(buffer) and buffer[position] in WHITESPACE:
+                position += 1
+            if position < len(buffer):
+                return buffer[position]
+            if not read_more():
+                return ""
+
+    if next_token() != "[":
+        raise json.JSONDecodeError("Expecting '['", buffer, position)
+    position += 1
+    if next_token() == "]":
+        return
+
+    while True:
+        next_token()
+        while True:
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # The item may continue in the next chunk.
+                if read_more():
+                    continue
+                raise
+            # Until the delimiter that follows it is read, an item such as a number
+            # ("6." of "6.5") may continue in the next chunk.
+            if end < len(buffer) and buffer[end] in WHITESPACE + ",]":
+                break
+            if not read_more():
+                break
+        position = end
+        yield item
+
+        token = next_token()
+        position += 1
+        if token == "]":
+            return
+        if token != ",":
+            raise json.JSONDecodeError("Expecting ',' delimiter", buffer, position - 1)
+
+
+class JSONLinesWriter:
+    """
+    Write courses to a JSON Lines snapshot page by page, as they arrive.
+
+    Each page is flushed as soon as it is written and, when compressed, is a gzip member
+    or zstd frame of its own. An interrupted snapshot therefore holds complete pages
+    followed by at most one partial page, which resume=True discards before appending;
+    `ids` and `count` then tell which courses were already written.
+    """
+
+    def __init__(self, file_path, resume=False):
+        self.file_path = file_path
+        self.compression = get_compression(file_path)
+        self.ids = set()
+        self.count = 0
+        if resume and os.path.exists(file_path):
+            self.file = open(file_path, "r+b")
+            self.file.truncate(self._read_complete_pages())
+            self.file.seek(0, 2)
+            logging.info(
+                "Resuming %s after %d courses already written.", file_path, self.count
+            )
+        else:
+            self.file = open(file_path, "wb")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Close the snapshot file."""
+        self.file.close()
+
+    def _read_complete_pages(self):
+        """Record the courses of the complete pages, returning the size they span."""
+        valid_size = 0
+        for end_offset, content in _iter_complete_pages(self.file, self.compression):
+            try:
+                courses = [json.loads(line) for line in content.splitlines() if line]
+            except ValueError:
+                break
+            self.ids.update(course.get("id") for course in courses)
+            self.count += len(courses)
+            valid_size = end_offset
+        return valid_size
+
+    def write_page(self, courses):
+        """Append a page of courses, one JSON document per line, and flush it."""
+        content = b"".join(
+            json.dumps(course, ensure_ascii=False).encode("utf-8") + b"\n"
+            for course in courses
+        )
+        if not content:
+            return
+        if self.compression == "gzip":
+            content = gzip.compress(content)
+        elif self.compression == "zstd":
+            content = _zstandard().ZstdCompressor().compress(content)
+        self.file.write(content)
+        self.file.flush()
+        self.ids.update(course.get("id") for course in courses)
+        self.count += len(courses)
+
+
+def _iter_complete_pages(raw_file, compression, chunk_size=1024 * 1024):
+    """
+    Generate the end offset and decompressed content of each complete page of a
+    JSON Lines snapshot: each gzip member or zstd frame, or each newline-terminated
+    line when uncompressed.
+    """
+    offset = 0
+    if compression is None:
+        for line in raw_file:
+            if not line.endswith(b"\n"):
+                return
+            offset += len(line)
+            yield offset, line
+        return
+
+    def new_decompressor():
+        if compression == "gzip":
+            return zlib.decompressobj(wbits=31)
+        return _zstandard().ZstdDecompressor().decompressobj()
+
+    errors = (zlib.error,) if compression == "gzip" else (_zstandard().ZstdError,)
+
+    decompressor = new_decompressor()
+    content = []
+    pending = b""
+    while True:
+        data = pending or raw_file.read(chunk_size)
+        if not data:
+            return
+        try:
+            content.append(decompressor.decompress(data))
+        except errors:
+            # A corrupt page ends the usable part of the snapshot.
+            return
+        pending = decompressor.unused_data if decompressor.eof else b""
+        offset += len(data) - len(pending)
+        if decompressor.eof:
+            yield offset, b"".join(content)
+            decompressor = new_decompressor()
+            content = []
+
 
 def load_data_to_json(data, file_path):
     """Save data to a JSON file."""
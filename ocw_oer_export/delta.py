@@ -0,0 +1,180 @@
+"""
+Module for exporting only the OER rows added, changed or removed since a previous CSV export.
+"""
+import csv
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timezone
+
+from .instrumentation import stage
+
+logger = logging.getLogger(__name__)
+
+DELTA_KINDS = ["added", "changed", "removed"]
+
+
+def get_delta_paths(output_path):
+    """Get the paths of the added, changed and removed CSVs and of the manifest."""
+    root, extension = os.path.splitext(output_path)
+    paths = {kind: f"{root}.{kind}{extension or '.csv'}" for kind in DELTA_KINDS}
+    paths["manifest"] = f"{root}.delta.json"
+    return paths
+
+
+def hash_row(values):
+    """Hash the values of a row, as they are written to the CSV."""
+    values = ("" if value is None else str(value) for value in values)
+    return hashlib.blake2b("\x1f".join(values).encode("utf-8"), digest_size=16).digest()
+
+
+def get_file_sha256(file_path):
+    """Get the SHA-256 hash of a file's content, read in blocks."""
+    file_hash = hashlib.sha256()
+    with open(file_path, "rb") as hashed_file:
+        while block := hashed_file.read(1024 * 1024):
+            file_hash.update(block)
+    return file_hash.hexdigest()
+
+
+class DeltaWriter:
+    """
+    Compare the OERRecords of a new export with a previous CSV export, by CR_URL.
+
+    The previous export is indexed once, keeping only a hash of each row. Rows of the
+    new export are then compared as they stream through iter_rows, and written to the
+    added or changed CSV right away. The remaining previous rows are written to the
+    removed CSV on close, together with a JSON manifest.
+
+    The previous export is kept open, so it can be the very file that the new export
+    replaces. A missing previous export, e.g. on the first run, counts as empty: every
+    row is added, and the manifest's previous_sha256 is null.
+
+    previous_path: The previous CSV export.
+    output_path: The path of the new export, next to which the delta files are written.
+    fieldnames: The CSV columns.
+    """
+
+    def __init__(self, previous_path, output_path, fieldnames):
+        self.previous_path = previous_path
+        self.output_path = output_path
+        self.fieldnames = fieldnames
+        self.paths = get_delta_paths(output_path)
+        self.counts = dict.fromkeys([*DELTA_KINDS, "unchanged"], 0)
+        self.previous_sha256 = None
+        self.previous_file = None
+        if os.path.exists(previous_path):
+            self.previous_sha256 = get_file_sha256(previous_path)
+            self.previous_file = open(previous_path, newline="", encoding="utf-8")
+        else:
+            logger.info(
+                "No previous export '%s', every row counts as added.", previous_path
+            )
+        self.url_index = fieldnames.index("CR_URL")
+        self.previous_hashes = {
+            row[self.url_index]: hash_row(row) for row in self.iter_previous_rows()
+        }
+        self.files = {}
+        self.writers = {}
+        for kind in ["added", "changed"]:
+            self.open_delta_file(kind)
+
+    def iter_previous_rows(self):
+        """Generate the rows of the previous export, with their values in fieldnames order."""
+        if self.previous_file is None:
+            return
+        self.previous_file.seek(0)
+        reader = csv.reader(self.previous_file)
+        header = next(reader, [])
+        positions = [
+            header.index(field) if field in header else None
+            for field in self.fieldnames
+        ]
+        for values in reader:
+            yield tuple(
+                "" if position is None or position >= len(values) else values[position]
+                for position in positions
+            )
+
+    def close_previous_file(self):
+        """Close the previous export, if there is one."""
+        if self.previous_file is not None:
+            self.previous_file.close()
+
+    def open_delta_file(self, kind):
+        """Open the temporary CSV of a kind of delta and write its header."""
+        delta_file = open(f"{self.paths[kind]}.tmp", "w", newline="", encoding="utf-8")
+        self.files[kind] = delta_file
+        self.writers[kind] = csv.writer(delta_file)
+        self.writers[kind].writerow(self.fieldnames)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def iter_rows(self, rows):
+        """Pass the records of the new export through, writing those that changed."""
+        for record in rows:
+            with stage("delta"):
+                values = record.as_row()
+                previous_hash = self.previous_hashes.pop(values[self.url_index], None)
+                if previous_hash is None:
+                    kind = "added"
+                elif previous_hash != hash_row(values):
+                    kind = "changed"
+                else:
+                    kind = "unchanged"
+                self.counts[kind] += 1
+                if kind != "unchanged":
+                    self.writers[kind].writerow(values)
+            yield record
+
+    def close(self):
+        """Write the removed rows and the manifest, and move the delta files in place."""
+        self.open_delta_file("removed")
+        removed_urls = self.previous_hashes.keys()
+        for row in self.iter_previous_rows():
+            if row[self.url_index] in removed_urls:
+                self.writers["removed"].writerow(row)
+                self.counts["removed"] += 1
+        self.close_previous_file()
+
+        manifest = {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "previous_path": self.previous_path,
+            "previous_sha256": self.previous_sha256,
+            "output_path": self.output_path,
+            "counts": self.counts,
+            "files": {},
+        }
+        for kind in DELTA_KINDS:
+            self.files[kind].close()
+            os.replace(f"{self.paths[kind]}.tmp", self.paths[kind])
+            manifest["files"][kind] = {
+                "path": self.paths[kind],
+                "rows": self.counts[kind],
+                "sha256": get_file_sha256(self.paths[kind]),
+            }
+        with open(self.paths["manifest"], "w", encoding="utf-8") as manifest_file:
+            json.dump(manifest, manifest_file, indent=4)
+        logger.info(
+            "Delta against '%s': %d added, %d changed, %d removed, %d unchanged.",
+            self.previous_path,
+            self.counts["added"],
+            self.counts["changed"],
+            self.counts["removed"],
+            self.counts["unchanged"],
+        )
+
+    def discard(self):
+        """Remove the temporary delta files after a failed export."""
+        self.close_previous_file()
+        for kind, delta_file in self.files.items():
+            delta_file.close()
+            os.remove(f"{self.paths[kind]}.tmp")
@@ -0,0 +1,198 @@
+"""
+Module for writing several outputs, such as the JSON snapshot and the OER CSV, from a
+single download of the API data.
+"""
+import itertools
+import json
+import logging
+import os
+import queue
+import threading
+from collections import namedtuple
+from functools import partial
+
+from . import config
+from .arrow_export import is_arrow_path, write_arrow_snapshot
+from .client import iter_pages_from_api
+from .create_csv import write_oer_csv
+from .data_handler import JSONLinesWriter, is_json_lines_path
+from .instrumentation import increment, stage, timed_iter
+
+logger = logging.getLogger(__name__)
+
+# Number of fetched pages each sink can lag behind the download.
+SINK_QUEUE_SIZE = 4
+
+# Queue items marking the end of the download, and a failed download.
+_END = object()
+_ABORT = object()
+
+
+class Sink(namedtuple("Sink", ["name", "output_path", "write"])):
+    """
+    An output of the export.
+
+    name: Name of the sink, in logs and in the failures returned by export.
+    output_path: Path of the file written by the sink.
+    write: Function consuming an iterable of API pages, each a list of courses. It
+        should leave output_path untouched if it fails.
+    """
+
+    __slots__ = ()
+
+
+class ExportAborted(Exception):
+    """Raised in sinks when the download fails before they have every page."""
+
+
+def write_json_snapshot(pages, output_path):
+    """
+    Write pages of courses to a JSON Lines, JSON, Parquet or Arrow IPC snapshot,
+    depending on output_path's extension, as create_json does.
+
+    Pages are streamed into a temporary file next to output_path, which only replaces
+    output_path once every page has been written.
+    """
+    if is_arrow_path(output_path):
+        write_arrow_snapshot(pages, output_path)
+        return
+    root, extension = os.path.splitext(output_path)
+    temp_path = f"{root}.tmp{extension}"
+    try:
+        if is_json_lines_path(output_path):
+            with JSONLinesWriter(temp_path) as writer:
+                for page in pages:
+                    with stage("write_json"):
+                        writer.write_page(page)
+        else:
+            with open(temp_path, "w", encoding="utf-8") as json_file:
+                write_json_array(itertools.chain.from_iterable(pages), json_file)
+        os.replace(temp_path, output_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    logger.info("JSON file '%s' successfully created.", output_path)
+
+
+def write_json_array(courses, json_file):
+    """
+    Write courses to a file as a JSON array, one at a time, formatted as
+    json.dump(courses, json_file, ensure_ascii=False, indent=4) would.
+    """
+    separator = "[\n"
+    for course in courses:
+        with stage("write_json"):
+            item = json.dumps(course, ensure_ascii=False, indent=4)
+            json_file.write(separator + "    " + item.replace("\n", "\n    "))
+        separator = ",\n"
+    json_file.write("[]" if separator == "[\n" else "\n]")
+
+
+def write_csv_pages(pages, output_path, **options):
+    """Write pages of courses to the OER CSV file; see create_csv.write_oer_csv."""
+    write_oer_csv(itertools.chain.from_iterable(pages), output_path, **options)
+
+
+def json_snapshot_sink(output_path):
+    """Sink writing the raw API data to a snapshot; see write_json_snapshot."""
+    return Sink(
+        "json", output_path, partial(write_json_snapshot, output_path=output_path)
+    )
+
+
+def csv_sink(output_path, **options):
+    """
+    Sink writing the OER CSV file, with the options of create_csv.write_oer_csv
+    (course_cache, workers, delta_against, shards, text_cache and arrow_output_path).
+    """
+    return Sink(
+        "csv", output_path, partial(write_csv_pages, output_path=output_path, **options)
+    )
+
+
+class SinkFeed:
+    """
+    Feed a sink the fetched pages through a bounded queue, in a thread of its own.
+
+    A failed sink keeps draining its queue, so that it never blocks the download for
+    the other sinks.
+    """
+
+    def __init__(self, sink, queue_size=SINK_QUEUE_SIZE):
+        self.sink = sink
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.error = None
+        self.ended = False
+        self.thread = threading.Thread(
+            target=self.run, name=f"{sink.name}-sink", daemon=True
+        )
+
+    def iter_pages(self):
+        """Generate the pages put in the queue, until the end of the download."""
+        while True:
+            page = self.queue.get()
+            if page is _END or page is _ABORT:
+                self.ended = True
+                if page is _ABORT:
+                    raise ExportAborted("The API download failed.")
+                return
+            yield page
+
+    def run(self):
+        """Run the sink, recording the exception it fails with."""
+        try:
+            with stage(f"{self.sink.name}_sink"):
+                self.sink.write(self.iter_pages())
+        except Exception as error:
+            self.error = error
+            if not isinstance(error, ExportAborted):
+                logger.exception(
+                    "The %s export to '%s' failed.",
+                    self.sink.name,
+                    self.sink.output_path,
+                )
+        while not self.ended:
+            page = self.queue.get()
+            self.ended = page is _END or page is _ABORT
+
+    def put(self, page):
+        """Queue a page for the sink, unless it already failed."""
+        if self.error is None:
+            self.queue.put(page)
+
+
+def export(sinks, api_url=None, fetch_workers=None, client=None):
+    """
+    Download the API data once, and write it to every sink at the same time.
+
+    Each sink consumes the pages in its own thread, as they are downloaded. A sink that
+    fails is logged and left behind, while the others carry on. If the download itself
+    fails, every sink is aborted and the error is raised.
+
+    sinks: The Sink objects to write to, e.g. json_snapshot_sink and csv_sink.
+    api_url: The API endpoint to fetch from (default: config.API_URL).
+    fetch_workers: Number of concurrent API page requests (sequential when not set).
+    client: An OCWClient to fetch with, overriding fetch_workers.
+
+    Returns a dict of the names of the failed sinks to their exception.
+    """
+    feeds = [SinkFeed(sink) for sink in sinks]
+    for feed in feeds:
+        feed.thread.start()
+    end = _ABORT
+    try:
+        pages = iter_pages_from_api(
+            api_url or config.API_URL, max_workers=fetch_workers, client=client
+        )
+        for page in timed_iter("fetch", pages):
+            increment("courses_fetched", len(page))
+            for feed in feeds:
+                feed.put(page)
+        end = _END
+    finally:
+        for feed in feeds:
+            feed.queue.put(end)
+        for feed in feeds:
+            feed.thread.join()
+
+    return {feed.sink.name: feed.error for feed in feeds if feed.error is not None}
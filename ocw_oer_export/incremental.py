@@ -0,0 +1,167 @@
+"""
+Module for keeping a JSON snapshot of the API up to date by only fetching the courses
+modified since the previous run.
+"""
+import json
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+from .client import iter_data_from_api
+from . import config
+from .data_handler import JSONLinesWriter, iter_data_from_json, is_json_lines_path
+from .instrumentation import increment, stage, timed_iter
+
+logger = logging.getLogger(__name__)
+
+MODIFIED_FIELD = "last_modified"
+
+DEFAULT_FULL_SWEEP_INTERVAL = timedelta(days=7)
+
+
+def get_sync_state_path(snapshot_path):
+    """Get the path of the file recording a snapshot's high-water mark."""
+    return f"{snapshot_path}.sync.json"
+
+
+def parse_timestamp(value):
+    """Parse an ISO 8601 timestamp from the API, such as '2024-02-12T15:36:59Z'."""
+    timestamp = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if timestamp.tzinfo is None:
+        timestamp = timestamp.replace(tzinfo=timezone.utc)
+    return timestamp
+
+
+def get_high_water_mark(courses, high_water_mark=None):
+    """Get the latest modification time among courses and a previous high-water mark."""
+    for course in courses:
+        modified = course.get(MODIFIED_FIELD)
+        if modified and (
+            high_water_mark is None
+            or parse_timestamp(modified) > parse_timestamp(high_water_mark)
+        ):
+            high_water_mark = modified
+    return high_water_mark
+
+
+def with_query_params(url, params):
+    """Add query parameters to a URL, replacing those it already has."""
+    parsed_url = urlparse(url)
+    query = dict(parse_qsl(parsed_url.query))
+    query.update(params)
+    return parsed_url._replace(query=urlencode(query)).geturl()
+
+
+def load_sync_state(snapshot_path):
+    """Load a snapshot's sync state, or None if the snapshot or its state is missing."""
+    state_path = get_sync_state_path(snapshot_path)
+    if not (os.path.exists(snapshot_path) and os.path.exists(state_path)):
+        return None
+    with open(state_path, encoding="utf-8") as state_file:
+        return json.load(state_file)
+
+
+def write_json_atomically(data, file_path, **kwargs):
+    """Write a JSON file through a temporary file, so it is never left half-written."""
+    temp_path = f"{file_path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as json_file:
+        json.dump(data, json_file, ensure_ascii=False, **kwargs)
+    os.replace(temp_path, file_path)
+
+
+def write_snapshot(courses, snapshot_path):
+    """Replace a JSON or (possibly compressed) JSON Lines snapshot with the courses."""
+    if not is_json_lines_path(snapshot_path):
+        write_json_atomically(courses, snapshot_path, indent=4)
+        return
+    root, extension = os.path.splitext(snapshot_path)
+    temp_path = f"{root}.tmp{extension}"
+    with JSONLinesWriter(temp_path) as writer:
+        writer.write_page(courses)
+    os.replace(temp_path, snapshot_path)
+
+
+def sync_snapshot(
+    snapshot_path,
+    api_url,
+    fetch_workers=None,
+    client=None,
+    full_sweep_interval=DEFAULT_FULL_SWEEP_INTERVAL,
+    full_sweep=False,
+    now=None,
+):
+    """
+    Update a snapshot with the courses modified since its high-water mark.
+
+    The high-water mark is the latest modification time of the courses fetched so far,
+    recorded next to the snapshot. Later runs only request the courses modified since
+    then, oldest first, and merge them into the snapshot by course id: changed courses
+    keep their position and new ones are appended.
+
+    As deleted courses do not show up in modified courses, the whole catalog is fetched
+    again, replacing the snapshot, when full_sweep is set, when the snapshot has no
+    sync state yet, or when the last full sweep is older than full_sweep_interval.
+
+    Returns a summary of the sync: its mode, and the number of courses fetched,
+    in the snapshot and removed.
+    """
+    now = now or datetime.now(timezone.utc)
+    state = load_sync_state(snapshot_path)
+    if (
+        full_sweep
+        or state is None
+        or state.get("high_water_mark") is None
+        or now - parse_timestamp(state["last_full_sweep"]) >= full_sweep_interval
+    ):
+        fetched_courses = list(
+            timed_iter("fetch", iter_data_from_api(api_url, fetch_workers, client))
+        )
+        previous_ids = set()
+        if os.path.exists(snapshot_path):
+            previous_ids = {
+                course["id"] for course in iter_data_from_json(snapshot_path)
+            }
+        courses = fetched_courses
+        num_removed = len(previous_ids - {course["id"] for course in courses})
+        state = {"high_water_mark": None, "last_full_sweep": now.isoformat()}
+        mode = "full"
+    else:
+        modified_url = with_query_params(
+            api_url,
+            {
+                config.API_MODIFIED_SINCE_PARAM: state["high_water_mark"],
+                config.API_ORDERING_PARAM: config.API_ORDERING_VALUE,
+            },
+        )
+        fetched_courses = list(
+            timed_iter("fetch", iter_data_from_api(modified_url, fetch_workers, client))
+        )
+        with stage("read_json"):
+            courses_by_id = {
+                course["id"]: course for course in iter_data_from_json(snapshot_path)
+            }
+        courses_by_id.update((course["id"], course) for course in fetched_courses)
+        courses = list(courses_by_id.values())
+        num_removed = 0
+        mode = "incremental"
+
+    with stage("write"):
+        write_snapshot(courses, snapshot_path)
+    state.update(
+        high_water_mark=get_high_water_mark(fetched_courses, state["high_water_mark"]),
+        last_run=now.isoformat(),
+        mode=mode,
+    )
+    write_json_atomically(state, get_sync_state_path(snapshot_path), indent=4)
+
+    increment("courses", len(courses))
+    increment("courses_fetched", len(fetched_courses))
+    summary = {
+        "mode": mode,
+        "fetched": len(fetched_courses),
+        "courses": len(courses),
+        "removed": num_removed,
+    }
+    logger.info("Snapshot '%s' synced: %s", snapshot_path, summary)
+    return summary
@@ -0,0 +1,217 @@
+"""
+Module for timing the export pipeline stages and summarizing a run.
+
+Instrumentation is off unless a run is wrapped in collect_run_stats(). The helpers
+below (stage, timed_iter, increment, observe) are then recorded in the active
+RunStats from any thread, and are no-ops otherwise. Stages running in transform
+worker processes are not recorded; the time spent waiting for them is.
+"""
+import bisect
+import contextlib
+import cProfile
+import json
+import logging
+import platform
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds, in seconds, of the latency histogram buckets.
+LATENCY_BUCKETS = [0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60]
+
+_active_run_stats = None
+
+
+class RunStats:
+    """
+    Wall and CPU time of each pipeline stage, counters and histograms of one run.
+
+    Stages can be nested: each stage reports its total time, and its own time
+    excluding the stages nested in it. CPU time is that of the thread running the
+    stage, so a stage waiting on I/O shows a high wall time but a low CPU time.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.thread_local = threading.local()
+        self.started_at = datetime.now(timezone.utc)
+        self.start_time = time.perf_counter()
+        self.stages = {}
+        self.counters = Counter()
+        self.histograms = {}
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Time the enclosed block as (one call of) the named stage."""
+        frames = getattr(self.thread_local, "frames", None)
+        if frames is None:
+            frames = self.thread_local.frames = []
+        # [wall time of nested stages, CPU time of nested stages]
+        frame = [0.0, 0.0]
+        frames.append(frame)
+        start_wall, start_cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - start_wall
+            cpu = time.thread_time() - start_cpu
+            frames.pop()
+            if frames:
+                frames[-1][0] += wall
+                frames[-1][1] += cpu
+            with self.lock:
+                totals = self.stages.setdefault(name, [0, 0.0, 0.0, 0.0, 0.0])
+                totals[0] += 1
+                totals[1] += wall
+                totals[2] += cpu
+                totals[3] += wall - frame[0]
+                totals[4] += cpu - frame[1]
+
+    def increment(self, name, amount=1):
+        """Add amount to the named counter."""
+        with self.lock:
+            self.counters[name] += amount
+
+    def observe(self, name, value):
+        """Record a value, such as a latency in seconds, in the named histogram."""
+        with self.lock:
+            self.histograms.setdefault(name, []).append(value)
+
+    def summary(self):
+        """Summarize the run as a JSON-serializable dictionary."""
+        with self.lock:
+            return {
+                "started_at": self.started_at.isoformat(),
+                "wall_seconds": round(time.perf_counter() - self.start_time, 4),
+                "python": platform.python_version(),
+                "stages": {
+                    name: {
+                        "calls": calls,
+                        "wall_seconds": round(wall, 4),
+                        "cpu_seconds": round(cpu, 4),
+                        "self_wall_seconds": round(self_wall, 4),
+                        "self_cpu_seconds": round(self_cpu, 4),
+                    }
+                    for name, (calls, wall, cpu, self_wall, self_cpu) in sorted(
+                        self.stages.items()
+                    )
+                },
+                "counters": dict(sorted(self.counters.items())),
+                "histograms": {
+                    name: summarize_histogram(values)
+                    for name, values in sorted(self.histograms.items())
+                },
+            }
+
+    def write_summary(self, path, **extra):
+        """Write the run summary, with any extra top-level fields, as JSON."""
+        summary = {**extra, **self.summary()}
+        with open(path, "w", encoding="utf-8") as summary_file:
+            json.dump(summary, summary_file, indent=4)
+        logger.info("Run summary written to '%s'.", path)
+        return summary
+
+
+def summarize_histogram(values):
+    """Summarize values by count, sum, percentiles and LATENCY_BUCKETS counts."""
+    values = sorted(values)
+    bucket_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+    for value in values:
+        bucket_counts[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+    buckets = {f"le_{bound}": 0 for bound in LATENCY_BUCKETS}
+    buckets["le_inf"] = 0
+    cumulative = 0
+    for key, bucket_count in zip(buckets, bucket_counts):
+        cumulative += bucket_count
+        buckets[key] = cumulative
+    if not values:
+        return {"count": 0, "buckets": buckets}
+    return {
+        "count": len(values),
+        "sum": round(sum(values), 4),
+        "p50": round(values[len(values) // 2], 4),
+        "p95": round(values[int(len(values) * 0.95)], 4),
+        "max": round(values[-1], 4),
+        "buckets": buckets,
+    }
+
+
+@contextlib.contextmanager
+def collect_run_stats():
+    """Record the instrumentation of the enclosed run in a new RunStats."""
+    global _active_run_stats
+    previous_run_stats = _active_run_stats
+    _active_run_stats = RunStats()
+    try:
+        yield _active_run_stats
+    finally:
+        _active_run_stats = previous_run_stats
+
+
+def get_run_stats():
+    """Get the active RunStats, or None when no run is being instrumented."""
+    return _active_run_stats
+
+
+def stage(name):
+    """Time the enclosed block as the named stage of the active run, if any."""
+    run_stats = _active_run_stats
+    if run_stats is None:
+        return contextlib.nullcontext()
+    return run_stats.stage(name)
+
+
+def timed_iter(name, iterable):
+    """Time every item drawn from an iterable as the named stage of the active run."""
+    run_stats = _active_run_stats
+    if run_stats is None:
+        return iterable
+    return _iter_timed(run_stats, name, iterable)
+
+
+def _iter_timed(run_stats, name, iterable):
+    iterator = iter(iterable)
+    while True:
+        with run_stats.stage(name):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+def increment(name, amount=1):
+    """Add amount to the named counter of the active run, if any."""
+    run_stats = _active_run_stats
+    if run_stats is not None:
+        run_stats.increment(name, amount)
+
+
+def observe(name, value):
+    """Record a value in the named histogram of the active run, if any."""
+    run_stats = _active_run_stats
+    if run_stats is not None:
+        run_stats.observe(name, value)
+
+
+@contextlib.contextmanager
+def profile(path=None):
+    """
+    Profile the enclosed block with cProfile, dumping pstats data to path.
+
+    Only the calling thread is profiled. Does nothing when path is None.
+    """
+    if path is None:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        logger.info("Profile written to '%s'.", path)
@@ -0,0 +1,80 @@
+"""
+Module for caching compiled mapping files in a pickled index, across runs.
+"""
+import hashlib
+import logging
+import os
+import pickle
+
+logger = logging.getLogger(__name__)
+
+
+def get_file_signature(file_path):
+    """Get a file's modification time and size, a cheap proxy for its content."""
+    stat = os.stat(file_path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def get_file_hash(file_path):
+    """Get the SHA-256 hash of a file's content."""
+    with open(file_path, "rb") as source_file:
+        return hashlib.sha256(source_file.read()).hexdigest()
+
+
+def is_index_fresh(index, source_paths, version):
+    """
+    Tell whether an index was compiled from the current content of the source files.
+
+    Sources whose modification time and size are unchanged are trusted; the others
+    are hashed, so that merely touching a file does not invalidate the index.
+    """
+    if index.get("version") != version:
+        return False
+    sources = index.get("sources", {})
+    if set(sources) != set(source_paths):
+        return False
+    for source_path in source_paths:
+        signature, content_hash = sources[source_path]
+        if get_file_signature(source_path) == signature:
+            continue
+        if get_file_hash(source_path) != content_hash:
+            return False
+    return True
+
+
+def load_mapping_index(source_paths, build, index_path, version=""):
+    """
+    Load the data compiled from source files, from index_path if it is up to date.
+
+    Otherwise the data is compiled with build() and saved to index_path for the next
+    run. The index is only a cache: if it cannot be read or written, the data is
+    simply built.
+    """
+    try:
+        with open(index_path, "rb") as index_file:
+            index = pickle.load(index_file)
+        if is_index_fresh(index, source_paths, version):
+            return index["data"]
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, KeyError):
+        pass
+
+    data = build()
+    index = {
+        "version": version,
+        "sources": {
+            source_path: (get_file_signature(source_path), get_file_hash(source_path))
+            for source_path in source_paths
+        },
+        "data": data,
+    }
+    temp_path = f"{index_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as index_file:
+            pickle.dump(index, index_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, index_path)
+        logger.info("Mapping index '%s' rebuilt.", index_path)
+    except OSError as e:
+        logger.warning("Could not save mapping index '%s': %s", index_path, e)
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return data
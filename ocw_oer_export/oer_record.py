@@ -0,0 +1,92 @@
+"""
+Module defining the OER template columns and the compact record holding a transformed course.
+"""
+import operator
+from collections import namedtuple
+
+OER_FIELDNAMES = [
+    "CR_TITLE",
+    "CR_URL",
+    "CR_MATERIAL_TYPE",
+    "CR_MEDIA_FORMATS",
+    "CR_SUBLEVEL",
+    "CR_ABSTRACT",
+    "CR_LANGUAGE",
+    "CR_COU_TITLE",
+    "CR_PRIMARY_USER",
+    "CR_SUBJECT",
+    "CR_KEYWORDS",
+    "CR_CREATE_DATE",
+    "CR_AUTHOR_NAME",
+    "CR_PROVIDER",
+    "CR_PROVIDER_SET",
+    "CR_COU_URL",
+    "CR_COU_COPYRIGHT_HOLDER",
+    "CR_EDUCATIONAL_USE",
+    "CR_ACCESSIBILITY",
+]
+
+# Columns with the same value for every course, filled in when rows are written.
+CONSTANT_FIELDS = {
+    "CR_MATERIAL_TYPE": "Full Course",
+    "CR_MEDIA_FORMATS": "Text/HTML",
+    "CR_LANGUAGE": "en",
+    "CR_COU_TITLE": "Creative Commons Attribution Non Commercial Share Alike 4.0",
+    "CR_PRIMARY_USER": "student|teacher",
+    "CR_PROVIDER": "MIT",
+    "CR_PROVIDER_SET": "MIT OpenCourseWare",
+    "CR_COU_URL": "https://creativecommons.org/licenses/by-nc-sa/4.0/",
+}
+
+# Columns copied from another column, filled in when rows are written.
+COPIED_FIELDS = {"CR_COU_COPYRIGHT_HOLDER": "CR_AUTHOR_NAME"}
+
+# Columns holding several values, joined with '|' in the CSV.
+MULTI_VALUED_FIELDS = [
+    "CR_SUBLEVEL",
+    "CR_PRIMARY_USER",
+    "CR_SUBJECT",
+    "CR_KEYWORDS",
+    "CR_AUTHOR_NAME",
+    "CR_COU_COPYRIGHT_HOLDER",
+    "CR_EDUCATIONAL_USE",
+    "CR_ACCESSIBILITY",
+]
+
+VARIABLE_FIELDS = [
+    field
+    for field in OER_FIELDNAMES
+    if field not in CONSTANT_FIELDS and field not in COPIED_FIELDS
+]
+
+_CONSTANT_VALUES = tuple(CONSTANT_FIELDS.values())
+
+# Position of each column's value in a record followed by _CONSTANT_VALUES.
+_get_row = operator.itemgetter(
+    *(
+        len(VARIABLE_FIELDS) + list(CONSTANT_FIELDS).index(field)
+        if field in CONSTANT_FIELDS
+        else VARIABLE_FIELDS.index(COPIED_FIELDS.get(field, field))
+        for field in OER_FIELDNAMES
+    )
+)
+
+
+class OERRecord(namedtuple("OERRecord", VARIABLE_FIELDS)):
+    """
+    A course transformed into the OER template, holding only its variable columns.
+
+    Being a tuple, a record is much smaller than a dictionary of every column, and
+    pickles and compares by value. Variable columns are attributes, e.g. record.CR_URL;
+    as_row gives every column, constants included, ready for csv.writer.
+    """
+
+    __slots__ = ()
+
+    def as_row(self):
+        """Get the values of every OER_FIELDNAMES column, constants included, in order."""
+        return _get_row(self + _CONSTANT_VALUES)
+
+    def as_dict(self):
+        """Get the full row as a dictionary keyed by OER_FIELDNAMES."""
+        return dict(zip(OER_FIELDNAMES, self.as_row()))
@@ -0,0 +1,334 @@
+"""
+Module for scheduling API requests: rate limiting, retries with backoff and a circuit breaker.
+"""
+import asyncio
+import email.utils
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+THROTTLING_STATUS_CODES = frozenset({429, 503})
+
+
+class CircuitOpenError(Exception):
+    """Raised when a request is refused because the circuit breaker is open."""
+
+    def __init__(self, remaining):
+        super().__init__(f"Circuit breaker open for another {remaining:.1f} seconds")
+        self.remaining = remaining
+
+
+def parse_retry_after(value, now=None):
+    """
+    Parse a Retry-After header, given in seconds or as an HTTP date, into seconds.
+
+    Returns None if the header is missing or malformed.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max((retry_at - now).total_seconds(), 0.0)
+
+
+class SchedulerMetrics:
+    """Thread-safe counters of the requests, retries, waits and throttling events."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = Counter()
+
+    def increment(self, name, amount=1):
+        """Add amount to the named counter."""
+        with self.lock:
+            self.counters[name] += amount
+
+    def as_dict(self):
+        """Get a copy of the counters, with wait times rounded to milliseconds."""
+        with self.lock:
+            return {
+                name: round(value, 3) if isinstance(value, float) else value
+                for name, value in sorted(self.counters.items())
+            }
+
+
+class RateLimiter:
+    """
+    Token bucket shared by every thread making requests.
+
+    rate: Requests allowed per second on average, or None for no limit.
+    burst: Number of requests that can be made at once after an idle period.
+
+    The limiter can also be paused, e.g. when the API asks to retry later, so that
+    every concurrent request waits instead of only the one that was throttled.
+    """
+
+    def __init__(self, rate=None, burst=1):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.tokens = float(self.burst)
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def pause(self, seconds):
+        """Hold every request for at least the given number of seconds from now."""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def reserve(self):
+        """
+        Take a token if a request may be made now, returning 0, or else return the
+        number of seconds to wait before trying again.
+        """
+        with self.lock:
+            now = time.monotonic()
+            if self.rate is not None:
+                self.tokens = min(
+                    self.burst, self.tokens + (now - self.updated_at) * self.rate
+                )
+                self.updated_at = now
+            if self.paused_until > now:
+                return self.paused_until - now
+            if self.rate is None:
+                return 0.0
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self):
+        """Wait until a request may be made, returning the number of seconds waited."""
+        waited = 0.0
+        while (wait := self.reserve()) > 0:
+            time.sleep(wait)
+            waited += wait
+        return waited
+
+
+class CircuitBreaker:
+    """
+    Stop sending requests to a failing API for a while.
+
+    After failure_threshold consecutive failures the circuit opens and requests are
+    refused for reset_timeout seconds. A single trial request is then let through:
+    the circuit closes again if it succeeds and reopens if it fails.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_progress = False
+        self.lock = threading.Lock()
+
+    def before_request(self):
+        """Raise CircuitOpenError if a request may not be made now."""
+        with self.lock:
+            if self.opened_at is None:
+                return
+            remaining = self.opened_at + self.reset_timeout - time.monotonic()
+            if remaining > 0 or self.trial_in_progress:
+                raise CircuitOpenError(max(remaining, 0.0))
+            self.trial_in_progress = True
+
+    def record_success(self):
+        """Close the circuit after a successful request."""
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_progress = False
+
+    def record_failure(self):
+        """Count a failed request, returning True if it opened the circuit."""
+        with self.lock:
+            self.failures += 1
+            reopened = self.trial_in_progress
+            self.trial_in_progress = False
+            if reopened or (
+                self.opened_at is None and self.failures >= self.failure_threshold
+            ):
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+
+class RequestScheduler:
+    """
+    Send requests through a shared rate limiter and circuit breaker, retrying
+    transient failures.
+
+    Connection errors, timeouts and 429/5xx responses are retried up to tries times
+    in total, with exponential backoff and full jitter so that concurrent requests
+    do not retry in lockstep. A Retry-After header on a 429 or 503 response is
+    honored and pauses every request sharing the rate limiter.
+
+    tries: Maximum number of attempts per request.
+    base_delay: Backoff before the first retry, doubled after each attempt.
+    max_delay: Upper bound of the backoff, Retry-After excepted.
+    rate_limiter: The RateLimiter shared by the concurrent requests.
+    circuit_breaker: The CircuitBreaker shared by the concurrent requests.
+    """
+
+    def __init__(
+        self,
+        tries=5,
+        base_delay=1.0,
+        max_delay=60.0,
+        rate_limiter=None,
+        circuit_breaker=None,
+    ):
+        self.tries = tries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter()
+        self.circuit_breaker = (
+            circuit_breaker if circuit_breaker is not None else CircuitBreaker()
+        )
+        self.metrics = SchedulerMetrics()
+
+    def backoff(self, attempt):
+        """Pick a random delay before the given retry, between 0 and its exponential cap."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+    def call(self, send):
+        """
+        Call send() until it returns a successful response or the attempts run out.
+
+        send: Function making one request and returning its requests.Response.
+        Raises the last error, or requests.HTTPError for an error response.
+        """
+        steps = self.attempts()
+        outcome = None
+        while True:
+            try:
+                step = steps.send(outcome)
+            except StopIteration as stop:
+                return stop.value
+            outcome = None
+            if step is not None:
+                time.sleep(step)
+                continue
+            try:
+                outcome = send()
+            except (requests.ConnectionError, requests.Timeout) as e:
+                outcome = e
+
+    async def call_async(self, send, retryable_errors):
+        """
+        Await send() until it returns a successful response or the attempts run out,
+        waiting without blocking the event loop.
+
+        send: Coroutine function making one request and returning its response.
+        retryable_errors: The exception types of connection errors and timeouts.
+        Raises the last error, or the response's error for an error response.
+        """
+        steps = self.attempts()
+        outcome = None
+        while True:
+            try:
+                step = steps.send(outcome)
+            except StopIteration as stop:
+                return stop.value
+            outcome = None
+            if step is not None:
+                await asyncio.sleep(step)
+                continue
+            try:
+                outcome = await send()
+            except retryable_errors as e:
+                outcome = e
+
+    def attempts(self):
+        """
+        Generate the steps of a request and its retries, whether requests are sent
+        synchronously or with asyncio: the number of seconds to wait, or None to make an
+        attempt, whose response or connection error must then be sent back.
+        Returns the successful response.
+        """
+        for attempt in range(self.tries):
+            last_attempt = attempt == self.tries - 1
+            waited = 0.0
+            while (wait := self.rate_limiter.reserve()) > 0:
+                yield wait
+                waited += wait
+            if waited:
+                self.metrics.increment("rate_limit_waits")
+                self.metrics.increment("rate_limit_wait_seconds", waited)
+
+            try:
+                self.circuit_breaker.before_request()
+            except CircuitOpenError as e:
+                self.metrics.increment("circuit_rejections")
+                if last_attempt:
+                    raise
+                yield self.retry_delay(max(e.remaining, self.backoff(attempt)))
+                continue
+
+            self.metrics.increment("requests")
+            response = yield None
+            if isinstance(response, Exception):
+                self.record_failure()
+                if last_attempt:
+                    raise response
+                logger.warning("%s, retrying (attempt %d)", response, attempt + 1)
+                yield self.retry_delay(self.backoff(attempt))
+                continue
+
+            if response.status_code not in RETRYABLE_STATUS_CODES:
+                self.circuit_breaker.record_success()
+                response.raise_for_status()
+                return response
+
+            delay = self.backoff(attempt)
+            if response.status_code in THROTTLING_STATUS_CODES:
+                self.metrics.increment("throttled")
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if retry_after is not None:
+                    delay = max(delay, retry_after)
+                    self.rate_limiter.pause(retry_after)
+            if response.status_code != 429:
+                self.record_failure()
+            if last_attempt:
+                response.raise_for_status()
+            logger.warning(
+                "%s returned %d, retrying in %.1f seconds (attempt %d)",
+                response.url,
+                response.status_code,
+                delay,
+                attempt + 1,
+            )
+            yield self.retry_delay(delay)
+
+    def record_failure(self):
+        """Count a failed attempt with the circuit breaker."""
+        self.metrics.increment("failures")
+        if self.circuit_breaker.record_failure():
+            self.metrics.increment("circuit_opened")
+            logger.warning(
+                "Circuit breaker opened for %.1f seconds",
+                self.circuit_breaker.reset_timeout,
+            )
+
+    def retry_delay(self, seconds):
+        """Count a wait of the given number of seconds before a retry, returning it."""
+        self.metrics.increment("retries")
+        self.metrics.increment("retry_wait_seconds", seconds)
+        return seconds
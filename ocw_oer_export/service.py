@@ -0,0 +1,331 @@
+"""
+Module for serving the OER CSV and the JSON snapshot over HTTP from a long-running process.
+
+The service keeps the mappings, the text converters and the latest catalog in memory.
+A background thread refreshes the catalog on a schedule and renders both exports once
+per refresh, so that a request only streams bytes already in memory instead of running
+the whole pipeline. Courses unchanged since the previous refresh reuse their
+transformed rows.
+
+Endpoints:
+    GET /ocw_oer_export.csv  The OER CSV.
+    GET /ocw_api_data.json   The JSON snapshot of the API data.
+    GET /status              The time, size and outcome of the last refreshes, as JSON.
+    POST /refresh            Start a refresh now, without waiting for the schedule.
+"""
+import csv
+import hashlib
+import io
+import json
+import logging
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from . import config
+from .cache import CourseCache
+from .client import extract_data_from_api
+from .create_csv import load_mappings, transform_data
+from .oer_record import OER_FIELDNAMES
+
+logger = logging.getLogger(__name__)
+
+# Seconds between two scheduled refreshes of the catalog.
+DEFAULT_REFRESH_INTERVAL = 60 * 60
+
+# Bytes written to the socket at a time when streaming an export.
+RESPONSE_CHUNK_SIZE = 64 * 1024
+
+# Seconds clients are asked to wait for the first refresh to complete.
+RETRY_AFTER_SECONDS = 30
+
+
+class Export(namedtuple("Export", ["body", "content_type", "etag"])):
+    """
+    An export rendered in memory.
+
+    body: The bytes of the file.
+    content_type: Its media type.
+    etag: A hash of the body, for conditional requests.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def from_body(cls, body, content_type):
+        """Make an Export of the given bytes."""
+        return cls(body, content_type, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+
+
+Snapshot = namedtuple("Snapshot", ["exports", "num_courses", "refreshed_at"])
+
+
+class MemoryCourseCache:
+    """
+    In-memory stand-in for CourseCache, keeping the rows of the previous refresh so
+    that unchanged courses are not transformed again.
+    """
+
+    content_hash = staticmethod(CourseCache.content_hash)
+
+    def __init__(self):
+        self.rows = {}
+
+    def get(self, course_id, content_hash):
+        """Get the stored row for a course if its content hash is unchanged, else None."""
+        entry = self.rows.get(course_id)
+        if entry is not None and entry[0] == content_hash:
+            return entry[1]
+        return None
+
+    def store(self, entries):
+        """Store (course_id, content_hash, row) entries."""
+        for course_id, content_hash, row in entries:
+            self.rows[course_id] = (content_hash, row)
+
+    def retain(self, course_ids):
+        """Drop the rows of the courses other than course_ids, e.g. deleted ones."""
+        course_ids = set(course_ids)
+        self.rows = {
+            course_id: entry
+            for course_id, entry in self.rows.items()
+            if course_id in course_ids
+        }
+
+
+def render_csv(records):
+    """Render OER records as the bytes of the CSV file written by create_csv."""
+    csv_file = io.StringIO(newline="")
+    writer = csv.writer(csv_file)
+    writer.writerow(OER_FIELDNAMES)
+    writer.writerows(record.as_row() for record in records)
+    return csv_file.getvalue().encode("utf-8")
+
+
+def render_json(courses):
+    """Render courses as the bytes of the JSON file written by create_json."""
+    return json.dumps(courses, ensure_ascii=False, indent=4).encode("utf-8")
+
+
+class ExportService:
+    """
+    Keep the latest exports in memory, refreshed by a background thread.
+
+    api_url: The API endpoint to fetch from (default: config.API_URL).
+    client: An OCWClient to fetch with.
+    refresh_interval: Seconds between two scheduled refreshes.
+    course_cache: A CourseCache shared with CLI runs; rows are otherwise kept in memory.
+    text_cache: A TextCache to reuse the descriptions cleaned up by previous runs.
+    workers: Number of processes transforming courses in parallel (serial when not set).
+    """
+
+    def __init__(
+        self,
+        api_url=None,
+        client=None,
+        refresh_interval=DEFAULT_REFRESH_INTERVAL,
+        course_cache=None,
+        text_cache=None,
+        workers=None,
+    ):
+        self.api_url = api_url
+        self.client = client
+        self.refresh_interval = refresh_interval
+        self.course_cache = course_cache or MemoryCourseCache()
+        self.text_cache = text_cache
+        self.workers = workers
+        self.snapshot = None
+        self.last_error = None
+        self.last_duration = None
+        self.refresh_lock = threading.Lock()
+        self.refresh_requested = threading.Event()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def refresh(self):
+        """Download and transform the catalog, then swap in its exports."""
+        with self.refresh_lock:
+            started = time.perf_counter()
+            # Loaded once per process, with the text converters they warm up.
+            load_mappings(self.text_cache)
+            if self.client is not None:
+                # Only this refresh's requests are summarized after the download.
+                self.client.reset_timings()
+            courses = extract_data_from_api(
+                api_url=self.api_url or config.API_URL, client=self.client
+            )
+            records = transform_data(
+                courses, self.course_cache, self.workers, self.text_cache
+            )
+            if isinstance(self.course_cache, MemoryCourseCache):
+                self.course_cache.retain(course["id"] for course in courses)
+            if self.text_cache is not None:
+                self.text_cache.flush()
+            if self.client is not None and self.client.cache is not None:
+                self.client.cache.evict()
+            exports = {
+                "/ocw_oer_export.csv": Export.from_body(
+                    render_csv(records), "text/csv; charset=utf-8"
+                ),
+                "/ocw_api_data.json": Export.from_body(
+                    render_json(courses), "application/json"
+                ),
+            }
+            self.snapshot = Snapshot(exports, len(courses), datetime.now(timezone.utc))
+            self.last_duration = time.perf_counter() - started
+            logger.info(
+                "Refreshed %d courses in %.1f seconds.",
+                len(courses),
+                self.last_duration,
+            )
+
+    def run_refreshes(self):
+        """Refresh the catalog on schedule, or when asked, until stopped."""
+        while not self.stopped.is_set():
+            try:
+                self.refresh()
+                self.last_error = None
+            except Exception as exc:
+                self.last_error = repr(exc)
+                logger.exception("Refresh failed, still serving the previous export.")
+            self.refresh_requested.wait(self.refresh_interval)
+            self.refresh_requested.clear()
+
+    def request_refresh(self):
+        """Start a refresh now, without waiting for the schedule."""
+        self.refresh_requested.set()
+
+    def start(self):
+        """Start refreshing in a background thread."""
+        self.thread = threading.Thread(
+            target=self.run_refreshes, name="ocw-refresh", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self):
+        """Stop the background refreshes, waiting for the current one to end."""
+        self.stopped.set()
+        self.refresh_requested.set()
+        if self.thread is not None:
+            self.thread.join()
+
+    def status(self):
+        """The time, size and outcome of the last refreshes."""
+        snapshot = self.snapshot
+        return {
+            "ready": snapshot is not None,
+            "refreshed_at": snapshot.refreshed_at.isoformat() if snapshot else None,
+            "courses": snapshot.num_courses if snapshot else None,
+            "last_refresh_seconds": self.last_duration,
+            "last_error": self.last_error,
+            "refresh_interval_seconds": self.refresh_interval,
+        }
+
+
+class ExportRequestHandler(BaseHTTPRequestHandler):
+    """Serve the exports of the server's ExportService."""
+
+    server_version = "ocw-oer-export"
+
+    def do_GET(self):
+        """Stream an export, or the service status."""
+        self.send_path(include_body=True)
+
+    def do_HEAD(self):
+        """Send the headers of an export, or of the service status."""
+        self.send_path(include_body=False)
+
+    def do_POST(self):
+        """Start a refresh on POST /refresh."""
+        if self.path != "/refresh":
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        self.server.service.request_refresh()
+        self.send_body(
+            HTTPStatus.ACCEPTED, b'{"refresh": "started"}', "application/json"
+        )
+
+    def send_path(self, include_body):
+        """Send the export or status found at the request path."""
+        service = self.server.service
+        path = self.path.split("?", 1)[0]
+        if path == "/status":
+            body = json.dumps(service.status()).encode("utf-8")
+            self.send_body(HTTPStatus.OK, body, "application/json", include_body)
+            return
+        snapshot = service.snapshot
+        if snapshot is None:
+            self.send_response(HTTPStatus.SERVICE_UNAVAILABLE)
+            self.send_header("Retry-After", str(RETRY_AFTER_SECONDS))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        export = snapshot.exports.get(path)
+        if export is None:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        headers = {
+            "ETag": export.etag,
+            "Last-Modified": format_datetime(snapshot.refreshed_at, usegmt=True),
+        }
+        if self.headers.get("If-None-Match") == export.etag:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return
+        self.send_body(
+            HTTPStatus.OK, export.body, export.content_type, include_body, headers
+        )
+
+    def send_body(
+        self, status, body, content_type, include_body=True, extra_headers=None
+    ):
+        """Send a response, streaming its body in chunks of RESPONSE_CHUNK_SIZE bytes."""
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (extra_headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if not include_body:
+            return
+        view = memoryview(body)
+        for start in range(0, len(view), RESPONSE_CHUNK_SIZE):
+            self.wfile.write(view[start : start + RESPONSE_CHUNK_SIZE])
+
+    def log_message(self, message_format, *args):
+        logger.info("%s - %s", self.address_string(), message_format % args)
+
+
+class ExportHTTPServer(ThreadingHTTPServer):
+    """HTTP server answering each request in a thread, from an ExportService."""
+
+    daemon_threads = True
+
+    def __init__(self, server_address, service):
+        super().__init__(server_address, ExportRequestHandler)
+        self.service = service
+
+
+def serve(host="127.0.0.1", port=8000, **options):
+    """
+    Serve the exports on host:port until interrupted, refreshing them in the background.
+
+    options: The arguments of ExportService.
+    """
+    service = ExportService(**options)
+    service.start()
+    server = ExportHTTPServer((host, port), service)
+    logger.info("Serving the OCW OER exports on http://%s:%d/", host, port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
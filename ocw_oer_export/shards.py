@@ -0,0 +1,196 @@
+"""
+Module for writing the OER CSV export as size-bounded shard files, in parallel.
+"""
+import csv
+import glob
+import hashlib
+import io
+import json
+import logging
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from .instrumentation import increment, stage
+
+logger = logging.getLogger(__name__)
+
+
+def get_shard_paths(output_path):
+    """Get the shard path template, its glob pattern, and the index path of an export."""
+    root, extension = os.path.splitext(output_path)
+    extension = extension or ".csv"
+    return (
+        f"{root}.part-{{:05d}}{extension}",
+        f"{glob.escape(root)}.part-*{glob.escape(extension)}",
+        f"{root}.shards.json",
+    )
+
+
+def write_shard(file_path, header, encoded_rows):
+    """Write a shard file, returning its size and SHA-256 checksum."""
+    shard_hash = hashlib.sha256(header)
+    with open(file_path, "wb") as shard_file:
+        shard_file.write(header)
+        for encoded_row in encoded_rows:
+            shard_file.write(encoded_row)
+            shard_hash.update(encoded_row)
+    return os.path.getsize(file_path), shard_hash.hexdigest()
+
+
+class ShardedCSVWriter:
+    """
+    Split streamed rows into CSV shards of at most max_rows rows and max_bytes bytes.
+
+    Rows are encoded as they arrive, and each full shard is handed to a pool of writer
+    threads, so shards are written while the next ones are being transformed. At most
+    twice as many shards as writers are held in memory. Each shard has the CSV header.
+
+    Shards are written to temporary files, which replace the previous export's shards
+    on close only. An index then lists every shard with its row count, size and
+    checksum, and shards left over from a previous, larger export are removed.
+
+    A single row larger than max_bytes is written to a shard of its own.
+
+    output_path: The path of the unsharded export, from which shard names are derived.
+    fieldnames: The CSV columns.
+    max_rows: Maximum number of rows per shard.
+    max_bytes: Maximum size in bytes of each shard, header included.
+    writers: Number of shards written concurrently.
+    """
+
+    def __init__(
+        self, output_path, fieldnames, max_rows=None, max_bytes=None, writers=4
+    ):
+        if max_rows is None and max_bytes is None:
+            raise ValueError("Shards need a maximum number of rows or bytes.")
+        self.output_path = output_path
+        self.shard_path_template, self.shard_glob, self.index_path = get_shard_paths(
+            output_path
+        )
+        self.fieldnames = fieldnames
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.writers = writers
+
+        self.buffer = io.StringIO()
+        self.csv_writer = csv.writer(self.buffer)
+        self.csv_writer.writerow(fieldnames)
+        self.header = self.pop_encoded()
+        self.encoded_rows = []
+        self.num_bytes = len(self.header)
+
+        self.shards = []
+        self.pending = deque()
+        self.executor = ThreadPoolExecutor(max_workers=writers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def pop_encoded(self):
+        """Get the UTF-8 encoding of the buffered CSV text, emptying the buffer."""
+        encoded = self.buffer.getvalue().encode("utf-8")
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return encoded
+
+    def writerow(self, row):
+        """Add a row of values to the current shard, starting a new one when it is full."""
+        self.csv_writer.writerow(row)
+        encoded_row = self.pop_encoded()
+        if self.encoded_rows and (
+            (self.max_rows is not None and len(self.encoded_rows) >= self.max_rows)
+            or (
+                self.max_bytes is not None
+                and self.num_bytes + len(encoded_row) > self.max_bytes
+            )
+        ):
+            self.submit_shard()
+        self.encoded_rows.append(encoded_row)
+        self.num_bytes += len(encoded_row)
+
+    def writerows(self, rows):
+        """Add every OERRecord, encoding them in the calling thread."""
+        for row in rows:
+            with stage("write"):
+                self.writerow(row.as_row())
+
+    def submit_shard(self):
+        """Hand the current shard to the writer threads."""
+        shard_path = self.shard_path_template.format(len(self.shards) + 1)
+        self.shards.append({"path": shard_path, "rows": len(self.encoded_rows)})
+        self.pending.append(
+            self.executor.submit(
+                write_shard, f"{shard_path}.tmp", self.header, self.encoded_rows
+            )
+        )
+        self.encoded_rows = []
+        self.num_bytes = len(self.header)
+        while len(self.pending) >= self.writers * 2:
+            self.collect_shard()
+
+    def collect_shard(self):
+        """Wait for the oldest shard being written and record its size and checksum."""
+        num_collected = len(self.shards) - len(self.pending)
+        num_bytes, checksum = self.pending.popleft().result()
+        self.shards[num_collected].update(bytes=num_bytes, sha256=checksum)
+
+    def close(self):
+        """Write the last shard and the index, and remove stale shards."""
+        if self.encoded_rows or not self.shards:
+            self.submit_shard()
+        while self.pending:
+            self.collect_shard()
+        self.executor.shutdown()
+        for shard in self.shards:
+            os.replace(f"{shard['path']}.tmp", shard["path"])
+
+        index = {
+            "fieldnames": self.fieldnames,
+            "max_rows": self.max_rows,
+            "max_bytes": self.max_bytes,
+            "rows": sum(shard["rows"] for shard in self.shards),
+            "bytes": sum(shard["bytes"] for shard in self.shards),
+            "shards": [
+                {**shard, "path": os.path.basename(shard["path"])}
+                for shard in self.shards
+            ],
+        }
+        temp_path = f"{self.index_path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as index_file:
+            json.dump(index, index_file, indent=4)
+        os.replace(temp_path, self.index_path)
+
+        shard_paths = {shard["path"] for shard in self.shards}
+        for stale_path in glob.glob(self.shard_glob):
+            if stale_path not in shard_paths:
+                os.remove(stale_path)
+        increment("courses", index["rows"])
+        increment("output_bytes", index["bytes"])
+        logger.info(
+            "%d rows written to %d shards, indexed in '%s'.",
+            index["rows"],
+            len(self.shards),
+            self.index_path,
+        )
+
+    def discard(self):
+        """Stop writing after a failure, removing the shards written so far."""
+        for future in self.pending:
+            future.cancel()
+        self.executor.shutdown()
+        for shard in self.shards:
+            if os.path.exists(f"{shard['path']}.tmp"):
+                os.remove(f"{shard['path']}.tmp")
+
+
+def write_csv_shards(rows, output_path, fieldnames, **kwargs):
+    """Write rows to CSV shards and their index; see ShardedCSVWriter for the options."""
+    with ShardedCSVWriter(output_path, fieldnames, **kwargs) as writer:
+        writer.writerows(rows)
@@ -3,8 +3,20 @@ Module for normalizing OCW FM export course keywords.
 """
 
 import re
+from functools import lru_cache
 from titlecase import titlecase
 
+# Bump whenever normalize_keywords' output changes, to invalidate cached keywords.
+NORMALIZE_KEYWORDS_VERSION = "1"
+
+KEYWORD_SEPARATORS_PATTERN = re.compile(r"[;,]|\n\n|\n")
+
+
+@lru_cache(maxsize=65536)
+def titlecase_keyword(keyword):
+    """Titlecase a single keyword, memoized since the same keywords recur across courses."""
+    return titlecase(keyword)
+
 
 def normalize_keywords(keywords):
     """
@@ -21,9 +33,9 @@ def normalize_keywords(keywords):
     Input:  "novel\n\nshort story\n\nthe city in literature\n\nnarrative voice"
     Output: "Novel|Short Story|The City In Literature|Narrative Voice"
     """
-    normalized_keywords = re.sub(r"[;,]|\n\n|\n", "|", keywords).strip()
+    normalized_keywords = KEYWORD_SEPARATORS_PATTERN.sub("|", keywords).strip()
     keywords_list = [
-        titlecase(keyword) if not keyword.isupper() else keyword
+        titlecase_keyword(keyword) if not keyword.isupper() else keyword
         for keyword in (
             normalized_keyword.strip()
             for normalized_keyword in normalized_keywords.split("|")
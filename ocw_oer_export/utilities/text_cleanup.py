@@ -3,8 +3,51 @@ Module for cleaning up HTML and Markdown mixed text coming out of MIT's OCW Stud
 """
 
 import re
+import threading
 from io import StringIO
 from markdown import Markdown
+from markdown.blockprocessors import HashHeaderProcessor
+from markdown.inlinepatterns import AUTOLINK_RE, AUTOMAIL_RE, HTML_RE
+
+from ..instrumentation import increment
+
+# Bump whenever text_cleanup's output changes, to invalidate cached descriptions.
+TEXT_CLEANUP_VERSION = "1"
+
+CURLY_BRACKETS_PATTERN = re.compile(r"\{\{.*?\}\}\n?")
+HTML_TAG_PATTERN = re.compile("<.*?>")
+
+PLAIN_TEXT = "plain"
+HTML_TEXT = "html"
+MARKDOWN_TEXT = "markdown"
+
+# Characters with a meaning in Markdown or HTML, or normalized by the Markdown engine.
+MARKUP_CHARS_PATTERN = re.compile(r"[\\`*_\[\]<>&{}\x02\x03\r\t]")
+MARKDOWN_CHARS_PATTERN = re.compile(r"[\\`*_\[\]]|^#", re.MULTILINE)
+# Lines that may start something other than a paragraph or a hash header, or whose
+# leading or trailing whitespace Markdown strips or turns into line breaks.
+UNSAFE_LINE_PATTERN = re.compile(
+    r"^(?:[^\S\n]|[-+=<>]|\d+\.(?:\s|$))|[^\S\n]$", re.MULTILINE
+)
+BLANK_LINES_PATTERN = re.compile(r"\n{2,}")
+
+# The subset of Markdown and HTML that strip_markup handles without the Markdown engine.
+UNSAFE_CHARS_PATTERN = re.compile(r"[\\`\x02\x03\r\t]")
+HEADER_PATTERN = HashHeaderProcessor.RE
+LINK_PATTERN = re.compile(r"(?<!!)\[([^\\`*_\[\]<>&{}\n]+)\]\(([^\s()<>\"'\\]+)\)")
+STRONG_PATTERN = re.compile(r"(?<!\*)\*\*([^\s*_](?:[^*_\n]*[^\s*_])?)\*\*(?!\*)")
+EMPHASIS_PATTERN = re.compile(r"(?<!\w)_([^\s*_](?:[^*_\n]*[^\s*_])?)_(?!\w)")
+INLINE_HTML_PATTERN = re.compile(HTML_RE)
+AUTOLINK_PATTERN = re.compile(f"{AUTOLINK_RE}|{AUTOMAIL_RE}")
+SHORTCODE_DELIMITERS_PATTERN = re.compile(r"\{\{< | >\}\}")
+# Ampersands that Python's HTML parser, run by Markdown, would turn into entities.
+UNSAFE_AMPERSAND_PATTERN = re.compile(
+    r"&(?!(?:#[0-9]+|#x[0-9a-fA-F]+|[a-zA-Z][a-zA-Z0-9]*);|[^a-zA-Z#]|$)"
+)
+PLACEHOLDER_PATTERN = re.compile("\x02([0-9]+)\x03")
+
+# Markdown converters are stateful, so each thread gets its own.
+_thread_local = threading.local()
 
 
 def cleanup_curly_brackets(text):
@@ -12,43 +55,150 @@ def cleanup_curly_brackets(text):
     Remove content within curly brackets, including the brackets themselves, from the input string.
     Also remove any lines that become empty as a result of this removal.
     """
-    pattern = re.compile(r"\{\{.*?\}\}\n?")
-    cleaned_text = re.sub(pattern, "", text)
-    return cleaned_text
+    return CURLY_BRACKETS_PATTERN.sub("", text)
 
 
 def html_to_text(html):
     """Remove HTML tags from an HTML string."""
-    pattern = re.compile("<.*?>")
-    return re.sub(pattern, "", html)
+    return HTML_TAG_PATTERN.sub("", html)
+
+
+def unmark_element(element, stream=None):
+    """Helper function to recursively extract text from Markdown elements."""
+    if stream is None:
+        stream = StringIO()
+    if element.text:
+        stream.write(element.text)
+    for sub in element:
+        unmark_element(sub, stream)
+    if element.tail:
+        stream.write(element.tail)
+    return stream.getvalue()
+
+
+# patching Markdown
+Markdown.output_formats["plain"] = unmark_element
 
 
 def create_markdown_converter():
     """Create and configure a Markdown converter for plain text output."""
-
-    def unmark_element(element, stream=None):
-        """Helper function to recursively extract text from Markdown elements."""
-        if stream is None:
-            stream = StringIO()
-        if element.text:
-            stream.write(element.text)
-        for sub in element:
-            unmark_element(sub, stream)
-        if element.tail:
-            stream.write(element.tail)
-        return stream.getvalue()
-
-    # patching Markdown
-    Markdown.output_formats["plain"] = unmark_element
     markdown_converter = Markdown(output_format="plain")
     markdown_converter.stripTopLevelTags = False
     return markdown_converter
 
 
+def get_markdown_converter():
+    """
+    Get the current thread's Markdown converter, creating it on first use.
+
+    Reusing a converter avoids rebuilding its parsers and patterns for every text,
+    and keeping one per thread makes it safe to use from parallel workers.
+    """
+    markdown_converter = getattr(_thread_local, "markdown_converter", None)
+    if markdown_converter is None:
+        markdown_converter = create_markdown_converter()
+        _thread_local.markdown_converter = markdown_converter
+    return markdown_converter
+
+
 def markdown_to_text(markdown):
     """Convert Markdown to plain text using the markdown_converter."""
-    markdown_converter = create_markdown_converter()
-    return markdown_converter.convert(markdown)
+    markdown_converter = get_markdown_converter()
+    try:
+        return markdown_converter.convert(markdown)
+    finally:
+        markdown_converter.reset()
+
+
+def classify_markup(text):
+    """
+    Tell whether a text is plain, only has HTML tags, entities or shortcodes, or has
+    Markdown, with a couple of regex scans.
+    """
+    if MARKDOWN_CHARS_PATTERN.search(text):
+        return MARKDOWN_TEXT
+    if MARKUP_CHARS_PATTERN.search(text):
+        return HTML_TEXT
+    return PLAIN_TEXT
+
+
+def join_paragraphs(text):
+    """
+    Convert plain text to what markdown_to_text gives, i.e. its paragraphs on
+    consecutive lines, or return None if Markdown would read its lines otherwise.
+    """
+    if UNSAFE_LINE_PATTERN.search(text):
+        return None
+    return "\n".join(BLANK_LINES_PATTERN.split(text.strip("\n")))
+
+
+def strip_markup(text):
+    """
+    Convert text to what markdown_to_text gives, without the Markdown engine.
+
+    It handles paragraphs, hash headers, [links](url), **strong** and _emphasized_
+    text, inline HTML tags, entities and shortcodes, which cover most descriptions.
+    Inline markup is replaced in the order the Markdown engine applies it, with
+    placeholders standing for the already converted parts like Markdown's.
+    Returns None when the text has anything else, or any doubt on how Markdown reads it.
+    """
+    if (
+        UNSAFE_CHARS_PATTERN.search(text)
+        or UNSAFE_LINE_PATTERN.search(text)
+        or AUTOLINK_PATTERN.search(text)
+    ):
+        return None
+
+    blocks = []
+    for paragraph in BLANK_LINES_PATTERN.split(text.strip("\n")):
+        lines = []
+        for line in paragraph.split("\n"):
+            header = HEADER_PATTERN.match(line)
+            if header is None:
+                lines.append(line)
+                continue
+            if lines:
+                blocks.append("\n".join(lines))
+                lines = []
+            blocks.append(header.group("header").strip())
+        if lines:
+            blocks.append("\n".join(lines))
+
+    stash = []
+
+    def stash_text(match):
+        stash.append(match.group(1))
+        return f"\x02{len(stash) - 1}\x03"
+
+    stripped = LINK_PATTERN.sub(stash_text, "\n".join(blocks))
+    if "[" in stripped or "]" in stripped or UNSAFE_AMPERSAND_PATTERN.search(stripped):
+        return None
+    for tag in INLINE_HTML_PATTERN.finditer(stripped):
+        if any(char in tag.group() for char in "*_\x02\n"):
+            return None
+    residue = SHORTCODE_DELIMITERS_PATTERN.sub(
+        "", INLINE_HTML_PATTERN.sub("", stripped)
+    )
+    if "<" in residue or ">" in residue:
+        return None
+
+    stripped = STRONG_PATTERN.sub(stash_text, stripped)
+    stripped = EMPHASIS_PATTERN.sub(stash_text, stripped)
+    if "*" in stripped or "_" in stripped:
+        return None
+    while "\x02" in stripped:
+        stripped = PLACEHOLDER_PATTERN.sub(
+            lambda match: stash[int(match.group(1))], stripped
+        )
+    return stripped.strip()
+
+
+def markdown_text_cleanup(text):
+    """Clean up text with the Markdown engine, as text_cleanup does for any Markdown."""
+    stripped_markdown = markdown_to_text(text)
+    stripped_html = html_to_text(stripped_markdown)
+    cleaned_text = cleanup_curly_brackets(stripped_html)
+    return cleaned_text
 
 
 def text_cleanup(text):
@@ -57,8 +207,23 @@ def text_cleanup(text):
     1. Converting Markdown to text,
     2. Removing HTML tags,
     3. Cleaning up curly brackets.
+
+    Plain text, the most common, skips all three steps, and the common Markdown and
+    HTML of CKEditor are stripped by strip_markup; the Markdown engine converts the rest.
     """
-    stripped_markdown = markdown_to_text(text)
+    markup = classify_markup(text)
+    if markup == PLAIN_TEXT:
+        cleaned_text = join_paragraphs(text)
+        if cleaned_text is not None:
+            increment("descriptions_plain")
+            return cleaned_text
+
+    stripped_markdown = strip_markup(text)
+    if stripped_markdown is None:
+        increment("descriptions_converted")
+        stripped_markdown = markdown_to_text(text)
+    else:
+        increment("descriptions_stripped")
     stripped_html = html_to_text(stripped_markdown)
     cleaned_text = cleanup_curly_brackets(stripped_html)
     return cleaned_text
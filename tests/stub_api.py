@@ -0,0 +1,180 @@
+"""
+Local stub of MIT Open's paginated /api/v1/courses/ endpoint for offline tests.
+"""
+import gzip
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+COURSES_PATH = "/api/v1/courses/"
+
+
+def make_courses(count):
+    """Generate minimal course records with sequential ids."""
+    return [
+        {"id": course_id, "title": f"Course {course_id}"} for course_id in range(count)
+    ]
+
+
+class StubAPIHandler(BaseHTTPRequestHandler):
+    """Serve limit/offset pages of the stub server's courses, like Django REST Framework."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        """Handle a single page request."""
+        parsed_url = urlparse(self.path)
+        if parsed_url.path != COURSES_PATH:
+            self.send_error(404)
+            return
+
+        self.server.requests_served.append(self.path)
+        self.server.client_addresses.add(self.client_address)
+        with self.server.lock:
+            self.server.in_flight += 1
+            self.server.max_in_flight = max(
+                self.server.max_in_flight, self.server.in_flight
+            )
+        try:
+            if self.server.delay:
+                time.sleep(self.server.delay)
+            self.send_page(parsed_url)
+        finally:
+            with self.server.lock:
+                self.server.in_flight -= 1
+
+    def send_page(self, parsed_url):
+        """
+        Send the page of courses selected by the URL's limit and offset, among the
+        courses modified since 'last_modified__gte' ordered by 'sortby', if given.
+        """
+        with self.server.lock:
+            failure = self.server.failures.pop(0) if self.server.failures else None
+        if failure is not None:
+            self.server.status_codes.append(failure)
+            self.send_response(failure)
+            if self.server.retry_after is not None:
+                self.send_header("Retry-After", str(self.server.retry_after))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        query = parse_qs(parsed_url.query)
+        limit = int(query.get("limit", ["100"])[-1])
+        if self.server.max_limit is not None:
+            limit = min(limit, self.server.max_limit)
+        offset = int(query.get("offset", ["0"])[-1])
+        courses = self.server.courses
+        if "last_modified__gte" in query:
+            modified_since = query["last_modified__gte"][-1]
+            courses = [
+                course
+                for course in courses
+                if course["last_modified"] >= modified_since
+            ]
+        if query.get("sortby") == ["last_modified"]:
+            courses = sorted(courses, key=lambda course: course["last_modified"])
+        next_offset = offset + limit
+
+        next_page = None
+        if next_offset < len(courses):
+            next_query = {key: values[-1] for key, values in query.items()}
+            next_query.update({"limit": limit, "offset": next_offset})
+            next_page = f"{self.server.base_url}{COURSES_PATH}?{urlencode(next_query)}"
+
+        body = json.dumps(
+            {
+                "count": len(courses),
+                "next": next_page,
+                "previous": None,
+                "results": courses[offset:next_offset],
+            }
+        ).encode("utf-8")
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.server.status_codes.append(304)
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        self.server.status_codes.append(200)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", etag)
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Keep test output quiet."""
+
+
+class StubAPIServer:
+    """
+    Run the stub API on a random local port for the duration of a `with` block.
+
+    courses: The full list of course records to paginate over.
+    delay: Seconds to sleep before answering each request, to simulate network latency.
+    failures: Error status codes answered, in order, to the first page requests.
+    retry_after: Value of the Retry-After header sent with those errors.
+    max_limit: If set, the largest page size answered, whatever the limit requested.
+    """
+
+    def __init__(self, courses, delay=0, failures=(), retry_after=None, max_limit=None):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubAPIHandler)
+        self.server.courses = courses
+        self.server.delay = delay
+        self.server.failures = list(failures)
+        self.server.retry_after = retry_after
+        self.server.max_limit = max_limit
+        self.server.requests_served = []
+        self.server.client_addresses = set()
+        self.server.status_codes = []
+        self.server.lock = threading.Lock()
+        self.server.in_flight = 0
+        self.server.max_in_flight = 0
+        host, port = self.server.server_address
+        self.server.base_url = f"http://{host}:{port}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def api_url(self):
+        """URL of the stub courses endpoint, as found in config.API_URL."""
+        return f"{self.server.base_url}{COURSES_PATH}?platform=ocw"
+
+    @property
+    def requests_served(self):
+        """Paths of every request the stub has answered."""
+        return self.server.requests_served
+
+    @property
+    def status_codes(self):
+        """Status codes of every page response, 304 when the client's ETag matched."""
+        return self.server.status_codes
+
+    @property
+    def max_in_flight(self):
+        """Largest number of requests the stub was answering at the same time."""
+        return self.server.max_in_flight
+
+    @property
+    def client_addresses(self):
+        """Distinct (host, port) pairs the stub was connected from."""
+        return self.server.client_addresses
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
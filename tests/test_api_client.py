@@ -0,0 +1,50 @@
+import unittest
+from ocw_oer_export.client import OCWClient, RequestTiming
+from tests.stub_api import StubAPIServer, make_courses
+
+
+class APIClientTestCase(unittest.TestCase):
+    """Test suite for the pooled, timed API client against a local stub API."""
+
+    def test_connections_are_kept_alive(self):
+        """Test that sequential pages are fetched over a single kept-alive connection."""
+        courses = make_courses(500)
+        with StubAPIServer(courses) as stub, OCWClient(page_size=50) as client:
+            api_data = client.extract_data_from_api(stub.api_url)
+            client_addresses = stub.client_addresses
+
+        self.assertEqual(api_data, courses)
+        self.assertEqual(len(client_addresses), 1)
+
+    def test_request_timings_are_recorded(self):
+        """Test that every request is timed with its page size and decoded size."""
+        courses = make_courses(250)
+        with StubAPIServer(courses) as stub, OCWClient(page_size=100) as client:
+            client.extract_data_from_api(stub.api_url)
+
+        self.assertEqual(len(client.timings), 3)
+        self.assertTrue(all(timing.status_code == 200 for timing in client.timings))
+        self.assertTrue(all(timing.page_size == 100 for timing in client.timings))
+        self.assertTrue(all(timing.num_bytes > 0 for timing in client.timings))
+        self.assertEqual(client.timing_summary()["requests"], 3)
+
+    def test_adaptive_page_size_grows_to_target(self):
+        """Test that adaptive paging grows the page size until a target is reached."""
+        courses = make_courses(3000)
+        with StubAPIServer(courses) as stub, OCWClient(
+            page_size=10, adaptive_page_size=True, max_page_size=400
+        ) as client:
+            api_data = client.extract_data_from_api(stub.api_url)
+
+        self.assertEqual(api_data, courses)
+        page_sizes = [timing.page_size for timing in client.timings]
+        self.assertEqual(page_sizes[:6], [10, 20, 40, 80, 160, 320])
+        self.assertEqual(max(page_sizes), 400)
+
+    def test_adaptive_page_size_shrinks_over_byte_target(self):
+        """Test that adaptive paging backs off when a page exceeds the size target."""
+        client = OCWClient(adaptive_page_size=True, target_bytes=1000)
+        timing = RequestTiming(
+            url="", status_code=200, page_size=100, elapsed=0.01, num_bytes=5000
+        )
+        self.assertEqual(client.next_page_size(100, timing), 50)
@@ -0,0 +1,157 @@
+import csv
+import importlib.util
+import json
+import os
+import tempfile
+import unittest
+from ocw_oer_export.client import OCWClient
+from ocw_oer_export.create_csv import create_csv, transform_data
+from ocw_oer_export.create_json import create_json
+from ocw_oer_export.export import csv_sink, export, json_snapshot_sink
+from ocw_oer_export.oer_record import MULTI_VALUED_FIELDS, OER_FIELDNAMES
+from tests.stub_api import StubAPIServer
+
+if importlib.util.find_spec("pyarrow"):
+    import pyarrow.ipc
+    import pyarrow.parquet
+    import pyarrow.types
+    from ocw_oer_export.arrow_export import oer_records_writer, read_arrow_table
+
+
+@unittest.skipUnless(importlib.util.find_spec("pyarrow"), "requires pyarrow")
+class ArrowExportTestCase(unittest.TestCase):
+    """Test suite for writing the OER records and the snapshot as Parquet and Arrow IPC."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Class setup that runs once before all tests."""
+        cls.test_dir = os.path.dirname(__file__)
+        cls.sample_json_path = os.path.join(cls.test_dir, "sample_courses.json")
+        with open(cls.sample_json_path, encoding="utf-8") as json_file:
+            cls.sample_courses = json.load(json_file)
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_dir = temp_dir.name
+        self.csv_path = os.path.join(self.temp_dir, "ocw_oer_export.csv")
+
+    def read_csv_rows(self):
+        """Read the rows of the CSV export as dictionaries."""
+        with open(self.csv_path, newline="", encoding="utf-8") as csv_file:
+            return list(csv.DictReader(csv_file))
+
+    def assert_same_records(self, arrow_path):
+        """Assert that an Arrow file holds the rows of the CSV export."""
+        table = read_arrow_table(arrow_path)
+        self.assertEqual(table.column_names, OER_FIELDNAMES)
+        rows = [
+            {
+                field: "|".join(value) if field in MULTI_VALUED_FIELDS else value or ""
+                for field, value in row.items()
+            }
+            for row in table.to_pylist()
+        ]
+        self.assertEqual(rows, self.read_csv_rows())
+
+    def test_records_match_csv(self):
+        """Test that both formats hold the CSV rows, with multi-valued lists."""
+        for extension in ["parquet", "arrow", "feather"]:
+            with self.subTest(extension):
+                arrow_path = os.path.join(self.temp_dir, f"ocw_oer_export.{extension}")
+                create_csv(
+                    source="json",
+                    input_path=self.sample_json_path,
+                    output_path=self.csv_path,
+                    arrow_output_path=arrow_path,
+                )
+                self.assert_same_records(arrow_path)
+                subjects = read_arrow_table(arrow_path, ["CR_SUBJECT"])["CR_SUBJECT"]
+                self.assertTrue(pyarrow.types.is_list(subjects.type))
+                self.assertIsInstance(subjects[0].as_py(), list)
+
+    def test_row_groups(self):
+        """Test that rows are written in row groups of the given size."""
+        rows = transform_data(self.sample_courses)
+        num_groups = -(-len(rows) // 3)
+        parquet_path = os.path.join(self.temp_dir, "ocw_oer_export.parquet")
+        arrow_path = os.path.join(self.temp_dir, "ocw_oer_export.arrow")
+        for path in [parquet_path, arrow_path]:
+            with oer_records_writer(path, row_group_size=3) as writer:
+                self.assertEqual(list(writer.iter_rows(rows)), rows)
+
+        self.assertEqual(
+            pyarrow.parquet.ParquetFile(parquet_path).num_row_groups, num_groups
+        )
+        self.assertEqual(
+            pyarrow.ipc.open_file(arrow_path).num_record_batches, num_groups
+        )
+
+    def test_column_pruned_read(self):
+        """Test reading only some columns of either format."""
+        for extension in ["parquet", "arrow"]:
+            with self.subTest(extension):
+                arrow_path = os.path.join(self.temp_dir, f"ocw_oer_export.{extension}")
+                with oer_records_writer(arrow_path) as writer:
+                    writer.write_rows(transform_data(self.sample_courses))
+                table = read_arrow_table(arrow_path, columns=["CR_URL", "CR_KEYWORDS"])
+                self.assertEqual(table.column_names, ["CR_URL", "CR_KEYWORDS"])
+                self.assertEqual(table.num_rows, len(self.sample_courses))
+
+    def test_failed_export(self):
+        """Test that a failed export leaves the previous file, and no temporary file."""
+        arrow_path = os.path.join(self.temp_dir, "ocw_oer_export.arrow")
+        rows = transform_data(self.sample_courses)
+        with oer_records_writer(arrow_path) as writer:
+            writer.write_rows(rows[:2])
+        with self.assertRaises(RuntimeError):
+            with oer_records_writer(arrow_path, row_group_size=3) as writer:
+                writer.write_rows(rows)
+                raise RuntimeError("Transform failed")
+
+        self.assertEqual(os.listdir(self.temp_dir), ["ocw_oer_export.arrow"])
+        self.assertEqual(read_arrow_table(arrow_path).num_rows, 2)
+
+    def test_snapshot(self):
+        """Test snapshots from create_json and from a single download with the CSV."""
+        arrow_path = os.path.join(self.temp_dir, "ocw_api_data.arrow")
+        parquet_path = os.path.join(self.temp_dir, "ocw_api_data.parquet")
+        records_path = os.path.join(self.temp_dir, "ocw_oer_export.parquet")
+        with StubAPIServer(self.sample_courses) as stub, OCWClient(
+            page_size=3
+        ) as client:
+            create_json(arrow_path, client=client, api_url=stub.api_url)
+            failures = export(
+                [
+                    csv_sink(self.csv_path, arrow_output_path=records_path),
+                    json_snapshot_sink(parquet_path),
+                ],
+                api_url=stub.api_url,
+                client=client,
+            )
+
+        self.assertEqual(failures, {})
+        self.assert_same_records(records_path)
+        for path in [arrow_path, parquet_path]:
+            table = read_arrow_table(path)
+            self.assertEqual(
+                [json.loads(course) for course in table["course"].to_pylist()],
+                self.sample_courses,
+            )
+            self.assertEqual(
+                table["id"].to_pylist(), [c["id"] for c in self.sample_courses]
+            )
+            self.assertEqual(
+                table["topics"][0].as_py(),
+                [topic["name"] for topic in self.sample_courses[0]["topics"]],
+            )
+
+    def test_incremental_snapshot(self):
+        """Test that incremental snapshots cannot be Arrow files."""
+        arrow_path = os.path.join(self.temp_dir, "ocw_api_data.arrow")
+        with self.assertRaises(ValueError):
+            create_json(arrow_path, incremental=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
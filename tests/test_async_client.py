@@ -0,0 +1,207 @@
+import asyncio
+import importlib
+import importlib.util
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from ocw_oer_export import cli
+from ocw_oer_export.async_client import AsyncOCWClient, extract_data_from_api_async
+from ocw_oer_export.async_export import create_csv_async
+from ocw_oer_export.cache import CourseCache, HTTPCache
+from ocw_oer_export.client import OCWClient
+from ocw_oer_export.data_handler import extract_data_from_file, extract_data_from_json
+from ocw_oer_export.scheduler import RequestScheduler
+from tests.stub_api import StubAPIServer, make_courses
+
+create_csv_module = importlib.import_module("ocw_oer_export.create_csv")
+
+
+@unittest.skipUnless(importlib.util.find_spec("httpx"), "requires httpx")
+class AsyncClientTestCase(unittest.TestCase):
+    """Test suite for the asyncio client and export pipeline against a local stub API."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_async_extraction_in_order(self):
+        """Test that pages fetched concurrently are returned in offset order."""
+        courses = make_courses(1050)
+        with StubAPIServer(courses) as stub:
+            api_data = asyncio.run(
+                extract_data_from_api_async(stub.api_url, concurrency=4)
+            )
+        self.assertEqual(api_data, courses)
+
+    def test_capped_page_size(self):
+        """Test that no course is skipped when the API caps the page size."""
+        courses = make_courses(1000)
+        with StubAPIServer(courses, max_limit=100) as stub, OCWClient(
+            page_size=500
+        ) as client:
+            api_data = asyncio.run(
+                extract_data_from_api_async(stub.api_url, concurrency=4, client=client)
+            )
+        self.assertEqual(api_data, courses)
+
+    def test_transient_errors_are_retried(self):
+        """Test that the asyncio client retries through the client's scheduler."""
+        courses = make_courses(250)
+        scheduler = RequestScheduler(base_delay=0.01, max_delay=0.05)
+        with StubAPIServer(courses, failures=[503, 502]) as stub, OCWClient(
+            page_size=100, scheduler=scheduler
+        ) as client:
+            api_data = asyncio.run(
+                extract_data_from_api_async(stub.api_url, concurrency=2, client=client)
+            )
+            status_codes = stub.status_codes
+
+        self.assertEqual(api_data, courses)
+        self.assertEqual(status_codes, [503, 502, 200, 200, 200])
+        self.assertEqual(scheduler.metrics.as_dict()["retries"], 2)
+        self.assertEqual(len(client.timings), 5)
+
+    def test_http_cache_is_shared(self):
+        """Test that pages cached by a concurrent synchronous run are revalidated."""
+        courses = make_courses(250)
+        cache_path = os.path.join(self.temp_dir.name, "cache.sqlite3")
+        with StubAPIServer(courses) as stub, HTTPCache(cache_path) as cache:
+            with OCWClient(cache=cache, max_workers=2) as client:
+                client.extract_data_from_api(stub.api_url)
+                api_data = asyncio.run(
+                    extract_data_from_api_async(stub.api_url, client=client)
+                )
+            status_codes = stub.status_codes
+
+        self.assertEqual(api_data, courses)
+        self.assertEqual(status_codes, [200, 200, 200, 304, 304, 304])
+
+    def test_client_closed(self):
+        """Test that only the client created by the async client is closed."""
+        with StubAPIServer(make_courses(10)) as stub:
+            with mock.patch.object(OCWClient, "close") as close:
+                asyncio.run(extract_data_from_api_async(stub.api_url))
+            self.assertEqual(close.call_count, 1)
+
+            with OCWClient() as client, mock.patch.object(client, "close") as close:
+                asyncio.run(extract_data_from_api_async(stub.api_url, client=client))
+            close.assert_not_called()
+
+    def test_concurrency_limit(self):
+        """Test that no more requests than the concurrency limit are in flight."""
+        with StubAPIServer(make_courses(1000), delay=0.05) as stub, OCWClient(
+            page_size=50, pool_size=3
+        ) as client:
+            asyncio.run(
+                extract_data_from_api_async(stub.api_url, concurrency=3, client=client)
+            )
+            max_in_flight = stub.max_in_flight
+        self.assertLessEqual(max_in_flight, 3)
+        self.assertGreater(max_in_flight, 1)
+
+    def test_async_csv_creation(self):
+        """Test that the asyncio pipeline writes the expected CSV and JSON Lines snapshot."""
+        test_dir = os.path.dirname(__file__)
+        with open(
+            os.path.join(test_dir, "sample_courses.json"), encoding="utf-8"
+        ) as json_file:
+            sample_courses = json.load(json_file)
+        output_path = os.path.join(self.temp_dir.name, "output.csv")
+        snapshot_path = os.path.join(self.temp_dir.name, "data.jsonl")
+
+        with StubAPIServer(sample_courses) as stub, OCWClient(page_size=3) as client:
+            asyncio.run(
+                create_csv_async(
+                    output_path=output_path,
+                    api_url=stub.api_url,
+                    concurrency=2,
+                    client=client,
+                    json_output_path=snapshot_path,
+                )
+            )
+
+        self.assertEqual(
+            extract_data_from_file(output_path),
+            extract_data_from_file(os.path.join(test_dir, "expected_courses.csv")),
+        )
+        self.assertEqual(extract_data_from_json(snapshot_path), sample_courses)
+        self.assertFalse(os.path.exists(f"{output_path}.tmp"))
+
+    def test_async_csv_options(self):
+        """Test that the asyncio pipeline honors the CSV options, e.g. a CourseCache."""
+        with open(
+            os.path.join(os.path.dirname(__file__), "sample_courses.json"),
+            encoding="utf-8",
+        ) as json_file:
+            courses = json.load(json_file)
+        output_path = os.path.join(self.temp_dir.name, "output.csv")
+
+        with StubAPIServer(courses) as stub, OCWClient(
+            page_size=3
+        ) as client, CourseCache(
+            os.path.join(self.temp_dir.name, "cache.sqlite3")
+        ) as course_cache:
+            for _ in range(2):
+                with mock.patch.object(
+                    create_csv_module,
+                    "transform_single_course",
+                    wraps=create_csv_module.transform_single_course,
+                ) as transform_single_course:
+                    asyncio.run(
+                        create_csv_async(
+                            output_path=output_path,
+                            api_url=stub.api_url,
+                            client=client,
+                            course_cache=course_cache,
+                        )
+                    )
+        self.assertEqual(transform_single_course.call_count, 0)
+        self.assertEqual(
+            extract_data_from_file(output_path),
+            extract_data_from_file(
+                os.path.join(os.path.dirname(__file__), "expected_courses.csv")
+            ),
+        )
+
+    def test_failed_download(self):
+        """Test that a failed download raises its error and writes no CSV."""
+        output_path = os.path.join(self.temp_dir.name, "output.csv")
+        fetch_page = AsyncOCWClient.fetch_page
+
+        async def failing_fetch_page(self, api_url, offset=None, page_size=None):
+            if offset == 20:
+                raise ConnectionError("Connection reset")
+            return await fetch_page(self, api_url, offset, page_size)
+
+        with StubAPIServer(make_courses(30)) as stub, OCWClient(page_size=5) as client:
+            with mock.patch.object(AsyncOCWClient, "fetch_page", failing_fetch_page):
+                with self.assertRaises(ConnectionError):
+                    asyncio.run(
+                        create_csv_async(
+                            output_path=output_path, api_url=stub.api_url, client=client
+                        )
+                    )
+        self.assertEqual(os.listdir(self.temp_dir.name), [])
+
+
+class AsyncCLITestCase(unittest.TestCase):
+    """Test suite for the --use_async command-line option."""
+
+    def test_unsupported_cli_options(self):
+        """Test that --use_async is rejected where it does not apply."""
+        for arguments in [
+            ["--create_json", "--use_async"],
+            ["--create_csv", "--source=json", "--use_async"],
+        ]:
+            with self.subTest(arguments), mock.patch(
+                "sys.argv", ["ocw_oer_export", *arguments]
+            ), mock.patch("sys.stderr"), self.assertRaises(SystemExit):
+                cli.main()
+
+
+if __name__ == "__main__":
+    unittest.main()
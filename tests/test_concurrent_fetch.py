@@ -0,0 +1,60 @@
+import threading
+import unittest
+from unittest import mock
+
+import requests
+from ocw_oer_export.client import OCWClient, extract_data_from_api
+from tests.stub_api import StubAPIServer, make_courses
+
+
+class ConcurrentFetchTestCase(unittest.TestCase):
+    """Test suite for fetching API pages concurrently against a local stub API."""
+
+    def test_concurrent_fetch_matches_sequential(self):
+        """Test that concurrent fetching returns the same courses, in the same order."""
+        courses = make_courses(1234)
+        with StubAPIServer(courses) as stub:
+            sequential_data = extract_data_from_api(stub.api_url)
+            concurrent_data = extract_data_from_api(stub.api_url, max_workers=4)
+
+        self.assertEqual(sequential_data, courses)
+        self.assertEqual(concurrent_data, sequential_data)
+
+    def test_capped_page_size(self):
+        """Test that no course is skipped when the API caps the page size."""
+        courses = make_courses(1000)
+        with StubAPIServer(courses, max_limit=100) as stub:
+            for max_workers in [None, 4]:
+                with self.subTest(max_workers=max_workers), OCWClient(
+                    page_size=500, max_workers=max_workers
+                ) as client:
+                    self.assertEqual(
+                        client.extract_data_from_api(stub.api_url), courses
+                    )
+
+    def test_pages_are_requested_concurrently(self):
+        """Test that concurrent fetching has several requests in flight at once."""
+        courses = make_courses(2000)
+        lock = threading.Lock()
+        in_flight = {"current": 0, "max": 0}
+        session_get = requests.Session.get
+
+        def counting_get(session, *args, **kwargs):
+            with lock:
+                in_flight["current"] += 1
+                in_flight["max"] = max(in_flight["max"], in_flight["current"])
+            try:
+                return session_get(session, *args, **kwargs)
+            finally:
+                with lock:
+                    in_flight["current"] -= 1
+
+        with StubAPIServer(courses, delay=0.05) as stub, mock.patch.object(
+            requests.Session, "get", autospec=True, side_effect=counting_get
+        ):
+            sequential_data = extract_data_from_api(stub.api_url)
+            self.assertEqual(in_flight["max"], 1)
+            concurrent_data = extract_data_from_api(stub.api_url, max_workers=8)
+
+        self.assertEqual(concurrent_data, sequential_data)
+        self.assertGreater(in_flight["max"], 1)
@@ -0,0 +1,44 @@
+import json
+import os
+import unittest
+from ocw_oer_export.client import OCWClient
+from ocw_oer_export.create_csv import create_csv
+from ocw_oer_export.data_handler import extract_data_from_file
+from ocw_oer_export.utilities import delete_file
+from tests.stub_api import StubAPIServer
+
+
+class CSVCreationFromAPITestCase(unittest.TestCase):
+    """Test suite for verifying CSV creation streamed from a local stub API."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Class setup that runs once before all tests."""
+        cls.test_dir = os.path.dirname(__file__)
+        cls.expected_csv_path = os.path.join(cls.test_dir, "expected_courses.csv")
+        cls.sample_json_path = os.path.join(cls.test_dir, "sample_courses.json")
+        cls.generated_csv_path = os.path.join(cls.test_dir, "test_output_api.csv")
+        with open(cls.sample_json_path, encoding="utf-8") as json_file:
+            cls.sample_courses = json.load(json_file)
+
+    def test_csv_creation_from_api(self):
+        """Test the CSV streamed from paginated API data matches the expected CSV."""
+        with StubAPIServer(self.sample_courses) as stub, OCWClient(
+            page_size=3
+        ) as client:
+            create_csv(
+                source="api",
+                output_path=self.generated_csv_path,
+                client=client,
+                api_url=stub.api_url,
+            )
+        generated_csv_data = extract_data_from_file(self.generated_csv_path)
+        expected_csv_data = extract_data_from_file(self.expected_csv_path)
+
+        self.assertEqual(generated_csv_data, expected_csv_data)
+        self.assertFalse(os.path.exists(f"{self.generated_csv_path}.tmp"))
+
+    @classmethod
+    def tearDownClass(cls):
+        """Class teardown that runs once after all tests."""
+        delete_file(cls.generated_csv_path)
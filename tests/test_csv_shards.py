@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+import tempfile
+import unittest
+from ocw_oer_export.create_csv import OER_FIELDNAMES, create_csv
+from ocw_oer_export.oer_record import VARIABLE_FIELDS, OERRecord
+from ocw_oer_export.shards import ShardedCSVWriter, get_shard_paths
+
+
+class CSVShardsTestCase(unittest.TestCase):
+    """Test suite for splitting the CSV export into size-bounded shards."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Class setup that runs once before all tests."""
+        cls.test_dir = os.path.dirname(__file__)
+        cls.sample_json_path = os.path.join(cls.test_dir, "sample_courses.json")
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_path = os.path.join(self.temp_dir.name, "ocw_oer_export.csv")
+        self.index_path = get_shard_paths(self.output_path)[2]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def create_shards(self, **kwargs):
+        """Create the sharded export of the sample courses and load its index."""
+        create_csv(
+            source="json",
+            input_path=self.sample_json_path,
+            output_path=self.output_path,
+            **kwargs,
+        )
+        with open(self.index_path, encoding="utf-8") as index_file:
+            return json.load(index_file)
+
+    def read_shard(self, shard):
+        """Read a shard's content, checking it against its index entry."""
+        with open(os.path.join(self.temp_dir.name, shard["path"]), "rb") as shard_file:
+            content = shard_file.read()
+        self.assertEqual(len(content), shard["bytes"])
+        self.assertEqual(hashlib.sha256(content).hexdigest(), shard["sha256"])
+        return content
+
+    def test_shards_by_rows(self):
+        """Test that the shards split the unsharded CSV into row-bounded parts."""
+        create_csv(
+            source="json",
+            input_path=self.sample_json_path,
+            output_path=self.output_path,
+        )
+        with open(self.output_path, "rb") as csv_file:
+            expected_content = csv_file.read()
+        os.remove(self.output_path)
+        index = self.create_shards(shard_rows=3, shard_writers=2)
+
+        self.assertEqual([shard["rows"] for shard in index["shards"]], [3, 3, 3, 1])
+        self.assertEqual(index["rows"], 10)
+        header = expected_content.split(b"\r\n", 1)[0] + b"\r\n"
+        content = header
+        for shard in index["shards"]:
+            shard_content = self.read_shard(shard)
+            self.assertTrue(shard_content.startswith(header))
+            content += shard_content[len(header) :]
+        self.assertEqual(content, expected_content)
+        self.assertFalse(os.path.exists(self.output_path))
+
+    def test_shards_by_bytes(self):
+        """Test that no shard exceeds the byte bound, unless it holds a single row."""
+        index = self.create_shards(shard_bytes=4000)
+
+        self.assertGreater(len(index["shards"]), 1)
+        for shard in index["shards"]:
+            self.read_shard(shard)
+            self.assertTrue(shard["bytes"] <= 4000 or shard["rows"] == 1)
+        self.assertEqual(index["rows"], 10)
+
+    def test_stale_shards_are_removed(self):
+        """Test that a smaller export removes the shards left over from a larger one."""
+        self.create_shards(shard_rows=2)
+        index = self.create_shards(shard_rows=5)
+
+        shard_files = sorted(
+            file_name
+            for file_name in os.listdir(self.temp_dir.name)
+            if ".part-" in file_name
+        )
+        self.assertEqual(shard_files, [shard["path"] for shard in index["shards"]])
+
+    def test_failed_export_keeps_previous_shards(self):
+        """Test that a failing export leaves the previous shards and no temporary files."""
+        index = self.create_shards(shard_rows=4)
+        previous_files = sorted(os.listdir(self.temp_dir.name))
+
+        def failing_rows():
+            yield OERRecord(*["value"] * len(VARIABLE_FIELDS))
+            raise RuntimeError("transform failed")
+
+        with self.assertRaises(RuntimeError):
+            with ShardedCSVWriter(
+                self.output_path, OER_FIELDNAMES, max_rows=1
+            ) as writer:
+                writer.writerows(failing_rows())
+
+        self.assertEqual(sorted(os.listdir(self.temp_dir.name)), previous_files)
+        for shard in index["shards"]:
+            self.read_shard(shard)
+
+
+if __name__ == "__main__":
+    unittest.main()
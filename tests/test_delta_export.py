@@ -0,0 +1,116 @@
+import copy
+import csv
+import json
+import os
+import tempfile
+import unittest
+from ocw_oer_export.create_csv import create_csv
+from ocw_oer_export.data_handler import extract_data_from_json
+from ocw_oer_export.delta import get_delta_paths
+
+
+def read_csv(file_path):
+    """Read the rows of a CSV file as dictionaries."""
+    with open(file_path, newline="", encoding="utf-8") as csv_file:
+        return list(csv.DictReader(csv_file))
+
+
+class DeltaExportTestCase(unittest.TestCase):
+    """Test suite for exporting the rows changed since a previous CSV export."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Class setup that runs once before all tests."""
+        cls.test_dir = os.path.dirname(__file__)
+        cls.sample_courses = extract_data_from_json(
+            os.path.join(cls.test_dir, "sample_courses.json")
+        )
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_path = os.path.join(self.temp_dir.name, "ocw_oer_export.csv")
+        self.input_path = os.path.join(self.temp_dir.name, "ocw_api_data.json")
+        self.export(self.sample_courses)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def export(self, courses, delta_against=None):
+        """Create the CSV export of the given courses."""
+        with open(self.input_path, "w", encoding="utf-8") as json_file:
+            json.dump(courses, json_file)
+        create_csv(
+            source="json",
+            input_path=self.input_path,
+            output_path=self.output_path,
+            delta_against=delta_against,
+        )
+
+    def test_delta_against_previous_export(self):
+        """Test that added, changed and removed rows are each written to their CSV."""
+        previous_rows = read_csv(self.output_path)
+        courses = copy.deepcopy(self.sample_courses)
+        removed_course = courses.pop(0)
+        courses[0]["title"] = "Renamed Course"
+        added_course = copy.deepcopy(courses[1])
+        added_course["runs"][0]["url"] = "https://ocw.mit.edu/courses/new-course"
+        courses.append(added_course)
+
+        self.export(courses, delta_against=self.output_path)
+        paths = get_delta_paths(self.output_path)
+
+        added_rows = read_csv(paths["added"])
+        self.assertEqual(
+            [row["CR_URL"] for row in added_rows], [added_course["runs"][0]["url"]]
+        )
+        changed_rows = read_csv(paths["changed"])
+        self.assertEqual([row["CR_TITLE"] for row in changed_rows], ["Renamed Course"])
+        removed_rows = read_csv(paths["removed"])
+        self.assertEqual(removed_rows, [previous_rows[0]])
+        self.assertEqual(removed_rows[0]["CR_URL"], removed_course["runs"][0]["url"])
+
+        with open(paths["manifest"], encoding="utf-8") as manifest_file:
+            manifest = json.load(manifest_file)
+        self.assertEqual(
+            manifest["counts"],
+            {
+                "added": 1,
+                "changed": 1,
+                "removed": 1,
+                "unchanged": len(self.sample_courses) - 2,
+            },
+        )
+        self.assertEqual(len(read_csv(self.output_path)), len(courses))
+
+    def test_unchanged_export_has_empty_delta(self):
+        """Test that re-exporting the same courses yields no delta rows."""
+        self.export(self.sample_courses, delta_against=self.output_path)
+        paths = get_delta_paths(self.output_path)
+
+        for kind in ["added", "changed", "removed"]:
+            with self.subTest(kind=kind):
+                self.assertEqual(read_csv(paths[kind]), [])
+        self.assertFalse(
+            any(
+                file_name.endswith(".tmp")
+                for file_name in os.listdir(self.temp_dir.name)
+            )
+        )
+
+    def test_missing_previous_export(self):
+        """Test that a first run against a missing export counts every row as added."""
+        os.remove(self.output_path)
+        self.export(self.sample_courses, delta_against=self.output_path)
+        paths = get_delta_paths(self.output_path)
+
+        self.assertEqual(read_csv(paths["added"]), read_csv(self.output_path))
+        self.assertEqual(read_csv(paths["changed"]), [])
+        self.assertEqual(read_csv(paths["removed"]), [])
+        with open(paths["manifest"], encoding="utf-8") as manifest_file:
+            manifest = json.load(manifest_file)
+        self.assertIsNone(manifest["previous_sha256"])
+        self.assertEqual(manifest["counts"]["added"], len(self.sample_courses))
+
+
+if __name__ == "__main__":
+    unittest.main()
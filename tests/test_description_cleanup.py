@@ -1,4 +1,5 @@
 import unittest
+from concurrent.futures import ThreadPoolExecutor
 from ocw_oer_export.utilities import text_cleanup
 
 
@@ -42,3 +43,20 @@ class DescriptionCleanupTests(unittest.TestCase):
         cleaned_text = text_cleanup(sample_text)
         expected_description = "CHINESE COURSES\nCOURSE SITES"
         self.assertEqual(cleaned_text, expected_description)
+
+    def test_converter_state_is_reset(self):
+        """Test that a reference defined in one description does not leak into the next."""
+        text_cleanup("See [the syllabus][syllabus].\n\n[syllabus]: https://ocw.mit.edu")
+        cleaned_text = text_cleanup("See [the syllabus][syllabus].")
+        self.assertEqual(cleaned_text, "See [the syllabus][syllabus].")
+
+    def test_parallel_cleanup(self):
+        """Test that descriptions cleaned up from parallel threads match serial cleanup."""
+        sample_texts = [
+            f"### Unit {number}\n\n**Bold** text with <em>HTML</em>{{{{< br >}}}}"
+            for number in range(200)
+        ]
+        expected_texts = [text_cleanup(text) for text in sample_texts]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            cleaned_texts = list(executor.map(text_cleanup, sample_texts))
+        self.assertEqual(cleaned_texts, expected_texts)
@@ -0,0 +1,225 @@
+import gc
+import importlib
+import json
+import os
+import pickle
+import tempfile
+import unittest
+import weakref
+from unittest import mock
+from ocw_oer_export import cli
+from ocw_oer_export.cache import CourseCache, HTTPCache, SQLiteCache, TextCache
+from ocw_oer_export.client import OCWClient
+from ocw_oer_export.create_csv import transform_data
+from tests.stub_api import StubAPIServer, make_courses
+
+# The package re-exports the create_csv function under the module's name.
+create_csv_module = importlib.import_module("ocw_oer_export.create_csv")
+
+
+class HTTPCacheTestCase(unittest.TestCase):
+    """Test suite for reusing unchanged API pages from the on-disk HTTP cache."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.temp_dir.name, "cache.sqlite3")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def extract(self, stub, **cache_options):
+        """Extract all courses from the stub through a fresh client and cache."""
+        with HTTPCache(self.cache_path, **cache_options) as cache, OCWClient(
+            cache=cache
+        ) as client:
+            return client.extract_data_from_api(stub.api_url)
+
+    def test_unchanged_pages_are_revalidated(self):
+        """Test that a second run only gets 304s, and a changed page is re-downloaded."""
+        courses = make_courses(250)
+        with StubAPIServer(courses) as stub:
+            first_run = self.extract(stub)
+            second_run = self.extract(stub)
+            courses[150]["title"] = "Changed"
+            third_run = self.extract(stub)
+            status_codes = stub.status_codes
+
+        self.assertEqual(first_run, second_run)
+        self.assertEqual(third_run[150]["title"], "Changed")
+        self.assertEqual(status_codes, [200, 200, 200, 304, 304, 304, 304, 200, 304])
+
+    def test_fresh_pages_skip_the_api(self):
+        """Test that pages within their TTL are served without any request."""
+        courses = make_courses(250)
+        with StubAPIServer(courses) as stub:
+            self.extract(stub)
+            cached_run = self.extract(stub, ttl=3600)
+            requests_served = len(stub.requests_served)
+
+        self.assertEqual(cached_run, courses)
+        self.assertEqual(requests_served, 3)
+
+    def test_size_based_eviction(self):
+        """Test that the least recently used pages over max_bytes are evicted on close."""
+        with HTTPCache(self.cache_path, max_bytes=25) as cache:
+            cache.store("https://example.com/1", b"0123456789")
+            cache.store("https://example.com/2", b"0123456789")
+            cache.get("https://example.com/1")
+            cache.touch("https://example.com/1")
+            cache.store("https://example.com/3", b"0123456789")
+            self.assertIsNotNone(cache.get("https://example.com/2"))
+
+        with HTTPCache(self.cache_path, max_bytes=25) as cache:
+            self.assertIsNotNone(cache.get("https://example.com/1"))
+            self.assertIsNone(cache.get("https://example.com/2"))
+            self.assertIsNotNone(cache.get("https://example.com/3"))
+
+    def test_cli_closes_the_caches(self):
+        """Test that the CLI closes every cache it opened, once the export is done."""
+        test_dir = os.path.dirname(__file__)
+        argv = [
+            "ocw_oer_export",
+            "--create_csv",
+            "--source=json",
+            f"--input_path={os.path.join(test_dir, 'sample_courses.json')}",
+            f"--output_path={os.path.join(self.temp_dir.name, 'output.csv')}",
+            "--use_cache",
+            f"--cache_path={self.cache_path}",
+        ]
+        sqlite_cache_close = SQLiteCache.close
+        with mock.patch("sys.argv", argv), mock.patch.object(
+            SQLiteCache, "close", autospec=True, side_effect=sqlite_cache_close
+        ) as close:
+            cli.main()
+
+        closed_caches = [type(call.args[0]) for call in close.call_args_list]
+        self.assertCountEqual(closed_caches, [HTTPCache, CourseCache, TextCache])
+
+
+class CourseCacheTestCase(unittest.TestCase):
+    """Test suite for re-transforming only the courses whose content changed."""
+
+    def test_only_changed_courses_are_transformed(self):
+        """Test that unchanged courses reuse their cached OER row."""
+        sample_json_path = os.path.join(
+            os.path.dirname(__file__), "sample_courses.json"
+        )
+        with open(sample_json_path, encoding="utf-8") as json_file:
+            courses = json.load(json_file)
+        expected_data = transform_data(courses)
+
+        with tempfile.TemporaryDirectory() as temp_dir, CourseCache(
+            os.path.join(temp_dir, "cache.sqlite3")
+        ) as course_cache:
+            transform_data(courses, course_cache)
+            courses[3]["title"] = "Changed Title"
+            with mock.patch.object(
+                create_csv_module,
+                "transform_single_course",
+                wraps=create_csv_module.transform_single_course,
+            ) as transform_single_course:
+                cached_data = transform_data(courses, course_cache)
+
+        self.assertEqual(transform_single_course.call_count, 1)
+        self.assertEqual(cached_data[3].CR_TITLE, "Changed Title")
+        self.assertEqual(cached_data[:3], expected_data[:3])
+        self.assertEqual(cached_data[4:], expected_data[4:])
+
+    def test_text_helper_versions_invalidate_rows(self):
+        """Test that bumping a text helper's version tag re-transforms every course."""
+        sample_json_path = os.path.join(
+            os.path.dirname(__file__), "sample_courses.json"
+        )
+        with open(sample_json_path, encoding="utf-8") as json_file:
+            courses = json.load(json_file)
+
+        for version_tag in ["TEXT_CLEANUP_VERSION", "NORMALIZE_KEYWORDS_VERSION"]:
+            with self.subTest(version_tag), tempfile.TemporaryDirectory() as temp_dir:
+                with CourseCache(os.path.join(temp_dir, "cache.sqlite3")) as cache:
+                    transform_data(courses, cache)
+                    with mock.patch.object(
+                        create_csv_module, version_tag, "bumped"
+                    ), mock.patch.object(
+                        create_csv_module,
+                        "transform_single_course",
+                        wraps=create_csv_module.transform_single_course,
+                    ) as transform_single_course:
+                        transform_data(courses, cache)
+                self.assertEqual(transform_single_course.call_count, len(courses))
+
+
+class TextCacheTestCase(unittest.TestCase):
+    """Test suite for reusing cleaned descriptions from the content-addressed cache."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.temp_dir.name, "cache.sqlite3")
+        sample_json_path = os.path.join(
+            os.path.dirname(__file__), "sample_courses.json"
+        )
+        with open(sample_json_path, encoding="utf-8") as json_file:
+            self.courses = json.load(json_file)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_warm_run_skips_text_cleanup(self):
+        """Test that a second run reuses every description cleaned up by the first one."""
+        expected_data = transform_data(self.courses)
+        with TextCache(self.cache_path) as text_cache:
+            transform_data(self.courses, text_cache=text_cache)
+            self.assertEqual(text_cache.stats["misses"], len(self.courses))
+
+        with TextCache(self.cache_path) as text_cache, mock.patch.object(
+            create_csv_module, "text_cleanup", wraps=create_csv_module.text_cleanup
+        ) as text_cleanup:
+            cached_data = transform_data(self.courses, text_cache=text_cache)
+            self.assertEqual(text_cache.stats["hits"], len(self.courses))
+
+        self.assertEqual(text_cleanup.call_count, 0)
+        self.assertEqual(cached_data, expected_data)
+
+    def test_version_tag_invalidates_results(self):
+        """Test that results are keyed by the function's version tag and the text."""
+        with TextCache(self.cache_path) as text_cache:
+            text_cache.get_or_compute("upper", "1", str.upper, "text")
+            self.assertEqual(
+                text_cache.get_or_compute("upper", "2", str.title, "text"), "Text"
+            )
+            self.assertEqual(
+                text_cache.get_or_compute("upper", "1", str.title, "text"), "TEXT"
+            )
+            self.assertEqual(dict(text_cache.stats), {"misses": 2, "hits": 1})
+
+    def test_size_based_eviction(self):
+        """Test that the least recently used results are evicted over max_bytes."""
+        with TextCache(self.cache_path, max_bytes=25) as text_cache:
+            for text in ["first", "second", "first", "third"]:
+                text_cache.get_or_compute("double", "1", lambda text: text * 2, text)
+                text_cache.flush()
+            text_cache.evict()
+            kept_results = text_cache.connection.execute(
+                "SELECT result FROM text_results ORDER BY result"
+            ).fetchall()
+
+        self.assertEqual(kept_results, [("firstfirst",), ("thirdthird",)])
+
+    def test_mappings_do_not_keep_the_cache(self):
+        """Test that loading the mappings with a TextCache does not keep it alive."""
+        with mock.patch.object(create_csv_module, "_mappings", None):
+            with TextCache(self.cache_path) as text_cache:
+                create_csv_module.load_mappings(text_cache)
+            text_cache_ref = weakref.ref(text_cache)
+            del text_cache
+            gc.collect()
+            self.assertIsNone(text_cache_ref())
+
+    def test_parallel_workers_share_the_cache(self):
+        """Test that results stored by transform processes are reused afterwards."""
+        with TextCache(self.cache_path) as text_cache:
+            transform_data(self.courses, workers=2, text_cache=text_cache)
+            unpickled_text_cache = pickle.loads(pickle.dumps(text_cache))
+
+        with unpickled_text_cache:
+            transform_data(self.courses, text_cache=unpickled_text_cache)
+            self.assertEqual(unpickled_text_cache.stats["hits"], len(self.courses))
@@ -0,0 +1,161 @@
+import copy
+import importlib
+import json
+import os
+import threading
+import time
+import unittest
+from unittest import mock
+import requests
+from ocw_oer_export.client import OCWClient
+from ocw_oer_export.service import ExportHTTPServer, ExportService
+from tests.stub_api import StubAPIServer
+
+create_csv_module = importlib.import_module("ocw_oer_export.create_csv")
+service_module = importlib.import_module("ocw_oer_export.service")
+
+CSV_PATH = "/ocw_oer_export.csv"
+JSON_PATH = "/ocw_api_data.json"
+
+
+class ExportServiceTestCase(unittest.TestCase):
+    """Test suite for serving the exports from a long-running process."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Class setup that runs once before all tests."""
+        cls.test_dir = os.path.dirname(__file__)
+        with open(
+            os.path.join(cls.test_dir, "expected_courses.csv"), encoding="utf-8"
+        ) as csv_file:
+            cls.expected_csv_lines = csv_file.read().splitlines()
+        with open(
+            os.path.join(cls.test_dir, "sample_courses.json"), encoding="utf-8"
+        ) as json_file:
+            cls.sample_courses = json.load(json_file)
+
+    def setUp(self):
+        self.courses = copy.deepcopy(self.sample_courses)
+        self.stub = StubAPIServer(self.courses)
+        self.stub.__enter__()
+        self.addCleanup(self.stub.__exit__, None, None, None)
+        self.client = OCWClient(page_size=4)
+        self.addCleanup(self.client.close)
+        self.service = ExportService(
+            api_url=self.stub.api_url, client=self.client, refresh_interval=3600
+        )
+        self.addCleanup(self.service.stop)
+        self.server = ExportHTTPServer(("127.0.0.1", 0), self.service)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        host, port = self.server.server_address
+        self.base_url = f"http://{host}:{port}"
+
+    def get(self, path, **kwargs):
+        """Send a GET request to the service."""
+        return requests.get(self.base_url + path, timeout=10, **kwargs)
+
+    def wait_for(self, condition):
+        """Wait until the condition holds, failing after a few seconds."""
+        deadline = time.monotonic() + 10
+        while not condition():
+            self.assertLess(time.monotonic(), deadline, "Timed out")
+            time.sleep(0.01)
+
+    def test_not_ready(self):
+        """Test that exports are unavailable until the first refresh completes."""
+        response = self.get(CSV_PATH)
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("Retry-After", response.headers)
+        self.assertFalse(self.get("/status").json()["ready"])
+
+    def test_serve_exports(self):
+        """Test that the CSV and JSON match the files written by the CLI."""
+        self.service.refresh()
+
+        csv_response = self.get(CSV_PATH)
+        self.assertEqual(csv_response.status_code, 200)
+        self.assertEqual(
+            csv_response.headers["Content-Type"], "text/csv; charset=utf-8"
+        )
+        self.assertEqual(
+            csv_response.content.decode("utf-8").splitlines(), self.expected_csv_lines
+        )
+        self.assertEqual(self.get(JSON_PATH).json(), self.sample_courses)
+        self.assertEqual(self.get("/status").json()["courses"], len(self.courses))
+        self.assertEqual(self.get("/unknown").status_code, 404)
+
+        head_response = requests.head(self.base_url + CSV_PATH, timeout=10)
+        self.assertEqual(head_response.content, b"")
+        self.assertEqual(
+            int(head_response.headers["Content-Length"]), len(csv_response.content)
+        )
+
+    def test_conditional_request(self):
+        """Test that an unchanged export is answered 304 Not Modified."""
+        self.service.refresh()
+        etag = self.get(CSV_PATH).headers["ETag"]
+
+        response = self.get(CSV_PATH, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_refresh_reuses_unchanged_rows(self):
+        """Test that a refresh only transforms the courses that changed."""
+        self.service.refresh()
+        etag = self.get(CSV_PATH).headers["ETag"]
+        self.courses[0]["title"] = "A New Title"
+
+        with mock.patch.object(
+            create_csv_module,
+            "transform_single_course",
+            wraps=create_csv_module.transform_single_course,
+        ) as transform_single_course:
+            self.service.refresh()
+
+        self.assertEqual(transform_single_course.call_count, 1)
+        response = self.get(CSV_PATH, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("A New Title", response.text)
+
+    def test_refresh_state_is_bounded(self):
+        """Test that refreshes keep neither deleted courses nor old request timings."""
+        self.service.refresh()
+        deleted_course = self.courses.pop()
+        self.service.refresh()
+
+        self.assertNotIn(deleted_course["id"], self.service.course_cache.rows)
+        self.assertEqual(len(self.service.course_cache.rows), len(self.courses))
+        self.assertEqual(len(self.client.timings), -(-len(self.courses) // 4))
+
+    def test_failed_refresh(self):
+        """Test that the previous export is served while refreshes fail."""
+        self.service.refresh()
+        expected_csv = self.get(CSV_PATH).content
+
+        with mock.patch.object(
+            service_module,
+            "extract_data_from_api",
+            side_effect=RuntimeError("API down"),
+        ):
+            self.service.start()
+            self.wait_for(lambda: self.service.last_error is not None)
+
+        self.assertEqual(self.get(CSV_PATH).content, expected_csv)
+        self.assertIn("API down", self.get("/status").json()["last_error"])
+
+    def test_refresh_on_request(self):
+        """Test that POST /refresh refreshes before the scheduled time."""
+        self.service.start()
+        self.wait_for(lambda: self.service.snapshot is not None)
+        del self.courses[-1]
+
+        response = requests.post(self.base_url + "/refresh", timeout=10)
+        self.assertEqual(response.status_code, 202)
+        self.wait_for(lambda: self.service.snapshot.num_courses == len(self.courses))
+        self.assertEqual(len(self.get(JSON_PATH).json()), len(self.courses))
+
+
+if __name__ == "__main__":
+    unittest.main()
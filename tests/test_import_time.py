@@ -0,0 +1,66 @@
+import subprocess
+import sys
+import unittest
+from benchmarks.bench_import_time import STATEMENTS, REPO_ROOT, measure_imports
+
+# Third-party packages only the export commands need.
+HEAVY_MODULES = {
+    "dotenv",
+    "markdown",
+    "pyarrow",
+    "requests",
+    "retry",
+    "sqlite3",
+    "titlecase",
+    "tqdm",
+    "urllib3",
+}
+
+
+class ImportTimeTestCase(unittest.TestCase):
+    """Test suite guarding the package and CLI startup against heavy imports."""
+
+    def assert_not_imported(self, code, modules):
+        """Assert that running code in a fresh interpreter imports none of the modules."""
+        _, imported_modules = measure_imports(code)
+        self.assertEqual(
+            {module.split(".")[0] for module in imported_modules} & set(modules), set()
+        )
+
+    def test_startup_imports(self):
+        """Test that the package, the CLI and its --help load no heavy dependency."""
+        for name, code in STATEMENTS.items():
+            with self.subTest(name):
+                self.assert_not_imported(code, HEAVY_MODULES)
+
+    def test_commands_import_their_own_dependencies(self):
+        """Test that each export path only loads the dependencies it needs."""
+        self.assert_not_imported(
+            "import ocw_oer_export.create_json", {"markdown", "titlecase", "dotenv"}
+        )
+        self.assert_not_imported(
+            "import ocw_oer_export.create_csv", {"requests", "tqdm", "dotenv"}
+        )
+
+    def test_config_is_loaded_on_first_use(self):
+        """Test that the .env file is only loaded once a setting is read."""
+        self.assert_not_imported("import ocw_oer_export.config", {"dotenv"})
+        _, imported_modules = measure_imports(
+            "from ocw_oer_export.config import API_URL"
+        )
+        self.assertIn("dotenv", imported_modules)
+
+    def test_public_functions(self):
+        """Test that the package exposes the functions, whichever is imported first."""
+        code = (
+            "import ocw_oer_export.create_csv, ocw_oer_export\n"
+            "from ocw_oer_export import create_json\n"
+            "assert callable(ocw_oer_export.create_csv)\n"
+            "assert ocw_oer_export.create_csv.__name__ == 'create_csv'\n"
+            "assert create_json.__name__ == 'create_json'\n"
+        )
+        subprocess.run([sys.executable, "-c", code], check=True, cwd=REPO_ROOT)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from urllib.parse import parse_qs, urlparse
+from ocw_oer_export.client import OCWClient
+from ocw_oer_export.create_json import create_json
+from ocw_oer_export.data_handler import extract_data_from_json
+from ocw_oer_export.incremental import get_sync_state_path, sync_snapshot
+from tests.stub_api import StubAPIServer, make_courses
+
+
+def make_dated_courses(count):
+    """Generate courses modified on successive days of January 2024."""
+    courses = make_courses(count)
+    for course in courses:
+        course["last_modified"] = f"2024-01-{course['id'] + 1:02d}T12:00:00Z"
+    return courses
+
+
+class IncrementalFetchTestCase(unittest.TestCase):
+    """Test suite for updating a snapshot with only the courses modified since the last run."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.courses = make_dated_courses(25)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def sync(self, stub, snapshot_path, **kwargs):
+        """Sync the snapshot from the stub, returning the sync summary."""
+        with OCWClient(page_size=10) as client:
+            return sync_snapshot(snapshot_path, stub.api_url, client=client, **kwargs)
+
+    def test_only_modified_courses_are_fetched(self):
+        """Test that a second run requests the modified courses and merges them by id."""
+        for file_name in ["ocw_api_data.json", "ocw_api_data.jsonl.gz"]:
+            with self.subTest(file_name=file_name):
+                snapshot_path = os.path.join(self.temp_dir.name, file_name)
+                courses = make_dated_courses(25)
+                with StubAPIServer(courses) as stub:
+                    first_sync = self.sync(stub, snapshot_path)
+                    courses[3].update(
+                        title="Changed", last_modified="2024-02-01T00:00:00Z"
+                    )
+                    courses.append(
+                        {
+                            "id": 25,
+                            "title": "New",
+                            "last_modified": "2024-02-02T00:00:00Z",
+                        }
+                    )
+                    num_requests = len(stub.requests_served)
+                    second_sync = self.sync(stub, snapshot_path)
+                    incremental_requests = stub.requests_served[num_requests:]
+
+                self.assertEqual(first_sync["mode"], "full")
+                self.assertEqual(second_sync["mode"], "incremental")
+                self.assertEqual(second_sync["fetched"], 3)
+                query = parse_qs(urlparse(incremental_requests[0]).query)
+                self.assertEqual(query["last_modified__gte"], ["2024-01-25T12:00:00Z"])
+                self.assertEqual(query["sortby"], ["last_modified"])
+                self.assertEqual(extract_data_from_json(snapshot_path), courses)
+                with open(
+                    get_sync_state_path(snapshot_path), encoding="utf-8"
+                ) as state_file:
+                    state = json.load(state_file)
+                self.assertEqual(state["high_water_mark"], "2024-02-02T00:00:00Z")
+
+    def test_full_sweep_drops_deleted_courses(self):
+        """Test that deleted courses remain until the periodic full sweep."""
+        snapshot_path = os.path.join(self.temp_dir.name, "ocw_api_data.json")
+        now = datetime(2024, 2, 1, tzinfo=timezone.utc)
+        with StubAPIServer(self.courses) as stub:
+            self.sync(stub, snapshot_path, now=now)
+            del self.courses[5]
+            incremental_sync = self.sync(
+                stub, snapshot_path, now=now + timedelta(days=1)
+            )
+            self.assertEqual(len(extract_data_from_json(snapshot_path)), 25)
+            full_sync = self.sync(stub, snapshot_path, now=now + timedelta(days=8))
+
+        self.assertEqual(incremental_sync["mode"], "incremental")
+        self.assertEqual(full_sync["mode"], "full")
+        self.assertEqual(full_sync["removed"], 1)
+        self.assertEqual(extract_data_from_json(snapshot_path), self.courses)
+
+    def test_create_json_incremental(self):
+        """Test that create_json merges into its snapshot, and refuses to resume."""
+        snapshot_path = os.path.join(self.temp_dir.name, "ocw_api_data.jsonl")
+        with StubAPIServer(self.courses) as stub, OCWClient() as client:
+            create_json(snapshot_path, client=client, api_url=stub.api_url)
+            create_json(
+                snapshot_path, client=client, api_url=stub.api_url, incremental=True
+            )
+            self.courses[0]["last_modified"] = "2024-03-01T00:00:00Z"
+            create_json(
+                snapshot_path, client=client, api_url=stub.api_url, incremental=True
+            )
+            with self.assertRaises(ValueError):
+                create_json(snapshot_path, resume=True, incremental=True)
+
+        self.assertEqual(extract_data_from_json(snapshot_path), self.courses)
+
+
+if __name__ == "__main__":
+    unittest.main()
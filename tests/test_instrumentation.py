@@ -0,0 +1,120 @@
+import json
+import os
+import pstats
+import tempfile
+import time
+import unittest
+from unittest import mock
+from ocw_oer_export import cli
+from ocw_oer_export.client import OCWClient
+from ocw_oer_export.create_csv import create_csv
+from ocw_oer_export.data_handler import extract_data_from_json
+from ocw_oer_export.instrumentation import (
+    RunStats,
+    collect_run_stats,
+    get_run_stats,
+    stage,
+)
+from tests.stub_api import StubAPIServer
+
+
+class InstrumentationTestCase(unittest.TestCase):
+    """Test suite for the pipeline stage timers, counters and run summary."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Class setup that runs once before all tests."""
+        cls.test_dir = os.path.dirname(__file__)
+        cls.sample_json_path = os.path.join(cls.test_dir, "sample_courses.json")
+        cls.sample_courses = extract_data_from_json(cls.sample_json_path)
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_path = os.path.join(self.temp_dir.name, "output.csv")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_csv_creation_stages(self):
+        """Test that every stage of a CSV creation from JSON is timed and counted."""
+        with collect_run_stats() as run_stats:
+            create_csv(
+                source="json",
+                input_path=self.sample_json_path,
+                output_path=self.output_path,
+            )
+        summary = run_stats.summary()
+
+        self.assertEqual(
+            set(summary["stages"]),
+            {"load_mappings", "read_json", "text_cleanup", "transform", "write"},
+        )
+        self.assertEqual(
+            summary["stages"]["text_cleanup"]["calls"], len(self.sample_courses)
+        )
+        self.assertEqual(summary["counters"]["courses"], len(self.sample_courses))
+        self.assertEqual(
+            summary["counters"]["output_bytes"], os.path.getsize(self.output_path)
+        )
+        self.assertIsNone(get_run_stats())
+
+    def test_request_counters_and_histogram(self):
+        """Test that API requests are counted and their latencies histogrammed."""
+        with StubAPIServer(self.sample_courses) as stub, OCWClient(
+            page_size=3
+        ) as client, collect_run_stats() as run_stats:
+            create_csv(
+                output_path=self.output_path, client=client, api_url=stub.api_url
+            )
+        summary = run_stats.summary()
+
+        num_pages = -(-len(self.sample_courses) // 3)
+        self.assertEqual(summary["counters"]["requests"], num_pages)
+        self.assertGreater(summary["counters"]["response_bytes"], 0)
+        histogram = summary["histograms"]["request_seconds"]
+        self.assertEqual(histogram["count"], num_pages)
+        self.assertEqual(histogram["buckets"]["le_inf"], num_pages)
+        self.assertIn("fetch", summary["stages"])
+
+    def test_nested_stage_self_time(self):
+        """Test that a stage's own time excludes the stages nested in it."""
+        run_stats = RunStats()
+        with run_stats.stage("outer"):
+            with run_stats.stage("inner"):
+                time.sleep(0.05)
+        stages = run_stats.summary()["stages"]
+
+        self.assertGreaterEqual(stages["outer"]["wall_seconds"], 0.05)
+        self.assertLess(stages["outer"]["self_wall_seconds"], 0.05)
+        self.assertGreaterEqual(stages["inner"]["self_wall_seconds"], 0.05)
+
+    def test_stages_are_noops_when_not_collecting(self):
+        """Test that stages outside collect_run_stats record nothing."""
+        with stage("transform"):
+            pass
+        self.assertIsNone(get_run_stats())
+
+    def test_cli_writes_summary_and_profile(self):
+        """Test that the CLI writes a JSON run summary and a pstats profile."""
+        profile_path = os.path.join(self.temp_dir.name, "run.prof")
+        argv = [
+            "ocw_oer_export",
+            "--create_csv",
+            "--source=json",
+            f"--input_path={self.sample_json_path}",
+            f"--output_path={self.output_path}",
+            f"--profile={profile_path}",
+        ]
+        with mock.patch("sys.argv", argv):
+            cli.main()
+
+        with open(f"{self.output_path}.summary.json", encoding="utf-8") as summary_file:
+            summary = json.load(summary_file)
+        self.assertEqual(summary["command"], "create_csv")
+        self.assertEqual(summary["counters"]["courses"], len(self.sample_courses))
+        self.assertIn("total", summary["stages"])
+        self.assertGreater(pstats.Stats(profile_path).total_calls, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import importlib.util
+import os
+import tempfile
+import unittest
+from ocw_oer_export.client import OCWClient
+from ocw_oer_export.create_csv import create_csv
+from ocw_oer_export.create_json import RESUME_OVERLAP, create_json
+from ocw_oer_export.data_handler import (
+    JSONLinesWriter,
+    extract_data_from_file,
+    extract_data_from_json,
+)
+from tests.stub_api import StubAPIServer, make_courses
+
+SNAPSHOT_EXTENSIONS = ["jsonl", "jsonl.gz"]
+if importlib.util.find_spec("zstandard"):
+    SNAPSHOT_EXTENSIONS.append("jsonl.zst")
+
+
+class JSONLinesSnapshotTestCase(unittest.TestCase):
+    """Test suite for writing, reading and resuming JSON Lines snapshots."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_snapshot_round_trip(self):
+        """Test that every snapshot format reads back the downloaded courses."""
+        courses = make_courses(250)
+        with StubAPIServer(courses) as stub:
+            for extension in SNAPSHOT_EXTENSIONS:
+                with self.subTest(extension=extension):
+                    snapshot_path = os.path.join(
+                        self.temp_dir.name, f"data.{extension}"
+                    )
+                    create_json(output_path=snapshot_path, api_url=stub.api_url)
+                    self.assertEqual(extract_data_from_json(snapshot_path), courses)
+
+    def test_csv_creation_from_json_lines(self):
+        """Test that the CSV created from a compressed JSON Lines snapshot is unchanged."""
+        test_dir = os.path.dirname(__file__)
+        sample_courses = extract_data_from_json(
+            os.path.join(test_dir, "sample_courses.json")
+        )
+        snapshot_path = os.path.join(self.temp_dir.name, "data.jsonl.gz")
+        generated_csv_path = os.path.join(self.temp_dir.name, "output.csv")
+        with JSONLinesWriter(snapshot_path) as writer:
+            writer.write_page(sample_courses[:4])
+            writer.write_page(sample_courses[4:])
+
+        create_csv(
+            source="json", input_path=snapshot_path, output_path=generated_csv_path
+        )
+        self.assertEqual(
+            extract_data_from_file(generated_csv_path),
+            extract_data_from_file(os.path.join(test_dir, "expected_courses.csv")),
+        )
+
+    def test_resume_interrupted_snapshot(self):
+        """Test that resuming discards the partial data and fetches only the rest."""
+        courses = make_courses(300)
+        for extension in SNAPSHOT_EXTENSIONS:
+            with self.subTest(extension=extension):
+                snapshot_path = os.path.join(self.temp_dir.name, f"data.{extension}")
+                with JSONLinesWriter(snapshot_path) as writer:
+                    writer.write_page(courses[:200])
+                    writer.write_page(courses[200:250])
+                with open(snapshot_path, "r+b") as snapshot_file:
+                    snapshot_file.truncate(os.path.getsize(snapshot_path) - 5)
+
+                with StubAPIServer(courses) as stub, OCWClient(page_size=50) as client:
+                    create_json(
+                        output_path=snapshot_path,
+                        client=client,
+                        resume=True,
+                        api_url=stub.api_url,
+                    )
+                    requests_served = stub.requests_served
+
+                self.assertEqual(extract_data_from_json(snapshot_path), courses)
+                # Uncompressed snapshots keep every complete line, compressed ones
+                # every complete page; the download restarts RESUME_OVERLAP earlier.
+                courses_kept = 249 if extension == "jsonl" else 200
+                resume_offset = courses_kept - RESUME_OVERLAP
+                self.assertIn(f"offset={resume_offset}", requests_served[0])
+                self.assertEqual(len(requests_served), 4)
+
+    def test_resume_after_deleted_courses(self):
+        """Test that no course is skipped when courses already written were deleted."""
+        courses = make_courses(250)
+        snapshot_path = os.path.join(self.temp_dir.name, "data.jsonl")
+        with JSONLinesWriter(snapshot_path) as writer:
+            writer.write_page(courses[:150])
+
+        with StubAPIServer(courses[:10] + courses[20:]) as stub, OCWClient(
+            page_size=50
+        ) as client:
+            create_json(
+                output_path=snapshot_path,
+                client=client,
+                resume=True,
+                api_url=stub.api_url,
+            )
+
+        self.assertEqual(extract_data_from_json(snapshot_path), courses)
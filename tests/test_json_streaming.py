@@ -0,0 +1,62 @@
+import json
+import os
+import tempfile
+import unittest
+from ocw_oer_export.data_handler import extract_data_from_json, iter_data_from_json
+
+
+class JSONStreamingTestCase(unittest.TestCase):
+    """Test suite for reading a JSON array one item at a time."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.json_path = os.path.join(self.temp_dir.name, "data.json")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, text):
+        """Write the given text to the temporary JSON file."""
+        with open(self.json_path, "w", encoding="utf-8") as json_file:
+            json_file.write(text)
+
+    def test_sample_courses_in_small_chunks(self):
+        """Test that items split across chunks are parsed exactly like json.load."""
+        sample_json_path = os.path.join(
+            os.path.dirname(__file__), "sample_courses.json"
+        )
+        expected_data = extract_data_from_json(sample_json_path)
+        for chunk_size in [1, 7, 100, 4096, 1024 * 1024]:
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(
+                    list(iter_data_from_json(sample_json_path, chunk_size)),
+                    expected_data,
+                )
+
+    def test_compact_and_scalar_items(self):
+        """Test compact arrays, numbers split across chunks and non-ASCII text."""
+        data = [12345, "Économie", {"a": [1, 2]}, None, 6.5e3, [], True]
+        self.write(json.dumps(data, ensure_ascii=False, separators=(",", ":")))
+        for chunk_size in [1, 2, 3, 1024]:
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(
+                    list(iter_data_from_json(self.json_path, chunk_size)), data
+                )
+
+    def test_empty_array(self):
+        """Test that an empty array yields nothing."""
+        self.write(" [ \n ] ")
+        self.assertEqual(list(iter_data_from_json(self.json_path, 1)), [])
+
+    def test_invalid_json(self):
+        """Test that malformed arrays raise a JSONDecodeError."""
+        for text in ["", '"text"', "[1 2]", "[1,", '[{"a": 1}']:
+            with self.subTest(text=text):
+                self.write(text)
+                with self.assertRaises(json.JSONDecodeError):
+                    list(iter_data_from_json(self.json_path, 2))
+
+    def test_missing_file(self):
+        """Test that a missing file raises FileNotFoundError."""
+        with self.assertRaises(FileNotFoundError):
+            list(iter_data_from_json(os.path.join(self.temp_dir.name, "missing.json")))
@@ -0,0 +1,78 @@
+import importlib
+import os
+import tempfile
+import unittest
+from unittest import mock
+from ocw_oer_export.mapping_index import load_mapping_index
+
+create_csv_module = importlib.import_module("ocw_oer_export.create_csv")
+
+
+class MappingIndexTestCase(unittest.TestCase):
+    """Test suite for the compiled mapping index cached across runs."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.source_path = os.path.join(self.temp_dir.name, "mapping.csv")
+        self.index_path = os.path.join(self.temp_dir.name, "index.pickle")
+        self.write_source("OCW Topic,OER Subject\nAccounting,Accounting\n")
+        self.builds = 0
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_source(self, content):
+        """Write the mapping source file."""
+        with open(self.source_path, "w", encoding="utf-8") as source_file:
+            source_file.write(content)
+
+    def build(self):
+        """Compile the source file, counting how many times it happens."""
+        self.builds += 1
+        with open(self.source_path, encoding="utf-8") as source_file:
+            return source_file.read().splitlines()
+
+    def load(self, version="1"):
+        """Load the index of the source file."""
+        return load_mapping_index(
+            [self.source_path], self.build, self.index_path, version=version
+        )
+
+    def test_index_is_reused(self):
+        """Test that an up-to-date index is loaded instead of rebuilt."""
+        first_data = self.load()
+        second_data = self.load()
+        self.assertEqual(first_data, second_data)
+        self.assertEqual(self.builds, 1)
+
+    def test_touched_source_keeps_index(self):
+        """Test that a source with a new mtime but the same content keeps the index."""
+        self.load()
+        stat = os.stat(self.source_path)
+        os.utime(self.source_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.load()
+        self.assertEqual(self.builds, 1)
+
+    def test_changed_source_or_version_rebuilds_index(self):
+        """Test that changing a source file or the version rebuilds the index."""
+        self.load()
+        self.write_source("OCW Topic,OER Subject\nBusiness,Business\n")
+        self.assertEqual(self.load()[1], "Business,Business")
+        self.load(version="2")
+        self.assertEqual(self.builds, 3)
+
+    def test_unwritable_index(self):
+        """Test that the data is still built when the index cannot be saved."""
+        self.index_path = os.path.join(self.temp_dir.name, "missing", "index.pickle")
+        with self.assertLogs("ocw_oer_export.mapping_index", "WARNING"):
+            self.assertEqual(self.load()[1], "Accounting,Accounting")
+
+    def test_normalization_code_is_a_source(self):
+        """Test that the OCW mapping index is rebuilt when its normalization code changes."""
+        with mock.patch.object(create_csv_module, "load_mapping_index") as load_index:
+            load_index.return_value = ({}, {})
+            create_csv_module.read_mappings()
+        source_paths = {os.path.realpath(path) for path in load_index.call_args.args[0]}
+        for module_name in ["normalize_course_url", "normalize_keywords"]:
+            module = importlib.import_module(f"ocw_oer_export.utilities.{module_name}")
+            self.assertIn(os.path.realpath(module.__file__), source_paths)
@@ -0,0 +1,49 @@
+import unittest
+from ocw_oer_export.create_csv import (
+    get_cr_keywords,
+    get_cr_subjects,
+    load_mappings,
+)
+
+
+class MappingsTestCase(unittest.TestCase):
+    """Test suite for the precomputed, read-only mapping lookups."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Class setup that runs once before all tests."""
+        cls.ocw_topics_mapping, cls.fm_ocw_keywords_mapping = load_mappings()
+
+    def test_mappings_are_read_only(self):
+        """Test that the shared mappings cannot be modified."""
+        with self.assertRaises(TypeError):
+            self.ocw_topics_mapping["Accounting"] = frozenset()
+        with self.assertRaises(TypeError):
+            self.fm_ocw_keywords_mapping["ocw.mit.edu/courses/test"] = "Test"
+
+    def test_subjects_are_pre_split(self):
+        """Test that topics map to sets of OER subjects that are merged and sorted."""
+        self.assertEqual(self.ocw_topics_mapping["Accounting"], {"Accounting"})
+        topics = [
+            {"name": "Philosophy"},
+            {"name": "Political Philosophy"},
+            {"name": "Humanities"},
+        ]
+        self.assertEqual(
+            get_cr_subjects(self.ocw_topics_mapping, topics),
+            "Arts and Humanities|Philosophy",
+        )
+
+    def test_keywords_are_pre_normalized(self):
+        """Test that FM keywords are normalized, with topics used as a fallback."""
+        course_url = (
+            "https://ocw.mit.edu/courses/1-00-introduction-to-computers-and-"
+            "engineering-problem-solving-spring-2012"
+        )
+        keywords = get_cr_keywords(self.fm_ocw_keywords_mapping, [], course_url)
+        self.assertTrue(keywords.startswith("Computer|Engineering|Problem Solving|"))
+        topics = [{"name": "Accounting"}, {"name": "Business"}]
+        self.assertEqual(
+            get_cr_keywords(self.fm_ocw_keywords_mapping, topics, "unknown"),
+            "Accounting|Business",
+        )
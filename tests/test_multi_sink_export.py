@@ -0,0 +1,163 @@
+import importlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from ocw_oer_export import cli
+from ocw_oer_export.client import OCWClient
+from ocw_oer_export.data_handler import extract_data_from_file, extract_data_from_json
+from ocw_oer_export.export import (
+    Sink,
+    csv_sink,
+    export,
+    json_snapshot_sink,
+    write_json_array,
+)
+from tests.stub_api import StubAPIServer
+
+export_module = importlib.import_module("ocw_oer_export.export")
+create_json_module = importlib.import_module("ocw_oer_export.create_json")
+
+
+def failing_sink(output_path, after_pages=1):
+    """Sink failing once it has consumed the given number of pages."""
+
+    def write(pages):
+        for count, _ in enumerate(pages, 1):
+            if count == after_pages:
+                raise RuntimeError("Disk full")
+
+    return Sink("failing", output_path, write)
+
+
+class MultiSinkExportTestCase(unittest.TestCase):
+    """Test suite for writing several outputs from a single API download."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Class setup that runs once before all tests."""
+        cls.test_dir = os.path.dirname(__file__)
+        cls.expected_csv_path = os.path.join(cls.test_dir, "expected_courses.csv")
+        with open(
+            os.path.join(cls.test_dir, "sample_courses.json"), encoding="utf-8"
+        ) as json_file:
+            cls.sample_courses = json.load(json_file)
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.temp_dir = temp_dir.name
+        self.csv_path = os.path.join(self.temp_dir, "ocw_oer_export.csv")
+        self.json_path = os.path.join(self.temp_dir, "ocw_api_data.json")
+        self.jsonl_path = os.path.join(self.temp_dir, "ocw_api_data.jsonl.gz")
+
+    def test_single_download(self):
+        """Test that the CSV and both snapshot formats are written from one download."""
+        with StubAPIServer(self.sample_courses) as stub, OCWClient(
+            page_size=3
+        ) as client:
+            failures = export(
+                [
+                    csv_sink(self.csv_path),
+                    json_snapshot_sink(self.json_path),
+                    json_snapshot_sink(self.jsonl_path),
+                ],
+                api_url=stub.api_url,
+                client=client,
+            )
+            num_requests = len(stub.requests_served)
+
+        self.assertEqual(failures, {})
+        self.assertEqual(num_requests, -(-len(self.sample_courses) // 3))
+        self.assertEqual(
+            extract_data_from_file(self.csv_path),
+            extract_data_from_file(self.expected_csv_path),
+        )
+        self.assertEqual(extract_data_from_json(self.json_path), self.sample_courses)
+        self.assertEqual(extract_data_from_json(self.jsonl_path), self.sample_courses)
+        self.assertEqual(
+            sorted(os.listdir(self.temp_dir)),
+            sorted(
+                os.path.basename(path)
+                for path in [self.csv_path, self.json_path, self.jsonl_path]
+            ),
+        )
+
+    def test_json_array_format(self):
+        """Test that the streamed JSON array is formatted as create_json's json.dump."""
+        for courses in [[], self.sample_courses[:1], self.sample_courses]:
+            with self.subTest(courses=len(courses)):
+                json_file = io.StringIO()
+                write_json_array(iter(courses), json_file)
+                self.assertEqual(
+                    json_file.getvalue(),
+                    json.dumps(courses, ensure_ascii=False, indent=4),
+                )
+
+    def test_sink_failure_is_isolated(self):
+        """Test that a failing sink neither stops nor blocks the other sinks."""
+        courses = self.sample_courses * 10
+        with StubAPIServer(courses) as stub, OCWClient(page_size=2) as client:
+            failures = export(
+                [
+                    failing_sink(os.path.join(self.temp_dir, "failing")),
+                    json_snapshot_sink(self.json_path),
+                ],
+                api_url=stub.api_url,
+                client=client,
+            )
+
+        self.assertEqual(list(failures), ["failing"])
+        self.assertIsInstance(failures["failing"], RuntimeError)
+        self.assertEqual(extract_data_from_json(self.json_path), courses)
+
+    def test_download_failure_aborts_every_sink(self):
+        """Test that a failed download raises, leaving no partial output behind."""
+        with StubAPIServer(self.sample_courses, failures=[404]) as stub, OCWClient(
+            page_size=3
+        ) as client:
+            with self.assertRaises(Exception):
+                export(
+                    [csv_sink(self.csv_path), json_snapshot_sink(self.json_path)],
+                    api_url=stub.api_url,
+                    client=client,
+                )
+        self.assertEqual(os.listdir(self.temp_dir), [])
+
+    def test_cli_output_paths(self):
+        """Test that the CLI writes each file to its own output path."""
+        with mock.patch.object(export_module, "export", return_value={}) as export_mock:
+            with mock.patch(
+                "sys.argv",
+                [
+                    "ocw_oer_export",
+                    "--create_csv",
+                    "--create_json",
+                    "--output_path",
+                    self.csv_path,
+                    "--json_output_path",
+                    self.jsonl_path,
+                ],
+            ):
+                cli.main()
+        sinks = export_mock.call_args.args[0]
+        self.assertEqual(
+            [(sink.name, sink.output_path) for sink in sinks],
+            [("csv", self.csv_path), ("json", self.jsonl_path)],
+        )
+
+        with mock.patch.object(create_json_module, "create_json") as create_json_mock:
+            with mock.patch(
+                "sys.argv",
+                ["ocw_oer_export", "--create_json", "--output_path", self.json_path],
+            ):
+                cli.main()
+        self.assertEqual(
+            create_json_mock.call_args.kwargs["output_path"], self.json_path
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
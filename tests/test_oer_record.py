@@ -0,0 +1,35 @@
+import pickle
+import unittest
+from ocw_oer_export.oer_record import (
+    CONSTANT_FIELDS,
+    OER_FIELDNAMES,
+    VARIABLE_FIELDS,
+    OERRecord,
+)
+
+
+class OERRecordTestCase(unittest.TestCase):
+    """Test suite for the compact record of a transformed course."""
+
+    def setUp(self):
+        self.record = OERRecord._make(f"value of {field}" for field in VARIABLE_FIELDS)
+
+    def test_row_fills_in_constant_and_copied_columns(self):
+        """Test that the full row has every column, in the OER template order."""
+        row = self.record.as_dict()
+
+        self.assertEqual(list(row), OER_FIELDNAMES)
+        for field, value in CONSTANT_FIELDS.items():
+            self.assertEqual(row[field], value)
+        for field in VARIABLE_FIELDS:
+            self.assertEqual(row[field], f"value of {field}")
+        self.assertEqual(row["CR_COU_COPYRIGHT_HOLDER"], row["CR_AUTHOR_NAME"])
+        self.assertEqual(self.record.as_row(), tuple(row.values()))
+
+    def test_record_pickles_by_value(self):
+        """Test that records sent to worker processes come back equal."""
+        self.assertEqual(pickle.loads(pickle.dumps(self.record)), self.record)
+
+
+if __name__ == "__main__":
+    unittest.main()
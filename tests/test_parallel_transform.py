@@ -0,0 +1,83 @@
+import importlib
+import os
+import tempfile
+import unittest
+from unittest import mock
+from ocw_oer_export.cache import CourseCache, TextCache
+from ocw_oer_export.create_csv import create_csv, iter_transformed_data, transform_data
+from ocw_oer_export.data_handler import extract_data_from_file, extract_data_from_json
+from ocw_oer_export.utilities import delete_file
+
+create_csv_module = importlib.import_module("ocw_oer_export.create_csv")
+
+
+class ParallelTransformTestCase(unittest.TestCase):
+    """Test suite for transforming courses in a pool of worker processes."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Class setup that runs once before all tests."""
+        cls.test_dir = os.path.dirname(__file__)
+        cls.expected_csv_path = os.path.join(cls.test_dir, "expected_courses.csv")
+        cls.sample_json_path = os.path.join(cls.test_dir, "sample_courses.json")
+        cls.generated_csv_path = os.path.join(cls.test_dir, "test_output_parallel.csv")
+
+    def test_parallel_transform_matches_serial(self):
+        """Test that rows transformed in parallel keep the serial order and content."""
+        courses = extract_data_from_json(self.sample_json_path) * 35
+        for index, course in enumerate(courses):
+            course = dict(course, title=f"{course['title']} {index}")
+            courses[index] = course
+
+        self.assertEqual(transform_data(courses, workers=3), transform_data(courses))
+
+    def test_parallel_transform_with_course_cache(self):
+        """Test that only changed courses are sent to the workers, in order."""
+        courses = extract_data_from_json(self.sample_json_path)
+        expected_data = transform_data(courses)
+        with tempfile.TemporaryDirectory() as temp_dir, CourseCache(
+            os.path.join(temp_dir, "cache.sqlite3")
+        ) as course_cache:
+            transform_data(courses[::2], course_cache, workers=2)
+            cached_data = transform_data(courses, course_cache, workers=2)
+
+        self.assertEqual(cached_data, expected_data)
+
+    def test_interleaved_serial_transforms(self):
+        """Test that serial transforms running at once each use their own TextCache."""
+        courses = extract_data_from_json(self.sample_json_path) * 35
+        with tempfile.TemporaryDirectory() as temp_dir, TextCache(
+            os.path.join(temp_dir, "first.sqlite3")
+        ) as first_cache, TextCache(
+            os.path.join(temp_dir, "second.sqlite3")
+        ) as second_cache, mock.patch.object(
+            create_csv_module,
+            "transform_single_course",
+            wraps=create_csv_module.transform_single_course,
+        ) as transform_single_course:
+            first_rows = iter_transformed_data(courses, text_cache=first_cache)
+            second_rows = iter_transformed_data(courses, text_cache=second_cache)
+            next(first_rows)
+            next(second_rows)
+            list(first_rows)
+            text_caches = [call.args[3] for call in transform_single_course.mock_calls]
+
+        self.assertEqual(text_caches.count(first_cache), len(courses))
+
+    def test_csv_creation_with_workers(self):
+        """Test the CSV generated with workers is identical to the expected CSV."""
+        create_csv(
+            source="json",
+            input_path=self.sample_json_path,
+            output_path=self.generated_csv_path,
+            workers=2,
+        )
+        self.assertEqual(
+            extract_data_from_file(self.generated_csv_path),
+            extract_data_from_file(self.expected_csv_path),
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        """Class teardown that runs once after all tests."""
+        delete_file(cls.generated_csv_path)
@@ -0,0 +1,111 @@
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import requests
+from ocw_oer_export.client import OCWClient
+from ocw_oer_export.scheduler import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RateLimiter,
+    RequestScheduler,
+    parse_retry_after,
+)
+from tests.stub_api import StubAPIServer, make_courses
+
+
+def make_client(tries=5, **kwargs):
+    """Create a client whose retries back off for milliseconds only."""
+    scheduler = RequestScheduler(tries=tries, base_delay=0.01, max_delay=0.05)
+    return OCWClient(scheduler=scheduler, **kwargs)
+
+
+class RequestSchedulerTestCase(unittest.TestCase):
+    """Test suite for the retrying, rate-limited request scheduler."""
+
+    def test_transient_errors_are_retried(self):
+        """Test that 503 and 502 responses are retried until the page is served."""
+        courses = make_courses(250)
+        with StubAPIServer(courses, failures=[503, 502]) as stub, make_client(
+            page_size=100
+        ) as client:
+            api_data = client.extract_data_from_api(stub.api_url)
+            status_codes = stub.status_codes
+
+        self.assertEqual(api_data, courses)
+        self.assertEqual(status_codes, [503, 502, 200, 200, 200])
+        metrics = client.scheduler.metrics.as_dict()
+        self.assertEqual(metrics["retries"], 2)
+        self.assertEqual(metrics["throttled"], 1)
+        self.assertEqual(metrics["failures"], 2)
+
+    def test_retry_after_is_honored(self):
+        """Test that a 429 waits for Retry-After without counting as a failure."""
+        courses = make_courses(10)
+        with StubAPIServer(courses, failures=[429], retry_after=1) as stub, make_client(
+            page_size=100
+        ) as client:
+            start = time.monotonic()
+            api_data = client.extract_data_from_api(stub.api_url)
+            elapsed = time.monotonic() - start
+
+        self.assertEqual(api_data, courses)
+        self.assertGreaterEqual(elapsed, 1)
+        metrics = client.scheduler.metrics.as_dict()
+        self.assertEqual(metrics["throttled"], 1)
+        self.assertNotIn("failures", metrics)
+
+    def test_client_errors_are_not_retried(self):
+        """Test that a 404 fails at once."""
+        with StubAPIServer(
+            make_courses(10), failures=[404]
+        ) as stub, make_client() as client:
+            with self.assertRaises(requests.HTTPError):
+                client.extract_data_from_api(stub.api_url)
+            self.assertEqual(stub.status_codes, [404])
+
+    def test_retries_run_out(self):
+        """Test that the last error is raised once every attempt has failed."""
+        with StubAPIServer(make_courses(10), failures=[500] * 3) as stub, make_client(
+            tries=3
+        ) as client:
+            with self.assertRaises(requests.HTTPError):
+                client.extract_data_from_api(stub.api_url)
+            self.assertEqual(stub.status_codes, [500] * 3)
+
+    def test_rate_limiter_spaces_requests(self):
+        """Test that the token bucket lets through its rate of requests per second."""
+        rate_limiter = RateLimiter(rate=20, burst=1)
+        start = time.monotonic()
+        for _ in range(11):
+            rate_limiter.acquire()
+        self.assertGreaterEqual(time.monotonic() - start, 0.45)
+
+    def test_circuit_breaker(self):
+        """Test that the circuit opens after repeated failures and closes after a trial."""
+        circuit_breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.1)
+        self.assertFalse(circuit_breaker.record_failure())
+        self.assertTrue(circuit_breaker.record_failure())
+        with self.assertRaises(CircuitOpenError):
+            circuit_breaker.before_request()
+
+        time.sleep(0.1)
+        circuit_breaker.before_request()
+        with self.assertRaises(CircuitOpenError):
+            circuit_breaker.before_request()
+        circuit_breaker.record_success()
+        circuit_breaker.before_request()
+
+    def test_parse_retry_after(self):
+        """Test that Retry-After is parsed from seconds or an HTTP date."""
+        now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        retry_at = format_datetime(now + timedelta(seconds=30), usegmt=True)
+        self.assertEqual(parse_retry_after("120"), 120)
+        self.assertEqual(parse_retry_after(retry_at, now=now), 30)
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertIsNone(parse_retry_after(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
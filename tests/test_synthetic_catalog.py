@@ -0,0 +1,26 @@
+import unittest
+from benchmarks.synthetic import generate_catalog
+from ocw_oer_export.create_csv import transform_data
+
+
+class SyntheticCatalogTestCase(unittest.TestCase):
+    """Test suite for the synthetic catalogs used by the benchmarks."""
+
+    def test_catalog_is_reproducible(self):
+        """Test that a catalog only depends on its size and seed."""
+        self.assertEqual(generate_catalog(50), generate_catalog(50))
+        self.assertNotEqual(generate_catalog(50), generate_catalog(50, seed=1))
+
+    def test_catalog_matches_api_schema(self):
+        """Test that synthetic courses go through the transform, with distinct URLs."""
+        courses = generate_catalog(500)
+        transformed_courses = transform_data(courses)
+
+        self.assertEqual(len(transformed_courses), 500)
+        self.assertEqual(len({course.CR_URL for course in transformed_courses}), 500)
+        self.assertTrue(all(course.CR_ABSTRACT for course in transformed_courses))
+        self.assertTrue(any(course.CR_SUBJECT for course in transformed_courses))
+
+
+if __name__ == "__main__":
+    unittest.main()
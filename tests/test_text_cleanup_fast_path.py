@@ -0,0 +1,144 @@
+import json
+import os
+import random
+import unittest
+from unittest import mock
+from benchmarks.synthetic import generate_catalog
+from ocw_oer_export.utilities import text_cleanup
+from ocw_oer_export.utilities.text_cleanup import (
+    HTML_TEXT,
+    MARKDOWN_TEXT,
+    PLAIN_TEXT,
+    classify_markup,
+    markdown_text_cleanup,
+    strip_markup,
+)
+
+# Pieces of descriptions, including the markup handled without the Markdown engine
+# and near misses that need it.
+FRAGMENTS = [
+    "word",
+    "Course",
+    "1986",
+    "1.5",
+    "1. ",
+    " ",
+    " ",
+    "\n",
+    "\n\n",
+    "\n\n\n",
+    "### ",
+    "#",
+    "- ",
+    "> ",
+    "!",
+    "&",
+    "&amp;",
+    "&#39;",
+    "&T",
+    "<em>",
+    "</em>",
+    "<div>",
+    "<br/>",
+    "<!-- note -->",
+    "{{< br >}}",
+    "{{< resource_file >}}",
+    "{{}}",
+    "[link](https://ocw.mit.edu/a_b)",
+    "![image](image.png)",
+    "<https://ocw.mit.edu>",
+    "**bold**",
+    "**two words**",
+    "_emphasis_",
+    "**",
+    "_",
+    "*",
+    "[",
+    "x_y",
+    "C#",
+    "\xa0",
+    "\t",
+    "\\",
+    "`",
+]
+
+
+class TextCleanupFastPathTests(unittest.TestCase):
+    """Test suite for cleaning up descriptions without the Markdown engine."""
+
+    def assert_same_cleanup(self, texts):
+        """Assert that text_cleanup gives the Markdown engine's result for every text."""
+        for text in texts:
+            with self.subTest(text=text):
+                self.assertEqual(text_cleanup(text), markdown_text_cleanup(text))
+
+    def test_classify_markup(self):
+        """Test that descriptions are classified by the markup they contain."""
+        self.assertEqual(classify_markup("Plain text, 100% (really).\n"), PLAIN_TEXT)
+        self.assertEqual(classify_markup("Text with <em>HTML</em>"), HTML_TEXT)
+        self.assertEqual(classify_markup("Text{{< br >}}"), HTML_TEXT)
+        self.assertEqual(classify_markup("Text with **Markdown**"), MARKDOWN_TEXT)
+        self.assertEqual(classify_markup("### Header"), MARKDOWN_TEXT)
+
+    def test_plain_text_skips_markdown(self):
+        """Test that plain and common CKEditor markup are cleaned up without Markdown."""
+        with mock.patch(
+            "ocw_oer_export.utilities.text_cleanup.markdown_to_text"
+        ) as markdown_to_text:
+            self.assertEqual(
+                text_cleanup("First paragraph.\n\n\nSecond\nparagraph.\n"),
+                "First paragraph.\nSecond\nparagraph.",
+            )
+            self.assertEqual(
+                text_cleanup(
+                    "### Notes\n**Read** the [syllabus](https://ocw.mit.edu/syllabus_1/)"
+                    " for _this_ <em>course</em>{{< br >}}"
+                ),
+                "Notes\nRead the syllabus for this course",
+            )
+        markdown_to_text.assert_not_called()
+
+    def test_other_markdown_falls_back(self):
+        """Test that Markdown beyond the common patterns is left to the Markdown engine."""
+        self.assertIsNone(strip_markup("Topics:\n\n- Sets\n- Functions"))
+        self.assertIsNone(strip_markup("x_y and *emphasis*"))
+        self.assertIsNone(strip_markup("![Diagram](diagram.png)"))
+        self.assertIsNone(strip_markup("See <https://ocw.mit.edu>"))
+        self.assertIsNone(strip_markup("AT&T"))
+
+    def test_existing_cases(self):
+        """Test the cases of the description cleanup tests."""
+        self.assert_same_cleanup(
+            [
+                r"**2\. Adherence to guidelines (10% total grade):**",
+                "### Other Notes",
+                "{{< tableopen >}}{{< theadopen >}}{{< tropen >}}"
+                "{{< thopen >}}Points{{< thclose >}}{{< thopen >}}"
+                " Assessment{{< thclose >}}{{< trclose >}}{{< theadclose >}}"
+                "{{< tableclose >}}",
+                "CHINESE COURSES\n\n\n\nCOURSE SITES\n\n\nChinese I (Fall 2014)",
+                "CHINESE COURSES\n{{}}\n{{}}\nCOURSE SITES",
+                "See [the syllabus][syllabus].\n\n[syllabus]: https://ocw.mit.edu",
+            ]
+        )
+
+    def test_course_descriptions(self):
+        """Test the descriptions of the sample and synthetic courses."""
+        sample_json_path = os.path.join(
+            os.path.dirname(__file__), "sample_courses.json"
+        )
+        with open(sample_json_path, "r", encoding="utf-8") as json_file:
+            courses = json.load(json_file) + generate_catalog(2000)
+        self.assert_same_cleanup(course["runs"][0]["description"] for course in courses)
+
+    def test_random_descriptions(self):
+        """Test random mixes of markup, near misses and whitespace."""
+        rng = random.Random(0)
+        self.assert_same_cleanup(
+            "".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(0, 10)))
+            for _ in range(5000)
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()